@@ -1,8 +1,11 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 import os
 
+from app.metricas_pool import PoolMedido, PoolMedidoAsync, instrumentar
+
 # Permitir configuración flexible vía variables separadas si DATABASE_URL no está definida
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
@@ -16,9 +19,67 @@ if not DATABASE_URL:
 
 # Comentario: si se desea conexión externa, se puede exportar DATABASE_URL directamente.
 
+# Réplica de lectura opcional (streaming replication): DATABASE_REPLICA_URL, o
+# DB_REPLICA_HOST/DB_REPLICA_PORT con el resto de variables DB_*.
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+if not DATABASE_REPLICA_URL and os.getenv("DB_REPLICA_HOST"):
+    DATABASE_REPLICA_URL = make_url(DATABASE_URL).set(
+        host=os.getenv("DB_REPLICA_HOST"), port=int(os.getenv("DB_REPLICA_PORT", "5432"))
+    ).render_as_string(hide_password=False)
+
+# Pool de conexiones (por worker y por engine). Sin pre-ping por defecto: en
+# vez de un SELECT 1 en cada checkout, las conexiones se reciclan tras
+# DB_POOL_RECYCLE segundos y una desconexión detectada invalida el pool
+# (ver app.metricas_pool).
+POOL = dict(
+    pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+    pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    pool_pre_ping=os.getenv("DB_POOL_PRE_PING") == "1",
+)
+
 # Crear el engine y la sesión
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+engine = create_engine(DATABASE_URL, poolclass=PoolMedido, **POOL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+instrumentar("sync", engine)
+
+# Engine asíncrono (psycopg 3 en modo async) para las rutas públicas de lectura:
+# mientras esperan a PostgreSQL no ocupan un hilo del threadpool de Starlette.
+# El código síncrono existente (ensamblador, filtros) se reutiliza con
+# `await db.run_sync(funcion, ...)`.
+async_engine = create_async_engine(DATABASE_URL, poolclass=PoolMedidoAsync, **POOL)
+instrumentar("async", async_engine)
+
+async_engine_replica = None
+if DATABASE_REPLICA_URL:
+    async_engine_replica = create_async_engine(DATABASE_REPLICA_URL, poolclass=PoolMedidoAsync, **POOL)
+    instrumentar("replica", async_engine_replica)
+
+
+class SesionEnrutada(Session):
+    """
+    Con `info={"replica": True}` las SELECT van a la réplica (si hay); las
+    escrituras, los flush, `SELECT ... FOR UPDATE` y el SQL textual, al primario.
+    La deciden las rutas de lectura (ver app.replica); las sesiones de
+    `SessionLocal` usan siempre el primario.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            async_engine_replica is not None
+            and self.info.get("replica")
+            and not self._flushing
+            and getattr(clause, "is_select", False)
+            and getattr(clause, "_for_update_arg", None) is None
+        ):
+            return async_engine_replica.sync_engine
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, sync_session_class=SesionEnrutada, autoflush=False, expire_on_commit=False,
+)
 
 # Clase base para los modelos
 Base = declarative_base()
@@ -0,0 +1,48 @@
+"""
+Búsqueda de texto completo sobre noticias (PostgreSQL tsvector).
+
+`noticias.busqueda` se mantiene con un trigger (ver `esquema_db.py`) a partir de
+título (peso A), resumen (peso B) y contenido sin etiquetas HTML (peso C),
+usando la configuración `es_unaccent` (español + unaccent).
+"""
+
+from sqlalchemy import func, literal_column
+from sqlalchemy.orm import Session
+from app import modelos
+
+CONFIG_TS = literal_column("'es_unaccent'::regconfig")
+
+# Mismo filtrado de HTML que usa el trigger, para generar fragmentos
+_PATRON_HTML = r'<[^>]*>|&[a-zA-Z#0-9]+;'
+
+_OPCIONES_FRAGMENTO = 'MaxFragments=2, MaxWords=30, MinWords=10, StartSel=<mark>, StopSel=</mark>'
+
+
+def consulta_ts(texto: str):
+    """Convierte el texto del usuario en tsquery (acepta "frases", OR y -exclusiones)."""
+    return func.websearch_to_tsquery(CONFIG_TS, texto)
+
+
+def filtrar(query, tsq):
+    return query.filter(modelos.Noticia.busqueda.op('@@')(tsq))
+
+
+def relevancia(tsq):
+    return func.ts_rank(modelos.Noticia.busqueda, tsq)
+
+
+def fragmentos(db: Session, ids: list[int], texto: str) -> dict[int, str]:
+    """Fragmentos resaltados con <mark> para las noticias indicadas (una sola consulta)."""
+    if not ids:
+        return {}
+    tsq = consulta_ts(texto)
+    texto_plano = func.regexp_replace(modelos.Noticia.contenido, _PATRON_HTML, ' ', 'g')
+    filas = (
+        db.query(
+            modelos.Noticia.id,
+            func.ts_headline(CONFIG_TS, texto_plano, tsq, _OPCIONES_FRAGMENTO),
+        )
+        .filter(modelos.Noticia.id.in_(ids))
+        .all()
+    )
+    return {fila[0]: fila[1] for fila in filas}
@@ -0,0 +1,173 @@
+"""
+Caché en memoria del proceso (por worker de uvicorn) con desalojo LRU y TTL opcional.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+
+# Verdadero durante una petición que debe leer datos recién escritos (ver
+# app.replica): las cachés `omitible` se comportan como vacías.
+omitir_cache: ContextVar[bool] = ContextVar("omitir_cache", default=False)
+
+
+class CacheLRU:
+    """
+    Diccionario acotado a `max_entradas` que descarta el elemento menos usado
+    recientemente. Si `ttl` (segundos) está definido, las entradas caducan.
+    Seguro para hilos: las rutas síncronas de FastAPI corren en un threadpool.
+    """
+
+    def __init__(self, max_entradas: int = 1000, ttl: float | None = None, omitible: bool = True):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.omitible = omitible
+        self._datos: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def obtener(self, clave, defecto=None):
+        if self.omitible and omitir_cache.get():
+            return defecto
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return defecto
+            valor, expira = entrada
+            if expira is not None and expira < time.monotonic():
+                del self._datos[clave]
+                self.fallos += 1
+                return defecto
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return valor
+
+    def guardar(self, clave, valor) -> None:
+        expira = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._datos[clave] = (valor, expira)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+                self.desalojos += 1
+
+    def descartar(self, clave) -> None:
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "entradas": len(self._datos),
+                "max_entradas": self.max_entradas,
+                "ttl": self.ttl,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "desalojos": self.desalojos,
+            }
+
+
+# Filtros que la consulta trata sin distinguir mayúsculas; el resto (cursor,
+# slug...) se guarda tal cual: son valores opacos o distinguen mayúsculas.
+PARAMETROS_SIN_MAYUSCULAS = {"buscar", "categoria"}
+
+
+def clave_cache(nombre: str, **params) -> tuple:
+    """Clave normalizada: nombre de la ruta + parámetros no nulos ordenados."""
+    normalizados = []
+    for k, v in params.items():
+        if v is None:
+            continue
+        if k in PARAMETROS_SIN_MAYUSCULAS and isinstance(v, str):
+            v = v.strip().lower()
+        normalizados.append((k, v))
+    return (nombre, *sorted(normalizados))
+
+
+# ==========================
+# Cachés de endpoints públicos
+# ==========================
+# Cada worker tiene su propia copia: las invalidaciones sólo alcanzan al worker
+# que atendió la escritura; el TTL acota lo que tardan en verlo los demás.
+
+cache_noticias = CacheLRU(
+    max_entradas=int(os.getenv("CACHE_NOTICIAS_MAX", "500")),
+    ttl=float(os.getenv("CACHE_NOTICIAS_TTL", "30")),
+)
+cache_categorias = CacheLRU(max_entradas=8, ttl=float(os.getenv("CACHE_CATEGORIAS_TTL", "300")))
+cache_sugerencias = CacheLRU(max_entradas=2000, ttl=60)
+cache_notas = CacheLRU(max_entradas=64, ttl=float(os.getenv("CACHE_NOTAS_TTL", "30")))
+cache_timeline = CacheLRU(max_entradas=4, ttl=float(os.getenv("CACHE_TIMELINE_TTL", "300")))
+
+# Perfil público de cada autor (`AutorInfo` ya validado) por id de usuario; lo
+# comparten todas las noticias del autor (ver app.ensamblador).
+cache_autores = CacheLRU(
+    max_entradas=int(os.getenv("CACHE_AUTORES_MAX", "1000")),
+    ttl=float(os.getenv("CACHE_AUTORES_TTL", "300")),
+)
+
+# Ids de noticias publicadas ya comprobados, para validar vistas y likes antes
+# de acumularlos en memoria (ver app.contadores). Sólo se guardan los positivos.
+cache_publicadas = CacheLRU(
+    max_entradas=int(os.getenv("CACHE_PUBLICADAS_MAX", "10000")),
+    ttl=float(os.getenv("CACHE_PUBLICADAS_TTL", "300")),
+)
+
+# HTML sanitizado por hash del contenido (ver app.sanitizacion). Sin TTL: el
+# resultado sólo depende de la entrada.
+cache_sanitizado = CacheLRU(max_entradas=int(os.getenv("CACHE_SANITIZAR_MAX", "64")), omitible=False)
+
+CACHES: dict[str, CacheLRU] = {
+    "noticias": cache_noticias,
+    "categorias": cache_categorias,
+    "sugerencias": cache_sugerencias,
+    "notas": cache_notas,
+    "timeline": cache_timeline,
+    "autores": cache_autores,
+    "publicadas": cache_publicadas,
+    "sanitizado": cache_sanitizado,
+}
+
+
+def invalidar_noticias() -> None:
+    """Llamar tras crear/editar/eliminar noticias o cambiar su imagen."""
+    cache_noticias.limpiar()
+    cache_sugerencias.limpiar()
+    cache_publicadas.limpiar()
+
+
+def invalidar_categorias() -> None:
+    # Los listados de noticias incluyen el nombre de la categoría
+    cache_categorias.limpiar()
+    cache_noticias.limpiar()
+
+
+def invalidar_autor(usuario_id: int) -> None:
+    """Llamar tras cambiar el perfil, avatar, nombre o rol de un usuario."""
+    cache_autores.descartar(usuario_id)
+    # Los listados de noticias incluyen el bloque autor_info
+    cache_noticias.limpiar()
+
+
+def invalidar_notas() -> None:
+    cache_notas.limpiar()
+
+
+def invalidar_timeline() -> None:
+    cache_timeline.limpiar()
+
+
+def estadisticas_caches() -> dict:
+    return {nombre: c.estadisticas() for nombre, c in CACHES.items()}
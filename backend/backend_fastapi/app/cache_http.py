@@ -0,0 +1,91 @@
+"""
+GET condicional (ETag / Last-Modified / 304) y cabeceras Cache-Control.
+
+Las rutas públicas serializan su respuesta una sola vez a `RespuestaCacheable`
+(cuerpo JSON + ETag + Last-Modified) y la guardan en las cachés de `app.cache`;
+las peticiones siguientes se responden con esos bytes o con 304 sin volver a
+serializar.
+
+Last-Modified sólo se envía para recursos individuales (detalle de noticia).
+En un listado, el máximo `updated_at` de sus elementos no cambia (o retrocede)
+al borrar, despublicar o enviar a la papelera uno de ellos, y un cliente que
+sólo enviara If-Modified-Since recibiría un 304 con la lista vieja; los
+listados se validan sólo con el ETag, que depende del cuerpo completo.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, NamedTuple
+
+from fastapi import Request, Response
+
+from app.serializacion import a_json
+from app.replica import COOKIE as COOKIE_PRIMARIO, hay_replica
+
+# Para quien acaba de escribir (cookie de app.replica): nada de copias guardadas
+POLITICA_PRIMARIO = "private, no-cache"
+
+# Políticas por tipo de ruta (navegadores y Caddy)
+POLITICAS: dict[str, str] = {
+    "noticia": "public, max-age=60, stale-while-revalidate=300",
+    "listado": "public, max-age=30, stale-while-revalidate=120",
+    "categorias": "public, max-age=300",
+    "notas": "public, max-age=30, stale-while-revalidate=120",
+    "timeline": "public, max-age=300, stale-while-revalidate=600",
+}
+
+
+class RespuestaCacheable(NamedTuple):
+    cuerpo: bytes
+    etag: str
+    ultima_modificacion: datetime | None
+    cabeceras: dict[str, str]
+
+
+def preparar(datos: Any, ultima_modificacion: datetime | None = None,
+             cabeceras: dict[str, str] | None = None) -> RespuestaCacheable:
+    """Serializa `datos` a JSON y calcula un ETag fuerte a partir del cuerpo."""
+    cuerpo = a_json(datos)
+    etag = '"' + hashlib.blake2b(cuerpo, digest_size=16).hexdigest() + '"'
+    if ultima_modificacion is not None and ultima_modificacion.tzinfo is None:
+        ultima_modificacion = ultima_modificacion.replace(tzinfo=timezone.utc)
+    return RespuestaCacheable(cuerpo, etag, ultima_modificacion, cabeceras or {})
+
+
+def _no_modificado(request: Request, entrada: RespuestaCacheable) -> bool:
+    si_no_coincide = request.headers.get("if-none-match")
+    if si_no_coincide:
+        # If-None-Match usa comparación débil (RFC 9110 §13.1.2)
+        etiquetas = {e.strip().removeprefix("W/") for e in si_no_coincide.split(",")}
+        return "*" in etiquetas or entrada.etag in etiquetas
+    si_modificado = request.headers.get("if-modified-since")
+    if si_modificado and entrada.ultima_modificacion is not None:
+        try:
+            desde = parsedate_to_datetime(si_modificado)
+        except (TypeError, ValueError):
+            return False
+        return entrada.ultima_modificacion.replace(microsecond=0) <= desde
+    return False
+
+
+def responder(request: Request, entrada: RespuestaCacheable, politica: str) -> Response:
+    cabeceras = {
+        "ETag": entrada.etag,
+        "Cache-Control": POLITICAS[politica],
+        **entrada.cabeceras,
+    }
+    if hay_replica():
+        # La respuesta depende de la cookie de lectura del primario: sin Vary, el
+        # navegador del editor (o una caché compartida) reutilizaría la copia de
+        # antes de guardar sin preguntar al servidor
+        cabeceras["Vary"] = "Cookie"
+        if COOKIE_PRIMARIO in request.cookies:
+            cabeceras["Cache-Control"] = POLITICA_PRIMARIO
+    if entrada.ultima_modificacion is not None:
+        cabeceras["Last-Modified"] = format_datetime(
+            entrada.ultima_modificacion.astimezone(timezone.utc), usegmt=True
+        )
+    if _no_modificado(request, entrada):
+        return Response(status_code=304, headers=cabeceras)
+    return Response(content=entrada.cuerpo, media_type="application/json", headers=cabeceras)
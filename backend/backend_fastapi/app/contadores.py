@@ -0,0 +1,309 @@
+"""
+Contadores de interacción.
+
+- `buffer_vistas` acumula en memoria las vistas de cada noticia y las vuelca cada
+  `VISTAS_FLUSH_SEGUNDOS` con un único UPDATE por lote. Cada worker de uvicorn
+  tiene su propio buffer; como se suman deltas, varios workers no se pisan.
+- `visitantes_unicos` mantiene sketches HyperLogLog por noticia y día (visitantes
+  únicos aproximados) y al volcar los fusiona también por categoría y sitio.
+- `filtro_likes` recuerda (IP, noticia) durante una ventana de tiempo para
+  rechazar likes repetidos sin tocar la base de datos.
+"""
+
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.exc import DataError
+from sqlalchemy.orm import Session
+from app.base_datos import engine
+from app.cache import cache_publicadas
+from app.hyperloglog import HyperLogLog
+from app import tendencias
+
+_SQL_SUMAR_VISTAS = text("""
+    UPDATE noticias AS n
+    SET visitas = COALESCE(n.visitas, 0) + v.delta,
+        tendencia = log2_sumar(n.tendencia,
+            ln(v.delta * CAST(:peso AS double precision)) / ln(2) + CAST(:exponente AS double precision))
+    FROM unnest(CAST(:ids AS integer[]), CAST(:deltas AS integer[])) AS v(id, delta)
+    WHERE n.id = v.id
+""")
+
+
+_SQL_CREAR_SKETCHES = text("""
+    INSERT INTO visitantes_unicos (ambito, dia, sketch)
+    SELECT k.ambito, k.dia, ''::bytea
+    FROM unnest(CAST(:ambitos AS text[]), CAST(:dias AS date[])) AS k(ambito, dia)
+    ORDER BY k.ambito, k.dia
+    ON CONFLICT (ambito, dia) DO NOTHING
+""")
+
+# Bloquea las filas para que dos workers no se pisen al fusionar
+_SQL_LEER_SKETCHES = text("""
+    SELECT v.ambito, v.dia, v.sketch
+    FROM visitantes_unicos v
+    JOIN unnest(CAST(:ambitos AS text[]), CAST(:dias AS date[])) AS k(ambito, dia)
+      ON v.ambito = k.ambito AND v.dia = k.dia
+    ORDER BY v.ambito, v.dia
+    FOR UPDATE OF v
+""")
+
+_SQL_GUARDAR_SKETCH = text(
+    "UPDATE visitantes_unicos SET sketch = :sketch WHERE ambito = :ambito AND dia = :dia"
+)
+
+
+def noticia_publicada(db: Session, noticia_id: int) -> bool:
+    """
+    Si la noticia existe y está publicada (fuera de la papelera), para no
+    acumular vistas, sketches ni likes de ids falsos, borradores o borradas.
+    Sólo se cachean los positivos: una noticia recién creada o restaurada en
+    otro worker se acepta en cuanto está publicada.
+    """
+    if cache_publicadas.obtener(noticia_id):
+        return True
+    publicada = db.execute(
+        text("SELECT 1 FROM noticias WHERE id = :id AND publicada"), {"id": noticia_id}
+    ).first() is not None
+    if publicada:
+        cache_publicadas.guardar(noticia_id, True)
+    return publicada
+
+
+class SketchesVisitantes:
+    """
+    Un HyperLogLog (4 KB) por (noticia, día) en memoria. Registrar un visitante es
+    O(1); al volcar, cada sketch se fusiona con el persistido y con los de su
+    categoría y el del sitio, de modo que esos totales no cuentan dos veces a
+    quien leyó varias noticias.
+    """
+
+    def __init__(self):
+        self._sketches: dict[tuple[int, date], HyperLogLog] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, noticia_id: int, visitante: str) -> None:
+        clave = (noticia_id, datetime.now(timezone.utc).date())
+        with self._lock:
+            sketch = self._sketches.get(clave)
+            if sketch is None:
+                sketch = self._sketches[clave] = HyperLogLog()
+            sketch.agregar(visitante)
+
+    def _reintegrar(self, sketches: dict) -> None:
+        with self._lock:
+            for clave, sketch in sketches.items():
+                actual = self._sketches.get(clave)
+                self._sketches[clave] = actual.fusionar(sketch) if actual else sketch
+
+    def volcar(self) -> int:
+        with self._lock:
+            sketches, self._sketches = self._sketches, {}
+        if not sketches:
+            return 0
+        try:
+            with engine.begin() as conn:
+                ids = sorted({noticia_id for noticia_id, _ in sketches})
+                categorias = dict(conn.execute(
+                    text("SELECT id, categoria_id FROM noticias WHERE id = ANY(:ids)"), {"ids": ids}
+                ).all())
+
+                # Fusionar en memoria por ámbito antes de tocar la base de datos
+                por_ambito: dict[tuple[str, date], HyperLogLog] = {}
+                for (noticia_id, dia), sketch in sketches.items():
+                    if noticia_id not in categorias:
+                        continue  # noticia inexistente o eliminada
+                    ambitos = [f"noticia:{noticia_id}", "sitio"]
+                    if categorias.get(noticia_id):
+                        ambitos.append(f"categoria:{categorias[noticia_id]}")
+                    for ambito in ambitos:
+                        acumulado = por_ambito.setdefault((ambito, dia), HyperLogLog())
+                        acumulado.fusionar(sketch)
+
+                claves = sorted(por_ambito)
+                if not claves:
+                    return 0
+                params = {"ambitos": [a for a, _ in claves], "dias": [d for _, d in claves]}
+                conn.execute(_SQL_CREAR_SKETCHES, params)
+                for ambito, dia, datos in conn.execute(_SQL_LEER_SKETCHES, params):
+                    por_ambito[(ambito, dia)].fusionar(HyperLogLog.desde_bytes(datos))
+                conn.execute(_SQL_GUARDAR_SKETCH, [
+                    {"ambito": a, "dia": d, "sketch": por_ambito[(a, d)].a_bytes()} for a, d in claves
+                ])
+        except DataError as e:
+            # Reintentarlo fallaría igual y bloquearía los volcados siguientes
+            print(f"[vistas] Descartados {len(sketches)} sketches de visitantes: {e}")
+            return 0
+        except Exception as e:
+            print(f"[vistas] Error volcando visitantes únicos: {e}")
+            self._reintegrar(sketches)
+            return 0
+        return len(sketches)
+
+
+def visitantes_por_ambito(db: Session, ambitos: list[str], desde: date) -> dict[str, int]:
+    """Visitantes únicos de cada ámbito desde `desde` (fusiona los sketches diarios)."""
+    if not ambitos:
+        return {}
+    filas = db.execute(
+        text("SELECT ambito, sketch FROM visitantes_unicos WHERE ambito = ANY(:ambitos) AND dia >= :desde"),
+        {"ambitos": ambitos, "desde": desde},
+    ).all()
+    fusionados: dict[str, HyperLogLog] = {}
+    for ambito, datos in filas:
+        sketch = HyperLogLog.desde_bytes(datos)
+        fusionados[ambito] = fusionados[ambito].fusionar(sketch) if ambito in fusionados else sketch
+    return {ambito: (fusionados[ambito].contar() if ambito in fusionados else 0) for ambito in ambitos}
+
+
+def visitantes_por_dia(db: Session, ambito: str, desde: date) -> list[dict]:
+    filas = db.execute(
+        text("SELECT dia, sketch FROM visitantes_unicos WHERE ambito = :ambito AND dia >= :desde ORDER BY dia"),
+        {"ambito": ambito, "desde": desde},
+    ).all()
+    return [{"dia": dia.isoformat(), "visitantes": HyperLogLog.desde_bytes(datos).contar()} for dia, datos in filas]
+
+
+class BufferVistas:
+    def __init__(self, intervalo: float = 10.0):
+        self.intervalo = intervalo
+        self._pendientes: Counter = Counter()
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._hilo: threading.Thread | None = None
+        self.visitantes = SketchesVisitantes()
+
+    def registrar(self, noticia_id: int, cantidad: int = 1, visitante: str | None = None) -> None:
+        with self._lock:
+            self._pendientes[noticia_id] += cantidad
+        if visitante:
+            self.visitantes.registrar(noticia_id, visitante)
+
+    def pendientes(self) -> int:
+        with self._lock:
+            return sum(self._pendientes.values())
+
+    def _sumar(self, deltas: dict) -> None:
+        ids = sorted(deltas)
+        with engine.begin() as conn:
+            conn.execute(_SQL_SUMAR_VISTAS, {
+                "ids": ids, "deltas": [deltas[i] for i in ids],
+                "peso": tendencias.PESO_VISTA, "exponente": tendencias.exponente_actual(),
+            })
+
+    def volcar(self) -> int:
+        """
+        Escribe los deltas acumulados. Si falla la conexión, se reintegran para
+        el próximo ciclo; si el lote tiene datos inválidos (DataError), se
+        escribe id a id y se descartan los que fallen, para que un valor malo
+        no bloquee todos los volcados siguientes.
+        """
+        self.visitantes.volcar()
+        with self._lock:
+            deltas, self._pendientes = self._pendientes, Counter()
+        if not deltas:
+            return 0
+        try:
+            self._sumar(deltas)
+        except DataError:
+            return self._volcar_por_separado(deltas)
+        except Exception as e:
+            print(f"[vistas] Error volcando {len(deltas)} contadores: {e}")
+            with self._lock:
+                self._pendientes.update(deltas)
+            return 0
+        return len(deltas)
+
+    def _volcar_por_separado(self, deltas: dict) -> int:
+        escritos = 0
+        for noticia_id, delta in deltas.items():
+            try:
+                self._sumar({noticia_id: delta})
+                escritos += 1
+            except DataError as e:
+                print(f"[vistas] Descartadas {delta} vistas de la noticia {noticia_id}: {e}")
+            except Exception as e:
+                print(f"[vistas] Error volcando la noticia {noticia_id}: {e}")
+                with self._lock:
+                    self._pendientes[noticia_id] += delta
+        return escritos
+
+    def _bucle(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            self.volcar()
+
+    def iniciar(self) -> None:
+        if self._hilo and self._hilo.is_alive():
+            return
+        self._parar.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="buffer-vistas", daemon=True)
+        self._hilo.start()
+
+    def detener(self) -> None:
+        """Detiene el hilo y vuelca lo pendiente (apagado ordenado)."""
+        self._parar.set()
+        if self._hilo:
+            self._hilo.join(timeout=self.intervalo + 5)
+        self.volcar()
+
+
+buffer_vistas = BufferVistas(intervalo=float(os.getenv("VISTAS_FLUSH_SEGUNDOS", "10")))
+
+
+class FiltroBloomRotativo:
+    """
+    Filtro de Bloom con dos generaciones. Una clave se recuerda entre `ventana`
+    y 2×`ventana` segundos; al rotar, la generación anterior se descarta.
+    Puede dar falsos positivos (≈ `tasa_error`), nunca falsos negativos.
+    Memoria: ~1.2 MB por generación para 1 millón de claves al 1 %.
+    """
+
+    def __init__(self, capacidad: int = 100_000, tasa_error: float = 0.01, ventana: float = 3600):
+        self.bits = max(8, int(-capacidad * math.log(tasa_error) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.bits / capacidad * math.log(2)))
+        self.ventana = ventana
+        self._actual = bytearray((self.bits + 7) // 8)
+        self._anterior = bytearray((self.bits + 7) // 8)
+        self._rotado = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _posiciones(self, clave: str) -> list[int]:
+        # Doble hashing (Kirsch-Mitzenmacher) a partir de un único digest
+        digest = hashlib.blake2b(clave.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    @staticmethod
+    def _contiene(bits: bytearray, posiciones: list[int]) -> bool:
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in posiciones)
+
+    def _rotar_si_toca(self) -> None:
+        ahora = time.monotonic()
+        if ahora - self._rotado >= self.ventana:
+            self._anterior = self._actual
+            self._actual = bytearray(len(self._anterior))
+            self._rotado = ahora
+
+    def agregar_si_nueva(self, clave: str) -> bool:
+        """Marca la clave; devuelve False si ya estaba presente en la ventana."""
+        posiciones = self._posiciones(clave)
+        with self._lock:
+            self._rotar_si_toca()
+            if self._contiene(self._actual, posiciones) or self._contiene(self._anterior, posiciones):
+                return False
+            for p in posiciones:
+                self._actual[p >> 3] |= 1 << (p & 7)
+            return True
+
+
+filtro_likes = FiltroBloomRotativo(
+    capacidad=int(os.getenv("LIKES_FILTRO_CAPACIDAD", "200000")),
+    ventana=float(os.getenv("LIKES_VENTANA_SEGUNDOS", "3600")),
+)
@@ -0,0 +1,253 @@
+"""
+Construcción de respuestas `NoticiaRespuesta` para conjuntos de noticias.
+
+Resuelve autores y (opcionalmente) la última edición de todas las noticias de
+una página con un número fijo de consultas, en lugar de 3-4 consultas por fila.
+Categorías, estados y roles salen de `app.referencias`, sin consultas, y los
+perfiles de autor (`AutorInfo` ya validado) de `cache_autores`: sólo se leen de
+la base de datos los que no están en caché.
+
+Los listados usan el modo resumen (`NoticiaResumen`): la consulta se proyecta
+con `COLUMNAS_RESUMEN` y no lee `contenido` ni los blobs.
+
+El listado admin usa `consulta_admin`: una sola sentencia con JOINs y un
+LATERAL para la última edición, pensada para recorrerse con `yield_per`.
+"""
+
+from typing import NamedTuple
+
+from sqlalchemy import select, true
+from sqlalchemy.orm import Session, load_only, aliased
+from app import modelos, esquemas
+from app.relacionadas import relacionadas_de
+from app.cache import cache_autores
+from app.referencias import nombre_categoria, nombre_estado, nombre_rol
+
+# Columnas necesarias para construir un NoticiaResumen
+COLUMNAS_RESUMEN = (
+    modelos.Noticia.slug, modelos.Noticia.titulo, modelos.Noticia.resumen,
+    modelos.Noticia.fecha_publicacion, modelos.Noticia.imagen_principal,
+    modelos.Noticia.categoria_id, modelos.Noticia.autor_id, modelos.Noticia.estado_id,
+    modelos.Noticia.visitas, modelos.Noticia.likes, modelos.Noticia.shares,
+    modelos.Noticia.destacada, modelos.Noticia.updated_at, modelos.Noticia.tiempo_lectura,
+    modelos.Noticia.fecha_programada, modelos.Noticia.deleted_at,
+)
+
+
+def proyectar_resumen(query):
+    """Limita la consulta de noticias a las columnas del modo resumen."""
+    return query.options(load_only(*COLUMNAS_RESUMEN))
+
+
+class PerfilAutor(NamedTuple):
+    nombre_usuario: str
+    rol_id: int | None
+    info: esquemas.AutorInfo
+
+
+def construir_autor_info(u: modelos.Usuario) -> esquemas.AutorInfo:
+    return esquemas.AutorInfo(
+        nombre=u.nombre_usuario,
+        titulo=u.titulo,
+        descripcion=u.biografia,
+        avatar=u.avatar,
+        nivel=u.nivel,
+        experiencia_años=u.experiencia_años,
+        articulos_total=u.articulos_publicados,
+        seguidores=u.seguidores,
+        precision=u.precision_rating,
+        especialidades=u.especialidades or [],
+        logros=u.logros or [],
+        top_anime=u.anime_favoritos or [],
+        redes_sociales=u.redes_sociales or {},
+        frase=u.frase_personal,
+    )
+
+
+# Perfil público del autor (sin avatar_blob / password_hash)
+COLUMNAS_AUTOR = (
+    modelos.Usuario.nombre_usuario, modelos.Usuario.rol_id, modelos.Usuario.titulo,
+    modelos.Usuario.biografia, modelos.Usuario.avatar, modelos.Usuario.nivel,
+    modelos.Usuario.experiencia_años, modelos.Usuario.articulos_publicados,
+    modelos.Usuario.seguidores, modelos.Usuario.precision_rating,
+    modelos.Usuario.especialidades, modelos.Usuario.logros,
+    modelos.Usuario.anime_favoritos, modelos.Usuario.redes_sociales,
+    modelos.Usuario.frase_personal,
+)
+
+
+def perfil_autor(u: modelos.Usuario) -> PerfilAutor:
+    """Construye el perfil de `u` (con `COLUMNAS_AUTOR` cargadas) y lo guarda en caché."""
+    perfil = PerfilAutor(u.nombre_usuario, u.rol_id, construir_autor_info(u))
+    cache_autores.guardar(u.id, perfil)
+    return perfil
+
+
+def _perfiles(db: Session, ids: set[int]) -> dict[int, PerfilAutor]:
+    """Perfiles por id: los que están en caché y, en una consulta, los que faltan."""
+    perfiles = {}
+    faltan = set()
+    for usuario_id in ids:
+        perfil = cache_autores.obtener(usuario_id)
+        if perfil is None:
+            faltan.add(usuario_id)
+        else:
+            perfiles[usuario_id] = perfil
+    for u in _por_id(db, modelos.Usuario, faltan, *COLUMNAS_AUTOR).values():
+        perfiles[u.id] = perfil_autor(u)
+    return perfiles
+
+
+def _construir(n, categoria, estado, autor: PerfilAutor | None, rol, editor, editado_en, resumen, relacionadas=None):
+    campos = dict(
+        id=n.id,
+        slug=n.slug,
+        titulo=n.titulo,
+        resumen=n.resumen,
+        fecha=n.fecha_publicacion,
+        imagen=n.imagen_principal,
+        categoria=categoria,
+        vistas=n.visitas or 0,
+        likes=n.likes or 0,
+        compartidos=n.shares or 0,
+        destacada=bool(n.destacada),
+        autor_id=n.autor_id,
+        autor_info=autor.info if autor else None,
+        estado=estado,
+        fecha_programada=n.fecha_programada,
+        fecha_eliminacion=n.deleted_at,
+        fecha_actualizacion=n.updated_at,
+        last_edited_by=editor,
+        last_edited_at=editado_en,
+        tiempo_lectura=n.tiempo_lectura or 0,
+        es_internacional=rol == 'internacional',
+    )
+    if resumen:
+        return esquemas.NoticiaResumen(**campos)
+    return esquemas.NoticiaRespuesta(
+        **campos,
+        contenido=n.contenido,
+        audio_url=n.audio_url,
+        permitir_comentarios=n.permite_comentarios if n.permite_comentarios is not None else True,
+        destacado=n.destacado,
+        fecha_creacion=n.created_at,
+        articulos_relacionados=relacionadas or [],
+    )
+
+
+def _por_id(db: Session, modelo, ids: set[int], *columnas) -> dict:
+    if not ids:
+        return {}
+    query = db.query(modelo).filter(modelo.id.in_(ids))
+    if columnas:
+        query = query.options(load_only(*columnas))
+    return {obj.id: obj for obj in query.all()}
+
+
+def _ultimas_ediciones(db: Session, noticia_ids: set[int]) -> dict[int, modelos.NoticiaHistorial]:
+    """Última entrada de historial por noticia en una sola consulta (DISTINCT ON)."""
+    if not noticia_ids:
+        return {}
+    H = modelos.NoticiaHistorial
+    filas = (
+        db.query(H)
+        .filter(H.noticia_id.in_(noticia_ids))
+        .order_by(H.noticia_id, H.created_at.desc())
+        .distinct(H.noticia_id)
+        .all()
+    )
+    return {h.noticia_id: h for h in filas}
+
+
+def ensamblar_noticias(
+    db: Session,
+    noticias: list[modelos.Noticia],
+    con_ultima_edicion: bool = False,
+    estado_por_defecto: str | None = 'publicado',
+    resumen: bool = False,
+) -> list[esquemas.NoticiaRespuesta] | list[esquemas.NoticiaResumen]:
+    """
+    Convierte noticias ORM en `NoticiaRespuesta` usando búsquedas por lotes.
+
+    - `con_ultima_edicion`: añade `last_edited_by` / `last_edited_at` desde el historial.
+    - `estado_por_defecto`: estado textual si la noticia no tiene estado o éste no existe.
+    - `resumen`: devuelve `NoticiaResumen` (las noticias pueden venir de `proyectar_resumen`).
+      Si no, incluye `articulos_relacionados` (ids precalculados).
+    """
+    if not noticias:
+        return []
+
+    ultimas = _ultimas_ediciones(db, {n.id for n in noticias}) if con_ultima_edicion else {}
+    relacionadas = {} if resumen else relacionadas_de(db, [n.id for n in noticias])
+
+    usuario_ids = {n.autor_id for n in noticias if n.autor_id}
+    usuario_ids |= {h.usuario_id for h in ultimas.values() if h.usuario_id}
+    usuarios = _perfiles(db, usuario_ids)
+
+    resultado = []
+    for n in noticias:
+        autor = usuarios.get(n.autor_id)
+        last = ultimas.get(n.id)
+        editor = usuarios.get(last.usuario_id) if last and last.usuario_id else None
+
+        resultado.append(_construir(
+            n,
+            categoria=nombre_categoria(n.categoria_id),
+            estado=nombre_estado(n.estado_id) or estado_por_defecto,
+            autor=autor,
+            rol=nombre_rol(autor.rol_id) if autor else None,
+            editor=editor.nombre_usuario if editor else None,
+            editado_en=last.created_at if last else None,
+            resumen=resumen,
+            relacionadas=relacionadas.get(n.id),
+        ))
+    return resultado
+
+
+def ensamblar_noticia(db: Session, noticia: modelos.Noticia, **kwargs) -> esquemas.NoticiaRespuesta:
+    return ensamblar_noticias(db, [noticia], **kwargs)[0]
+
+
+def consulta_admin(db: Session, incluir_contenido: bool = False):
+    """
+    Noticias con categoría, estado, autor, rol y última edición en una sola
+    sentencia. Cada fila se convierte con `fila_admin`.
+    """
+    N = modelos.Noticia
+    H = modelos.NoticiaHistorial
+    Editor = aliased(modelos.Usuario)
+    ultima = (
+        select(H.usuario_id, H.created_at)
+        .where(H.noticia_id == N.id)
+        .order_by(H.created_at.desc())
+        .limit(1)
+        .lateral("ultima_edicion")
+    )
+    query = (
+        db.query(
+            N,
+            modelos.Categoria.nombre,
+            modelos.EstadoNoticia.nombre,
+            modelos.Usuario,
+            modelos.Rol.nombre,
+            Editor.nombre_usuario,
+            ultima.c.created_at,
+        )
+        .outerjoin(modelos.Categoria, modelos.Categoria.id == N.categoria_id)
+        .outerjoin(modelos.EstadoNoticia, modelos.EstadoNoticia.id == N.estado_id)
+        .outerjoin(modelos.Usuario, modelos.Usuario.id == N.autor_id)
+        .outerjoin(modelos.Rol, modelos.Rol.id == modelos.Usuario.rol_id)
+        .outerjoin(ultima, true())
+        .outerjoin(Editor, Editor.id == ultima.c.usuario_id)
+        .options(load_only(*COLUMNAS_AUTOR))
+    )
+    if not incluir_contenido:
+        query = proyectar_resumen(query)
+    return query
+
+
+def fila_admin(fila, resumen: bool = True):
+    n, categoria, estado, autor, rol, editor, editado_en = fila
+    if autor is not None:
+        autor = cache_autores.obtener(autor.id) or perfil_autor(autor)
+    return _construir(n, categoria, estado or 'publicado', autor, rol, editor, editado_en, resumen)
@@ -0,0 +1,262 @@
+"""
+Migraciones de esquema que `Base.metadata.create_all` no aplica sobre tablas
+existentes (índices, columnas derivadas, funciones y triggers).
+
+- Cada migración tiene un nombre y se registra en `schema_migraciones` al
+  aplicarse; en arranques posteriores se salta. Las nuevas se añaden siempre al
+  final de `MIGRACIONES` y las ya publicadas no se renombran.
+- Los índices se crean con `CREATE INDEX CONCURRENTLY` (sin bloquear escrituras),
+  por eso el ejecutor trabaja en autocommit. Si una creación concurrente se
+  interrumpe deja un índice inválido, que se elimina antes de reintentar.
+- Todas las sentencias son idempotentes (IF NOT EXISTS / OR REPLACE): una
+  migración que falla no se registra y se reintenta en el siguiente arranque.
+- Un advisory lock evita que varios workers migren a la vez. Los que esperan
+  sondean con `pg_try_advisory_lock` en lugar de bloquearse en una consulta,
+  porque CREATE INDEX CONCURRENTLY espera a las transacciones abiertas.
+
+Se ejecutan al arrancar la app (MIGRACIONES_AL_ARRANCAR=0 lo desactiva) o a
+mano antes de desplegar: `python -m app.esquema_db`.
+"""
+
+import os
+import re
+import time
+
+from sqlalchemy import text
+from app.base_datos import engine
+
+# Clave del advisory lock de migraciones
+BLOQUEO = 7_201_803
+ESPERA_BLOQUEO = 1.0
+# Filas (por rango de id) que actualiza cada transacción de un relleno
+LOTE_RELLENO = 5000
+
+
+def _relleno_por_lotes(tabla: str, asignacion: str, condicion: str) -> str:
+    """
+    UPDATE de relleno recorriendo la tabla por rangos de id y confirmando cada
+    lote: un único UPDATE sobre toda la tabla bloquea todas sus filas hasta el
+    final y genera todo el WAL de golpe. El COMMIT dentro del DO funciona porque
+    el ejecutor trabaja en autocommit. Las filas insertadas mientras tanto ya
+    las rellena el trigger correspondiente.
+    """
+    return f"""DO $$
+    DECLARE
+        desde bigint;
+        hasta bigint;
+    BEGIN
+        SELECT min(id), max(id) INTO desde, hasta FROM {tabla};
+        WHILE desde <= hasta LOOP
+            UPDATE {tabla} SET {asignacion}
+             WHERE id >= desde AND id < desde + {LOTE_RELLENO} AND ({condicion});
+            COMMIT;
+            desde := desde + {LOTE_RELLENO};
+        END LOOP;
+    END $$"""
+
+
+MIGRACIONES: list[tuple[str, str]] = [
+    # Paginación por cursor (fecha_publicacion, id) en /api/noticias/
+    ("noticias_fecha_publicacion_id", """CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_noticias_fecha_publicacion_id
+       ON noticias (fecha_publicacion DESC, id DESC)"""),
+
+    # Prefijos de slug (app/slugs.py): LIKE 'base%' no usa el índice único
+    # salvo con collation C
+    ("noticias_slug_patron", """CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_noticias_slug_patron
+       ON noticias (slug varchar_pattern_ops)"""),
+
+    # Tendencias (app/tendencias.py): puntuación en escala log2 con forward decay
+    ("noticias_tendencia_columna", "ALTER TABLE noticias ADD COLUMN IF NOT EXISTS tendencia double precision"),
+    ("funcion_log2_sumar", """CREATE OR REPLACE FUNCTION log2_sumar(a double precision, b double precision)
+       RETURNS double precision LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+         SELECT CASE WHEN a IS NULL THEN b WHEN b IS NULL THEN a
+                     ELSE greatest(a, b) + ln(1 + power(2::double precision, -abs(a - b))) / ln(2) END
+       $$"""),
+    ("noticias_tendencia", """CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_noticias_tendencia
+       ON noticias (tendencia DESC NULLS LAST)"""),
+
+    # Conjunto público: publicada = no borrada y estado 'publicado' (o sin estado).
+    # La mantienen triggers, así las lecturas públicas no unen con estados_noticia
+    # y usan el índice parcial ix_noticias_publicadas.
+    ("noticias_publicada_columna",
+     "ALTER TABLE noticias ADD COLUMN IF NOT EXISTS publicada boolean NOT NULL DEFAULT false"),
+    ("funcion_noticia_es_publica", """CREATE OR REPLACE FUNCTION noticia_es_publica(estado integer, borrada timestamptz)
+       RETURNS boolean LANGUAGE sql STABLE AS $$
+         SELECT borrada IS NULL AND (estado IS NULL OR EXISTS (
+             SELECT 1 FROM estados_noticia e WHERE e.id = estado AND lower(e.nombre) = 'publicado'))
+       $$"""),
+    ("funcion_noticias_publicada_actualizar", """CREATE OR REPLACE FUNCTION noticias_publicada_actualizar() RETURNS trigger AS $$
+    BEGIN
+        NEW.publicada := noticia_es_publica(NEW.estado_id, NEW.deleted_at);
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql"""),
+    ("trigger_noticias_publicada", """CREATE OR REPLACE TRIGGER noticias_publicada_trg
+       BEFORE INSERT OR UPDATE OF estado_id, deleted_at ON noticias
+       FOR EACH ROW EXECUTE FUNCTION noticias_publicada_actualizar()"""),
+    # Renombrar un estado cambia qué noticias son públicas
+    ("funcion_estados_noticia_publicada", """CREATE OR REPLACE FUNCTION estados_noticia_publicada_actualizar() RETURNS trigger AS $$
+    BEGIN
+        UPDATE noticias SET publicada = noticia_es_publica(estado_id, deleted_at) WHERE estado_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql"""),
+    ("trigger_estados_noticia_publicada", """CREATE OR REPLACE TRIGGER estados_noticia_publicada_trg
+       AFTER UPDATE OF nombre ON estados_noticia
+       FOR EACH ROW EXECUTE FUNCTION estados_noticia_publicada_actualizar()"""),
+    # Rellenar filas anteriores al trigger, por lotes (ver _relleno_por_lotes)
+    ("noticias_publicada_rellenar", _relleno_por_lotes(
+        "noticias", "publicada = noticia_es_publica(estado_id, deleted_at)",
+        "publicada IS DISTINCT FROM noticia_es_publica(estado_id, deleted_at)")),
+    ("noticias_publicadas", """CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_noticias_publicadas
+       ON noticias (fecha_publicacion DESC, id DESC) WHERE publicada"""),
+    # Papelera (app/papelera.py)
+    ("noticias_papelera", """CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_noticias_papelera
+       ON noticias (deleted_at) WHERE deleted_at IS NOT NULL"""),
+
+    # Publicación programada (app/programador.py): sólo filas pendientes
+    ("noticias_programadas", """CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_noticias_programadas
+       ON noticias (fecha_programada) WHERE fecha_programada IS NOT NULL"""),
+
+    # Última edición por noticia (LATERAL del listado admin, historial)
+    ("noticia_historial_noticia_created", """CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_noticia_historial_noticia_created
+       ON noticia_historial (noticia_id, created_at DESC)"""),
+
+    # Búsqueda de texto completo: configuración española sin acentos.
+    # Si la extensión unaccent no está disponible se usa 'spanish' tal cual.
+    ("configuracion_es_unaccent", """DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'es_unaccent') THEN
+            CREATE TEXT SEARCH CONFIGURATION es_unaccent (COPY = spanish);
+            BEGIN
+                CREATE EXTENSION IF NOT EXISTS unaccent;
+                ALTER TEXT SEARCH CONFIGURATION es_unaccent
+                    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+            EXCEPTION WHEN OTHERS THEN
+                RAISE NOTICE 'unaccent no disponible: es_unaccent no normaliza acentos';
+            END;
+        END IF;
+    END $$"""),
+    ("noticias_busqueda_columna", "ALTER TABLE noticias ADD COLUMN IF NOT EXISTS busqueda tsvector"),
+    ("funcion_noticias_busqueda_actualizar", """CREATE OR REPLACE FUNCTION noticias_busqueda_actualizar() RETURNS trigger AS $$
+    BEGIN
+        NEW.busqueda :=
+            setweight(to_tsvector('es_unaccent', coalesce(NEW.titulo, '')), 'A') ||
+            setweight(to_tsvector('es_unaccent', coalesce(NEW.resumen, '')), 'B') ||
+            setweight(to_tsvector('es_unaccent',
+                regexp_replace(coalesce(NEW.contenido, ''), '<[^>]*>|&[a-zA-Z#0-9]+;', ' ', 'g')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql"""),
+    ("trigger_noticias_busqueda", """CREATE OR REPLACE TRIGGER noticias_busqueda_trg
+       BEFORE INSERT OR UPDATE OF titulo, resumen, contenido ON noticias
+       FOR EACH ROW EXECUTE FUNCTION noticias_busqueda_actualizar()"""),
+    # Rellenar filas anteriores al trigger, por lotes (ver _relleno_por_lotes)
+    ("noticias_busqueda_rellenar", _relleno_por_lotes("noticias", "titulo = titulo", "busqueda IS NULL")),
+    ("noticias_busqueda", "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_noticias_busqueda ON noticias USING gin (busqueda)"),
+
+    # Autocompletado de títulos (/api/noticias/sugerencias) con trigramas.
+    # unaccent() no es IMMUTABLE, por eso se envuelve para poder indexarlo.
+    ("extension_pg_trgm", "CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+    ("funcion_f_unaccent", """DO $$
+    BEGIN
+        CREATE EXTENSION IF NOT EXISTS unaccent;
+        CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+            LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+            AS 'SELECT public.unaccent(''public.unaccent''::regdictionary, $1)';
+    EXCEPTION WHEN OTHERS THEN
+        CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+            LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+            AS 'SELECT $1';
+    END $$"""),
+    ("noticias_titulo_trgm", """CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_noticias_titulo_trgm
+       ON noticias USING gin (f_unaccent(lower(titulo)) gin_trgm_ops)"""),
+
+    # Claves foráneas y filtros de las consultas frecuentes
+    ("noticias_categoria_id", "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_noticias_categoria_id ON noticias (categoria_id)"),
+    ("noticias_autor_id", "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_noticias_autor_id ON noticias (autor_id)"),
+    ("noticias_estado_id", "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_noticias_estado_id ON noticias (estado_id)"),
+    # Listado público filtrado por categoría, en el orden del cursor
+    ("noticias_categoria_publicadas", """CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_noticias_categoria_publicadas
+       ON noticias (categoria_id, fecha_publicacion DESC, id DESC) WHERE publicada"""),
+    # Portada: destacadas publicadas, más recientes primero
+    ("noticias_destacadas", """CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_noticias_destacadas
+       ON noticias (fecha_publicacion DESC, id DESC) WHERE publicada AND destacada"""),
+    ("comentarios_noticia_id", "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_comentarios_noticia_id ON comentarios (noticia_id)"),
+    # Notas activas, más recientes primero
+    ("notas_activa_created", """CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_notas_activa_created
+       ON notas (activa, created_at DESC)"""),
+    ("notas_autor_id", "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_notas_autor_id ON notas (autor_id)"),
+    # Login por usuario o email sin distinguir mayúsculas (rutas_auth.py)
+    ("usuarios_email_lower", "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_usuarios_email_lower ON usuarios (lower(email))"),
+    ("usuarios_nombre_usuario_lower",
+     "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_usuarios_nombre_usuario_lower ON usuarios (lower(nombre_usuario))"),
+]
+
+_PATRON_INDICE_CONCURRENTE = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)", re.IGNORECASE
+)
+
+
+def _descartar_indice_invalido(conn, nombre: str) -> None:
+    """Un CREATE INDEX CONCURRENTLY interrumpido deja el índice creado pero inválido."""
+    invalido = conn.execute(text("""
+        SELECT NOT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = :nombre AND c.relnamespace = current_schema()::regnamespace
+    """), {"nombre": nombre}).scalar()
+    if invalido:
+        conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{nombre}"'))
+
+
+def _aplicar(conn, sentencia: str) -> None:
+    indice = _PATRON_INDICE_CONCURRENTE.search(sentencia)
+    if indice:
+        _descartar_indice_invalido(conn, indice.group(1))
+    conn.execute(text(sentencia))
+
+
+def aplicar_migraciones() -> list[str]:
+    """Aplica las migraciones pendientes. Devuelve los nombres aplicadas."""
+    aplicadas: list[str] = []
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        while not conn.execute(text("SELECT pg_try_advisory_lock(:clave)"), {"clave": BLOQUEO}).scalar():
+            time.sleep(ESPERA_BLOQUEO)
+        try:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS schema_migraciones (
+                    nombre varchar(100) PRIMARY KEY,
+                    aplicada_en timestamptz NOT NULL DEFAULT now()
+                )
+            """))
+            hechas = set(conn.execute(text("SELECT nombre FROM schema_migraciones")).scalars())
+            for nombre, sentencia in MIGRACIONES:
+                if nombre in hechas:
+                    continue
+                try:
+                    _aplicar(conn, sentencia)
+                    conn.execute(text("INSERT INTO schema_migraciones (nombre) VALUES (:nombre)"), {"nombre": nombre})
+                    aplicadas.append(nombre)
+                except Exception as e:
+                    print(f"[esquema_db] Error aplicando la migración {nombre}: {e}")
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:clave)"), {"clave": BLOQUEO})
+    return aplicadas
+
+
+def aplicar_al_arrancar() -> None:
+    if os.getenv("MIGRACIONES_AL_ARRANCAR", "1") != "1":
+        return
+    try:
+        aplicadas = aplicar_migraciones()
+    except Exception as e:
+        print(f"[esquema_db] No se pudieron aplicar las migraciones: {e}")
+        return
+    if aplicadas:
+        print(f"[esquema_db] Migraciones aplicadas: {', '.join(aplicadas)}")
+
+
+if __name__ == "__main__":
+    aplicadas = aplicar_migraciones()
+    print(f"Migraciones aplicadas: {len(aplicadas)}")
+    for nombre in aplicadas:
+        print(f"  {nombre}")
@@ -64,6 +64,8 @@ class NoticiaCrear(BaseModel):
     articulos_relacionados: Optional[List[int]] = []
     estado: Optional[str] = None
     destacado: Optional[str] = Field(None, max_length=500)
+    # Si es futura, la noticia queda 'programado' hasta esa fecha
+    fecha_programada: Optional[datetime] = None
 
 class NoticiaActualizar(BaseModel):
     titulo: Optional[str] = Field(None, max_length=300)
@@ -83,24 +85,64 @@ class NoticiaActualizar(BaseModel):
     articulos_relacionados: Optional[List[int]] = None
     estado: Optional[str] = None
     destacado: Optional[str] = Field(None, max_length=500)
+    # null cancela la programación
+    fecha_programada: Optional[datetime] = None
 
 class NoticiaRespuesta(NoticiaBase):
     id: int
     slug: str
     autor_id: Optional[int] = None
     estado: Optional[str] = None
+    fecha_programada: Optional[datetime] = None
+    # Sólo en noticias de la papelera
+    fecha_eliminacion: Optional[datetime] = None
     fecha_creacion: Optional[datetime] = None
     fecha_actualizacion: Optional[datetime] = None
     last_edited_by: Optional[str] = None
     last_edited_at: Optional[datetime] = None
     tiempo_lectura: Optional[int] = 0
     es_internacional: Optional[bool] = False
+    # Fragmento con coincidencias resaltadas (<mark>) cuando se busca con resaltar=true
+    fragmento: Optional[str] = None
 
     class Config:
         # para serializar objetos ORM
         from_attributes = True
 
 
+class NoticiaResumen(BaseModel):
+    """Elemento de listado (tarjetas): sin `contenido` ni campos de detalle."""
+    id: int
+    slug: str
+    titulo: str
+    resumen: Optional[str] = None
+    fecha: date
+    imagen: Optional[str] = None
+    categoria: Optional[str] = None
+    vistas: Optional[int] = 0
+    likes: Optional[int] = 0
+    compartidos: Optional[int] = 0
+    destacada: Optional[bool] = False
+    autor_id: Optional[int] = None
+    autor_info: Optional[AutorInfo] = None
+    estado: Optional[str] = None
+    fecha_programada: Optional[datetime] = None
+    # Sólo en noticias de la papelera
+    fecha_eliminacion: Optional[datetime] = None
+    fecha_actualizacion: Optional[datetime] = None
+    last_edited_by: Optional[str] = None
+    last_edited_at: Optional[datetime] = None
+    tiempo_lectura: Optional[int] = 0
+    es_internacional: Optional[bool] = False
+    fragmento: Optional[str] = None
+
+
+class SugerenciaNoticia(BaseModel):
+    id: int
+    titulo: str
+    slug: str
+
+
 class NoticiaHistorialItem(BaseModel):
     id: int
     noticia_id: int
@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.staticfiles import StaticFiles
 from app.rutas_noticias import router as noticias_router
 from app.rutas_uploads import router as uploads_router
@@ -9,12 +9,26 @@ from app.rutas_fanschoice import router as fanschoice_router
 from app.rutas_timeline import router as timeline_router
 from fastapi.middleware.cors import CORSMiddleware
 import os
+import anyio.to_thread
 from sqlalchemy.orm import Session
-from app.base_datos import SessionLocal
+from app.base_datos import SessionLocal, async_engine, async_engine_replica
 from app import modelos
 from app.auth import hash_password
+from app.esquema_db import aplicar_al_arrancar
+from app.contadores import buffer_vistas
+from app.relacionadas import reconstruir_si_vacia
+from app.programador import programador
+from app.papelera import purga_papelera
+from app.referencias import referencias, invalidar_referencias
+from app.serializacion import RespuestaJSON
+from app.replica import adherir_al_primario
+from app.metricas import MiddlewareMetricas, TIPO_CONTENIDO, escuchar_sql, exportar
 
-app = FastAPI(title="Radio Valle API", description="API para Radio Valle - Noticias Otaku")
+app = FastAPI(
+    title="Radio Valle API",
+    description="API para Radio Valle - Noticias Otaku",
+    default_response_class=RespuestaJSON,
+)
 
 # Crear directorio de uploads si no existe
 os.makedirs("uploads/images", exist_ok=True)
@@ -39,8 +53,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Con réplica de lectura: tras una escritura, ese navegador lee del primario un tiempo
+app.middleware("http")(adherir_al_primario)
+
+# Métricas de Prometheus (el último añadido es el más externo: mide todo lo anterior)
+app.add_middleware(MiddlewareMetricas)
+escuchar_sql()
+
 # Incluir todas las rutas
 app.include_router(noticias_router)
 app.include_router(uploads_router)
@@ -58,6 +80,68 @@ def raiz():
     return {"mensaje": "Bienvenido a la API de Radio Conexión Latam"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metricas():
+    return Response(exportar(), media_type=TIPO_CONTENIDO)
+
+
+@app.on_event("startup")
+async def ajustar_threadpool():
+    """Hilos para rutas síncronas (THREADPOOL_HILOS; por defecto 40, el de anyio)."""
+    hilos = os.getenv("THREADPOOL_HILOS")
+    if hilos:
+        anyio.to_thread.current_default_thread_limiter().total_tokens = int(hilos)
+
+
+@app.on_event("startup")
+def asegurar_esquema():
+    """Aplica las migraciones pendientes (índices/columnas que create_all no añade)."""
+    aplicar_al_arrancar()
+
+
+@app.on_event("startup")
+def iniciar_contadores():
+    buffer_vistas.iniciar()
+
+
+@app.on_event("startup")
+def preparar_relacionadas():
+    reconstruir_si_vacia()
+
+
+@app.on_event("startup")
+def iniciar_programador():
+    programador.iniciar()
+
+
+@app.on_event("startup")
+def iniciar_purga_papelera():
+    purga_papelera.iniciar()
+
+
+@app.on_event("shutdown")
+def volcar_contadores():
+    """Escribe las vistas acumuladas antes de salir (SIGTERM / reload)."""
+    buffer_vistas.detener()
+
+
+@app.on_event("shutdown")
+def detener_programador():
+    programador.detener()
+
+
+@app.on_event("shutdown")
+def detener_purga_papelera():
+    purga_papelera.detener()
+
+
+@app.on_event("shutdown")
+async def cerrar_engine_async():
+    await async_engine.dispose()
+    if async_engine_replica is not None:
+        await async_engine_replica.dispose()
+
+
 @app.on_event("startup")
 def inicializar_roles_base():
     """Crea los roles base (admin, editor, internacional) y el estado 'publicado' siempre,
@@ -236,3 +320,10 @@ def crear_admin_y_editor_por_defecto():
         raise
     finally:
         db.close()
+
+
+@app.on_event("startup")
+def cargar_referencias():
+    """Precarga roles, estados y categorías (después de crear los roles base)."""
+    invalidar_referencias()
+    referencias()
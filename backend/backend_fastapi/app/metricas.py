@@ -0,0 +1,290 @@
+"""
+Métricas en formato de texto de Prometheus (`GET /metrics`), sin dependencias.
+
+`MiddlewareMetricas` (ASGI) mide cada petición y la etiqueta con la plantilla
+de la ruta (`/api/noticias/{noticia_id}`), no con la ruta real, para que el
+número de series no crezca con los ids; lo que no casa con ninguna ruta va a
+`sin_ruta`. Por método y ruta:
+
+- peticiones por código de estado, latencia (hasta el último byte enviado) y
+  tamaño de la respuesta (bytes del cuerpo, también en respuestas en streaming);
+- sentencias SQL y tiempo en la base de datos de la petición, medidos con los
+  eventos de cursor de todos los engines (`app.metricas_pool`) y acumulados en
+  una variable de contexto (llega a las rutas síncronas del threadpool y a
+  `run_sync` de las sesiones asíncronas).
+
+Peticiones en curso por método, y en cada lectura de `/metrics` los pools de
+conexiones (`estadisticas_pools`) y las cachés en memoria (`estadisticas_caches`).
+
+Los valores son del proceso: con varios workers, cada uno tiene los suyos.
+`/metrics` no debe publicarse (el Caddyfile lo bloquea); Prometheus lo lee
+directamente de backend:8000.
+"""
+
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from app.cache import estadisticas_caches
+from app.metricas_pool import CUBETAS, engines_instrumentados, estadisticas_pools
+
+TIPO_CONTENIDO = "text/plain; version=0.0.4; charset=utf-8"
+RUTA_METRICAS = "/metrics"
+
+CUBETAS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CUBETAS_TAMANO = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+CUBETAS_SENTENCIAS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _etiquetas(nombres: tuple, valores: tuple) -> str:
+    if not nombres:
+        return ""
+    pares = []
+    for nombre, valor in zip(nombres, valores):
+        valor = str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pares.append(f'{nombre}="{valor}"')
+    return "{" + ",".join(pares) + "}"
+
+
+def _numero(valor) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    tipo = "counter"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: tuple = ()):
+        self.nombre, self.ayuda, self.etiquetas = nombre, ayuda, etiquetas
+        self._valores: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def sumar(self, valores: tuple = (), cantidad: float = 1) -> None:
+        with self._lock:
+            self._valores[valores] = self._valores.get(valores, 0) + cantidad
+
+    def lineas(self) -> list[str]:
+        with self._lock:
+            valores = list(self._valores.items())
+        return [f"{self.nombre}{_etiquetas(self.etiquetas, v)} {_numero(n)}" for v, n in valores]
+
+
+class Indicador(Contador):
+    tipo = "gauge"
+
+
+class Histograma:
+    tipo = "histogram"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: tuple, cubetas: tuple):
+        self.nombre, self.ayuda, self.etiquetas, self.cubetas = nombre, ayuda, etiquetas, cubetas
+        # por etiquetas: [cuenta por cubeta (no acumulada)..., total, suma]
+        self._valores: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valores: tuple, valor: float) -> None:
+        with self._lock:
+            datos = self._valores.get(valores)
+            if datos is None:
+                datos = self._valores[valores] = [0] * len(self.cubetas) + [0, 0.0]
+            for i, limite in enumerate(self.cubetas):
+                if valor <= limite:
+                    datos[i] += 1
+                    break
+            datos[-2] += 1
+            datos[-1] += valor
+
+    def lineas(self) -> list[str]:
+        with self._lock:
+            valores = [(v, list(d)) for v, d in self._valores.items()]
+        lineas = []
+        nombres = self.etiquetas + ("le",)
+        for v, datos in valores:
+            acumulado = 0
+            for limite, cuenta in zip(self.cubetas, datos):
+                acumulado += cuenta
+                lineas.append(f"{self.nombre}_bucket{_etiquetas(nombres, v + (_numero(limite),))} {acumulado}")
+            lineas.append(f"{self.nombre}_bucket{_etiquetas(nombres, v + ('+Inf',))} {datos[-2]}")
+            lineas.append(f"{self.nombre}_count{_etiquetas(self.etiquetas, v)} {datos[-2]}")
+            lineas.append(f"{self.nombre}_sum{_etiquetas(self.etiquetas, v)} {_numero(datos[-1])}")
+        return lineas
+
+
+peticiones = Contador(
+    "http_requests_total", "Peticiones HTTP atendidas.", ("method", "route", "status"),
+)
+latencia = Histograma(
+    "http_request_duration_seconds", "Duración de la petición hasta el último byte.",
+    ("method", "route"), CUBETAS_LATENCIA,
+)
+tamano = Histograma(
+    "http_response_size_bytes", "Bytes del cuerpo de la respuesta.", ("method", "route"), CUBETAS_TAMANO,
+)
+en_curso = Indicador("http_requests_in_progress", "Peticiones HTTP en curso.", ("method",))
+sentencias_sql = Histograma(
+    "http_request_sql_statements", "Sentencias SQL ejecutadas por petición.",
+    ("method", "route"), CUBETAS_SENTENCIAS,
+)
+tiempo_sql = Histograma(
+    "http_request_sql_duration_seconds", "Tiempo en la base de datos por petición.",
+    ("method", "route"), CUBETAS_LATENCIA,
+)
+
+METRICAS_HTTP = (peticiones, latencia, tamano, en_curso, sentencias_sql, tiempo_sql)
+
+
+# ==========================
+# SQL por petición
+# ==========================
+
+# [sentencias, segundos] de la petición en curso (None fuera de una petición)
+_sql_peticion: ContextVar[list | None] = ContextVar("sql_peticion", default=None)
+
+
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metricas_inicio = time.perf_counter()
+
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    acumulado = _sql_peticion.get()
+    inicio = getattr(context, "_metricas_inicio", None)
+    if acumulado is None or inicio is None:
+        return
+    acumulado[0] += 1
+    acumulado[1] += time.perf_counter() - inicio
+
+
+def escuchar_sql() -> None:
+    """Engancha los eventos de cursor a los engines registrados en `app.metricas_pool`."""
+    for engine in engines_instrumentados().values():
+        if not event.contains(engine, "before_cursor_execute", _antes_de_ejecutar):
+            event.listen(engine, "before_cursor_execute", _antes_de_ejecutar)
+            event.listen(engine, "after_cursor_execute", _despues_de_ejecutar)
+
+
+# ==========================
+# Middleware
+# ==========================
+
+def _plantilla(scope: dict, root_path: str) -> str:
+    ruta = scope.get("route")
+    if ruta is not None:
+        return getattr(ruta, "path_format", None) or getattr(ruta, "path", "sin_ruta")
+    # Montajes (StaticFiles): el prefijo queda en root_path
+    montaje = scope.get("root_path", "")[len(root_path):]
+    if montaje and scope.get("endpoint") is not None:
+        return montaje + "/{path}"
+    return "sin_ruta"
+
+
+class MiddlewareMetricas:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == RUTA_METRICAS:
+            await self.app(scope, receive, send)
+            return
+
+        metodo = scope["method"]
+        root_path = scope.get("root_path", "")
+        inicio = time.perf_counter()
+        sql = [0, 0.0]
+        token = _sql_peticion.set(sql)
+        estado = {"codigo": 500, "bytes": 0, "registrada": False}
+
+        def registrar():
+            if estado["registrada"]:
+                return
+            estado["registrada"] = True
+            etiquetas = (metodo, _plantilla(scope, root_path))
+            peticiones.sumar(etiquetas + (estado["codigo"],))
+            latencia.observar(etiquetas, time.perf_counter() - inicio)
+            tamano.observar(etiquetas, estado["bytes"])
+            sentencias_sql.observar(etiquetas, sql[0])
+            tiempo_sql.observar(etiquetas, sql[1])
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start":
+                estado["codigo"] = mensaje["status"]
+            elif mensaje["type"] == "http.response.body":
+                estado["bytes"] += len(mensaje.get("body", b""))
+            await send(mensaje)
+            if mensaje["type"] == "http.response.body" and not mensaje.get("more_body", False):
+                registrar()  # las tareas en segundo plano corren después y no cuentan
+
+        en_curso.sumar((metodo,))
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            en_curso.sumar((metodo,), -1)
+            registrar()
+            _sql_peticion.reset(token)
+
+
+# ==========================
+# Exportación
+# ==========================
+
+def _familia(nombre: str, tipo: str, ayuda: str, lineas: list[str]) -> list[str]:
+    return [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} {tipo}", *lineas]
+
+
+def _metricas_pools() -> list[str]:
+    pools = estadisticas_pools()
+    lineas: list[str] = []
+
+    def gauge(nombre, ayuda, campo, tipo="gauge"):
+        lineas.extend(_familia(nombre, tipo, ayuda, [
+            f"{nombre}{_etiquetas(('engine',), (e,))} {_numero(p[campo])}" for e, p in pools.items()
+        ]))
+
+    gauge("db_pool_size", "Tamaño configurado del pool.", "tamano")
+    gauge("db_pool_checked_out", "Conexiones en uso.", "en_uso")
+    gauge("db_pool_checked_in", "Conexiones libres en el pool.", "libres")
+    gauge("db_pool_overflow", "Conexiones abiertas por encima del tamaño del pool.", "overflow")
+    gauge("db_pool_timeouts_total", "Esperas que agotaron DB_POOL_TIMEOUT.", "timeouts", "counter")
+    gauge("db_pool_connections_opened_total", "Conexiones abiertas.", "conexiones_abiertas", "counter")
+    gauge("db_pool_invalidations_total", "Conexiones invalidadas.", "invalidaciones", "counter")
+    gauge("db_pool_disconnects_total", "Errores de desconexión detectados.", "desconexiones", "counter")
+
+    nombre = "db_pool_checkout_wait_seconds"
+    espera = []
+    for e, p in pools.items():
+        # las cubetas de MetricasPool ya son acumuladas
+        for limite in CUBETAS:
+            espera.append(f"{nombre}_bucket{_etiquetas(('engine', 'le'), (e, _numero(limite)))} {p['espera_cubetas'][limite]}")
+        espera.append(f"{nombre}_bucket{_etiquetas(('engine', 'le'), (e, '+Inf'))} {p['pedidas']}")
+        espera.append(f"{nombre}_count{_etiquetas(('engine',), (e,))} {p['pedidas']}")
+        espera.append(f"{nombre}_sum{_etiquetas(('engine',), (e,))} {_numero(p['espera_total'])}")
+    lineas.extend(_familia(nombre, "histogram", "Espera al pedir una conexión al pool.", espera))
+    return lineas
+
+
+def _metricas_caches() -> list[str]:
+    caches = estadisticas_caches()
+    lineas: list[str] = []
+    for nombre, tipo, ayuda, campo in (
+        ("cache_entries", "gauge", "Entradas en la caché.", "entradas"),
+        ("cache_max_entries", "gauge", "Capacidad de la caché.", "max_entradas"),
+        ("cache_hits_total", "counter", "Aciertos.", "aciertos"),
+        ("cache_misses_total", "counter", "Fallos.", "fallos"),
+        ("cache_evictions_total", "counter", "Entradas desalojadas por capacidad.", "desalojos"),
+    ):
+        lineas.extend(_familia(nombre, tipo, ayuda, [
+            f"{nombre}{_etiquetas(('cache',), (c,))} {_numero(e[campo])}" for c, e in caches.items()
+        ]))
+    return lineas
+
+
+def exportar() -> bytes:
+    lineas: list[str] = []
+    for metrica in METRICAS_HTTP:
+        lineas.extend(_familia(metrica.nombre, metrica.tipo, metrica.ayuda, metrica.lineas()))
+    lineas.extend(_metricas_pools())
+    lineas.extend(_metricas_caches())
+    return ("\n".join(lineas) + "\n").encode()
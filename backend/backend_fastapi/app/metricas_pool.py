@@ -0,0 +1,138 @@
+"""
+Métricas del pool de conexiones de SQLAlchemy (por worker).
+
+Para relacionar picos de latencia con un pool agotado se registra, por engine:
+
+- espera al pedir una conexión (`_do_get` del pool: incluye hacer cola cuando
+  están todas en uso y abrir una nueva dentro del overflow), como suma, máximo
+  e histograma acumulado por `CUBETAS` (segundos);
+- timeouts (`DB_POOL_TIMEOUT` agotado), conexiones abiertas e invalidadas, y
+  errores de desconexión detectados;
+- en el momento de consultar: tamaño, en uso, libres y overflow.
+
+Sin `pool_pre_ping`, una conexión caída se detecta al fallar la consulta:
+SQLAlchemy la marca como desconexión, invalida el pool y la petición siguiente
+abre conexiones nuevas. `pool_recycle` evita reutilizar conexiones más viejas
+que los timeouts de inactividad de proxies y firewalls.
+"""
+
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as TimeoutPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+CUBETAS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class MetricasPool:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pedidas = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+        self.cubetas = [0] * len(CUBETAS)
+        self.timeouts = 0
+        self.conexiones_abiertas = 0
+        self.invalidaciones = 0
+        self.desconexiones = 0
+
+    def registrar_espera(self, segundos: float, timeout: bool = False) -> None:
+        with self._lock:
+            self.pedidas += 1
+            self.espera_total += segundos
+            self.espera_maxima = max(self.espera_maxima, segundos)
+            for i, limite in enumerate(CUBETAS):
+                if segundos <= limite:
+                    self.cubetas[i] += 1
+            if timeout:
+                self.timeouts += 1
+
+    def sumar(self, campo: str) -> None:
+        with self._lock:
+            setattr(self, campo, getattr(self, campo) + 1)
+
+
+class _Medido:
+    """Mezcla para `QueuePool`: mide cuánto tarda en entregar una conexión."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metricas = MetricasPool()
+
+    def recreate(self):
+        # engine.dispose() sustituye el pool; las métricas siguen acumulando
+        nuevo = super().recreate()
+        nuevo.metricas = self.metricas
+        return nuevo
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            conexion = super()._do_get()
+        except TimeoutPool:
+            self.metricas.registrar_espera(time.perf_counter() - inicio, timeout=True)
+            raise
+        self.metricas.registrar_espera(time.perf_counter() - inicio)
+        return conexion
+
+
+class PoolMedido(_Medido, QueuePool):
+    pass
+
+
+class PoolMedidoAsync(_Medido, AsyncAdaptedQueuePool):
+    pass
+
+
+_ENGINES: dict = {}
+
+
+def instrumentar(nombre: str, engine) -> None:
+    """Registra `engine` (creado con `PoolMedido`/`PoolMedidoAsync`) y sus eventos."""
+    engine = getattr(engine, "sync_engine", engine)
+    metricas = engine.pool.metricas
+    _ENGINES[nombre] = engine
+
+    @event.listens_for(engine, "connect")
+    def _conectada(dbapi_conn, registro):
+        metricas.sumar("conexiones_abiertas")
+
+    @event.listens_for(engine, "invalidate")
+    def _invalidada(dbapi_conn, registro, excepcion):
+        metricas.sumar("invalidaciones")
+
+    @event.listens_for(engine, "handle_error")
+    def _error(contexto):
+        if contexto.is_disconnect:
+            metricas.sumar("desconexiones")
+
+
+def engines_instrumentados() -> dict:
+    return dict(_ENGINES)
+
+
+def estadisticas_pools() -> dict:
+    resultado = {}
+    for nombre, engine in _ENGINES.items():
+        pool = engine.pool
+        m: MetricasPool = pool.metricas
+        with m._lock:
+            resultado[nombre] = {
+                "tamano": pool.size(),
+                "en_uso": pool.checkedout(),
+                "libres": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+                "pedidas": m.pedidas,
+                "espera_total": round(m.espera_total, 6),
+                "espera_maxima": round(m.espera_maxima, 6),
+                "espera_cubetas": dict(zip(CUBETAS, m.cubetas)),
+                "timeouts": m.timeouts,
+                "conexiones_abiertas": m.conexiones_abiertas,
+                "invalidaciones": m.invalidaciones,
+                "desconexiones": m.desconexiones,
+            }
+    return resultado
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, Date, Boolean, DateTime, Float, ForeignKey, event, LargeBinary
+from sqlalchemy import Column, Integer, String, Text, Date, Boolean, DateTime, Float, ForeignKey, event, LargeBinary, Index, FetchedValue, false
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY, INET
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY, INET, TSVECTOR
 from app.base_datos import Base, SessionLocal
 
 class Rol(Base):
@@ -53,7 +53,7 @@ class Usuario(Base):
     # Información del perfil
     nombre_completo = Column(String(200), nullable=True)
     avatar = Column(Text, nullable=True)
-    avatar_blob = Column(LargeBinary, nullable=True)
+    avatar_blob = deferred(Column(LargeBinary, nullable=True))
     titulo = Column(String(150), nullable=True)
     biografia = Column(Text, nullable=True)
     frase_personal = Column(Text, nullable=True)
@@ -82,6 +82,12 @@ class Usuario(Base):
     # Relación con noticias
     noticias = relationship("Noticia", back_populates="autor_usuario")
 
+    __table_args__ = (
+        # Login por usuario o email sin distinguir mayúsculas
+        Index('ix_usuarios_email_lower', func.lower(email)),
+        Index('ix_usuarios_nombre_usuario_lower', func.lower(nombre_usuario)),
+    )
+
 class Noticia(Base):
     __tablename__ = "noticias"
 
@@ -92,7 +98,8 @@ class Noticia(Base):
     resumen = Column(Text, nullable=True)
     contenido = Column(Text, nullable=False)
     imagen_principal = Column(Text, nullable=True)
-    imagen_blob = Column(LargeBinary, nullable=True)
+    # Diferidas: sólo las leen los endpoints /api/uploads/blob/*
+    imagen_blob = deferred(Column(LargeBinary, nullable=True))
     galeria_imagenes = Column(JSONB, default=[])
     audio_url = Column(Text, nullable=True)
     video_url = Column(Text, nullable=True)
@@ -114,12 +121,41 @@ class Noticia(Base):
     datos_estructurados = Column(JSONB, default={})
     destacado = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Base de Last-Modified en las rutas públicas
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Papelera: las noticias borradas se purgan tras PAPELERA_DIAS (app/papelera.py)
     deleted_at = Column(DateTime(timezone=True), nullable=True)
+    # No borrada y con estado 'publicado'; la mantiene el trigger noticias_publicada_trg
+    publicada = Column(Boolean, nullable=False, server_default=false(), server_onupdate=FetchedValue())
+    # log2 de la puntuación de tendencia con decaimiento (ver app/tendencias.py)
+    tendencia = Column(Float, nullable=True)
+    # Mantenida por el trigger noticias_busqueda_trg (ver esquema_db.py)
+    busqueda = deferred(Column(TSVECTOR, nullable=True))
 
     # Relación con usuarios
     autor_usuario = relationship("Usuario", back_populates="noticias")
 
+    __table_args__ = (
+        # Paginación por cursor sobre (fecha_publicacion, id)
+        Index('ix_noticias_fecha_publicacion_id', fecha_publicacion.desc(), id.desc()),
+        Index('ix_noticias_busqueda', busqueda, postgresql_using='gin'),
+        Index('ix_noticias_tendencia', tendencia.desc().nulls_last()),
+        # Lecturas públicas: sólo publicadas y no borradas, por fecha
+        Index('ix_noticias_publicadas', fecha_publicacion.desc(), id.desc(), postgresql_where=publicada),
+        Index('ix_noticias_papelera', deleted_at, postgresql_where=deleted_at.isnot(None)),
+        Index('ix_noticias_categoria_publicadas', categoria_id, fecha_publicacion.desc(), id.desc(),
+              postgresql_where=publicada),
+        Index('ix_noticias_destacadas', fecha_publicacion.desc(), id.desc(),
+              postgresql_where=publicada & destacada),
+        Index('ix_noticias_categoria_id', categoria_id),
+        Index('ix_noticias_autor_id', autor_id),
+        Index('ix_noticias_estado_id', estado_id),
+        # Pendientes de publicación programada (app/programador.py)
+        Index('ix_noticias_programadas', fecha_programada, postgresql_where=fecha_programada.isnot(None)),
+        # Búsqueda por prefijo (LIKE 'base%') al asignar slugs
+        Index('ix_noticias_slug_patron', slug, postgresql_ops={'slug': 'varchar_pattern_ops'}),
+    )
+
     def __init__(self, **kwargs):
         # Permitir recibir la clave 'autor' desde scripts antiguos (p.ej. poblar_db.py)
         autor_val = kwargs.pop('autor', None)
@@ -154,7 +190,7 @@ class Comentario(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     uuid = Column(UUID(as_uuid=True), unique=True, server_default=func.uuid_generate_v4())
-    noticia_id = Column(Integer, ForeignKey("noticias.id"), nullable=True)
+    noticia_id = Column(Integer, ForeignKey("noticias.id"), nullable=True, index=True)
     padre_id = Column(Integer, ForeignKey("comentarios.id"), nullable=True)
     usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=True)
     autor_nombre = Column(String(100), nullable=True)
@@ -252,6 +288,11 @@ class Nota(Base):
 
     autor = relationship("Usuario", foreign_keys=[autor_id])
 
+    __table_args__ = (
+        Index('ix_notas_activa_created', activa, created_at.desc()),
+        Index('ix_notas_autor_id', autor_id),
+    )
+
 
 class NoticiaHistorial(Base):
     __tablename__ = "noticia_historial"
@@ -264,6 +305,28 @@ class NoticiaHistorial(Base):
     comentario = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        Index('ix_noticia_historial_noticia_created', noticia_id, created_at.desc()),
+    )
+
+
+class NoticiaRelacionada(Base):
+    """Vecinas más similares de cada noticia (ver app/relacionadas.py)."""
+    __tablename__ = "noticia_relacionadas"
+
+    noticia_id = Column(Integer, ForeignKey("noticias.id", ondelete="CASCADE"), primary_key=True)
+    relacionada_id = Column(Integer, ForeignKey("noticias.id", ondelete="CASCADE"), primary_key=True)
+    puntuacion = Column(Float, nullable=False)
+
+
+class VisitantesUnicos(Base):
+    """Sketch HyperLogLog diario. ambito: 'sitio', 'categoria:<id>' o 'noticia:<id>'."""
+    __tablename__ = "visitantes_unicos"
+
+    ambito = Column(String(40), primary_key=True)
+    dia = Column(Date, primary_key=True)
+    sketch = Column(LargeBinary, nullable=False)
+
 
 # ─── Timeline / Salón de la Fama ─────────────────────────────────────────────
 
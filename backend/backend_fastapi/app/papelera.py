@@ -0,0 +1,76 @@
+"""
+Papelera de noticias.
+
+`DELETE /api/noticias/{id}` sólo marca `deleted_at`; la noticia deja de ser
+pública (la columna `publicada`, mantenida por trigger, pasa a false) y puede
+restaurarse. Un hilo por worker purga cada `intervalo` las que llevan más de
+`PAPELERA_DIAS` días en la papelera, junto con sus comentarios.
+"""
+
+import os
+import threading
+
+from sqlalchemy import text
+
+from app.base_datos import engine
+
+DIAS = int(os.getenv("PAPELERA_DIAS", "30"))
+LOTE = 200
+
+_SQL_PURGAR = text("""
+    WITH purgadas AS (
+        SELECT id FROM noticias
+        WHERE deleted_at IS NOT NULL AND deleted_at < now() - make_interval(days => :dias)
+        ORDER BY deleted_at
+        LIMIT :lote
+        FOR UPDATE SKIP LOCKED
+    ), comentarios_borrados AS (
+        DELETE FROM comentarios c USING purgadas p WHERE c.noticia_id = p.id
+    )
+    DELETE FROM noticias n USING purgadas p WHERE n.id = p.id
+    RETURNING n.id
+""")
+
+
+def purgar(dias: int = DIAS) -> int:
+    """Elimina definitivamente las noticias de la papelera con más de `dias` días."""
+    total = 0
+    while True:
+        with engine.begin() as conn:
+            borradas = len(conn.execute(_SQL_PURGAR, {"dias": dias, "lote": LOTE}).all())
+        total += borradas
+        if borradas < LOTE:
+            return total
+
+
+class PurgaPapelera:
+    def __init__(self, intervalo: float = 3600.0):
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._hilo: threading.Thread | None = None
+
+    def _bucle(self) -> None:
+        while True:
+            try:
+                borradas = purgar()
+                if borradas:
+                    print(f"[papelera] {borradas} noticias eliminadas definitivamente")
+            except Exception as e:
+                print(f"[papelera] Error purgando: {e}")
+            if self._parar.wait(self.intervalo):
+                return
+
+    def iniciar(self) -> None:
+        if self._hilo and self._hilo.is_alive():
+            return
+        self._parar.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="papelera", daemon=True)
+        self._hilo.start()
+
+    def detener(self) -> None:
+        self._parar.set()
+        if self._hilo:
+            self._hilo.join(timeout=5)
+
+
+purga_papelera = PurgaPapelera(intervalo=float(os.getenv("PAPELERA_PURGA_SEGUNDOS", "3600")))
@@ -0,0 +1,176 @@
+"""
+Publicación programada (`Noticia.fecha_programada`).
+
+Una noticia con `fecha_programada` futura queda en estado 'programado'. Un hilo
+por worker duerme hasta la próxima fecha pendiente (una lectura del índice
+parcial `ix_noticias_programadas`) y al vencer publica en lote:
+
+- `FOR UPDATE SKIP LOCKED`: con varios workers cada fila la publica uno solo.
+- Sólo se publican filas en estado 'programado': un borrador con una fecha
+  pasada no se publica solo. Cancelar la programación (fecha a null) devuelve
+  la noticia a 'borrador'.
+- Al publicar se limpia `fecha_programada`, así el índice sólo contiene pendientes.
+- Cada publicación deja una entrada 'publish' en `noticia_historial`.
+
+Crear o reprogramar una noticia llama a `despertar()` para recalcular la espera
+en este worker; los demás la recogen como mucho tras `ESPERA_MAXIMA` segundos.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from app.base_datos import SessionLocal
+from app.cache import invalidar_noticias
+from app import relacionadas, referencias
+
+ESTADO_PROGRAMADO = 'programado'
+# Al cancelar una programación la noticia vuelve a borrador (no se publica sola)
+ESTADO_BORRADOR = 'borrador'
+LOTE = 100
+ESPERA_MAXIMA = float(os.getenv("PROGRAMADOR_ESPERA_MAXIMA", "60"))
+
+_SQL_PUBLICAR = text("""
+    WITH vencidas AS (
+        SELECT id, estado_id, fecha_programada FROM noticias
+        WHERE fecha_programada IS NOT NULL AND fecha_programada <= now()
+          AND estado_id = :programado
+        ORDER BY fecha_programada
+        LIMIT :lote
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE noticias n
+    SET estado_id = :publicado,
+        fecha_programada = NULL,
+        fecha_publicacion = CAST(v.fecha_programada AS date),
+        updated_at = now()
+    FROM vencidas v
+    WHERE n.id = v.id
+    RETURNING n.id, v.estado_id, v.fecha_programada
+""")
+
+_SQL_HISTORIAL = text("""
+    INSERT INTO noticia_historial (noticia_id, usuario_id, accion, cambios)
+    VALUES (:noticia_id, NULL, 'publish', CAST(:cambios AS jsonb))
+""")
+
+_SQL_PROXIMA = text(
+    "SELECT min(fecha_programada) FROM noticias WHERE fecha_programada IS NOT NULL AND estado_id = :programado"
+)
+
+
+def es_futura(fecha: datetime | None) -> bool:
+    if fecha is None:
+        return False
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return fecha > datetime.now(timezone.utc)
+
+
+def id_estado(db, nombre: str) -> int:
+    """Id del estado `nombre` (en minúsculas), creándolo si no existe."""
+    estado_id = referencias.id_estado(nombre)
+    if estado_id is None:
+        estado_id = db.execute(text("""
+            INSERT INTO estados_noticia (nombre, descripcion, activo) VALUES (:nombre, :descripcion, true)
+            ON CONFLICT (nombre) DO UPDATE SET nombre = EXCLUDED.nombre
+            RETURNING id
+        """), {"nombre": nombre, "descripcion": nombre.capitalize()}).scalar()
+        referencias.invalidar_referencias(db)
+    return estado_id
+
+
+def publicar_vencidas() -> list[int]:
+    """Publica las noticias cuya fecha programada ya pasó. Devuelve sus ids."""
+    publicadas: list[int] = []
+    db = SessionLocal()
+    try:
+        publicado = id_estado(db, 'publicado')
+        programado = id_estado(db, ESTADO_PROGRAMADO)
+        while True:
+            filas = db.execute(_SQL_PUBLICAR, {"lote": LOTE, "publicado": publicado, "programado": programado}).all()
+            if not filas:
+                break
+            db.execute(_SQL_HISTORIAL, [{
+                "noticia_id": noticia_id,
+                "cambios": json.dumps({
+                    'before': {'estado_id': estado_id, 'fecha_programada': programada.isoformat()},
+                    'after': {'estado_id': publicado},
+                }),
+            } for noticia_id, estado_id, programada in filas])
+            db.commit()
+            publicadas.extend(fila[0] for fila in filas)
+            if len(filas) < LOTE:
+                break
+    except Exception as e:
+        db.rollback()
+        print(f"[programador] Error publicando noticias programadas: {e}")
+    finally:
+        db.close()
+
+    if publicadas:
+        invalidar_noticias()
+        for noticia_id in publicadas:
+            relacionadas.actualizar_en_segundo_plano(noticia_id)
+    return publicadas
+
+
+def proxima_publicacion() -> datetime | None:
+    db = SessionLocal()
+    try:
+        programado = referencias.id_estado(ESTADO_PROGRAMADO)
+        if programado is None:
+            return None  # aún no se ha programado ninguna noticia
+        return db.execute(_SQL_PROXIMA, {"programado": programado}).scalar()
+    finally:
+        db.close()
+
+
+class ProgramadorPublicaciones:
+    def __init__(self, espera_maxima: float = 60.0):
+        self.espera_maxima = espera_maxima
+        self._despertar = threading.Event()
+        self._parar = threading.Event()
+        self._hilo: threading.Thread | None = None
+
+    def despertar(self) -> None:
+        """Recalcular la espera (tras crear, reprogramar o cancelar una programación)."""
+        self._despertar.set()
+
+    def _espera(self) -> float:
+        try:
+            proxima = proxima_publicacion()
+        except Exception as e:
+            print(f"[programador] Error leyendo la próxima publicación: {e}")
+            return self.espera_maxima
+        if proxima is None:
+            return self.espera_maxima
+        segundos = (proxima - datetime.now(timezone.utc)).total_seconds()
+        # Mínimo de 1 s: una fila vencida pero bloqueada por otro worker no debe girar en vacío
+        return min(max(segundos, 1.0), self.espera_maxima)
+
+    def _bucle(self) -> None:
+        while not self._parar.is_set():
+            # Limpiar antes de leer: un despertar() durante la consulta no se pierde
+            self._despertar.clear()
+            publicar_vencidas()
+            self._despertar.wait(self._espera())
+
+    def iniciar(self) -> None:
+        if self._hilo and self._hilo.is_alive():
+            return
+        self._parar.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="programador", daemon=True)
+        self._hilo.start()
+
+    def detener(self) -> None:
+        self._parar.set()
+        self._despertar.set()
+        if self._hilo:
+            self._hilo.join(timeout=5)
+
+
+programador = ProgramadorPublicaciones(espera_maxima=ESPERA_MAXIMA)
@@ -0,0 +1,160 @@
+"""
+Datos de referencia en memoria: roles, estados de noticia y categorías.
+
+Son tablas pequeñas que casi nunca cambian pero se consultan en cada petición
+(`require_role`, ensamblado de respuestas, resolución de 'publicado'). Se cargan
+enteras en una instantánea inmutable con número de versión; las búsquedas por
+id o nombre son diccionarios, sin consultas.
+
+- `invalidar_referencias(db=None)` tras crear/editar/borrar roles, estados o
+  categorías: recarga en ese momento (versión + 1), en la ruta que escribió; con
+  `db`, a través de esa sesión, para ver también lo que aún no se ha confirmado.
+- Las búsquedas nunca consultan la base de datos: también se usan desde las
+  rutas asíncronas (`run_sync`, en el hilo del event loop). Pasado el TTL
+  (REFERENCIAS_TTL) se sigue sirviendo la instantánea vigente mientras un hilo
+  la recarga; un id o nombre desconocido devuelve None y pide la misma recarga
+  en segundo plano (como mucho una cada `RECARGA_MINIMA` segundos), así una fila
+  creada en otro worker aparece sin esperar al TTL.
+"""
+
+import os
+import threading
+import time
+from typing import NamedTuple
+
+from app.base_datos import SessionLocal
+from app import modelos
+
+TTL = float(os.getenv("REFERENCIAS_TTL", "300"))
+RECARGA_MINIMA = 5.0
+
+
+class Referencias(NamedTuple):
+    version: int
+    cargada_en: float
+    roles: dict[int, str]
+    roles_por_nombre: dict[str, int]
+    estados: dict[int, str]
+    estados_por_nombre: dict[str, int]
+    categorias: dict[int, str]
+    categorias_por_nombre: dict[str, int]
+    categorias_por_slug: dict[str, int]
+
+
+_actual: Referencias | None = None
+_version = 0
+_recargando = False
+_lock = threading.Lock()
+
+
+def _cargar(db=None) -> Referencias:
+    global _version
+    # La versión se reserva antes de consultar: una carga que empezó más tarde
+    # ve datos al menos tan recientes, así que su instantánea gana en _instalar
+    # aunque sus SELECT terminen antes que los de una carga más lenta.
+    with _lock:
+        _version += 1
+        version = _version
+    propia = db is None
+    if propia:
+        db = SessionLocal()
+    try:
+        roles = dict(db.query(modelos.Rol.id, modelos.Rol.nombre).all())
+        estados = dict(db.query(modelos.EstadoNoticia.id, modelos.EstadoNoticia.nombre).all())
+        categorias = db.query(modelos.Categoria.id, modelos.Categoria.nombre, modelos.Categoria.slug).all()
+    finally:
+        if propia:
+            db.close()
+    return Referencias(
+        version=version,
+        cargada_en=time.monotonic(),
+        roles=roles,
+        roles_por_nombre={nombre.lower(): id_ for id_, nombre in roles.items()},
+        estados=estados,
+        estados_por_nombre={nombre.lower(): id_ for id_, nombre in estados.items()},
+        categorias={id_: nombre for id_, nombre, _ in categorias},
+        categorias_por_nombre={nombre.lower(): id_ for id_, nombre, _ in categorias if nombre},
+        categorias_por_slug={slug: id_ for id_, _, slug in categorias if slug},
+    )
+
+
+def _instalar(nuevas: Referencias) -> None:
+    global _actual
+    with _lock:
+        if _actual is None or nuevas.version > _actual.version:
+            _actual = nuevas
+
+
+def _recargar() -> None:
+    global _recargando
+    try:
+        _instalar(_cargar())
+    except Exception as e:
+        print(f"[referencias] Error recargando: {e}")
+    finally:
+        _recargando = False
+
+
+def _recargar_en_segundo_plano() -> None:
+    global _recargando
+    with _lock:
+        if _recargando:
+            return
+        _recargando = True
+    threading.Thread(target=_recargar, name="referencias", daemon=True).start()
+
+
+def referencias() -> Referencias:
+    """
+    Instantánea vigente. Sólo consulta la base de datos si aún no hay ninguna
+    (el arranque la precarga); si caducó, la devuelve y recarga en segundo plano.
+    """
+    actual = _actual
+    if actual is None:
+        _instalar(_cargar())
+        return _actual
+    if time.monotonic() - actual.cargada_en >= TTL:
+        _recargar_en_segundo_plano()
+    return actual
+
+
+def invalidar_referencias(db=None) -> None:
+    """Recarga ya; con `db`, dentro de la transacción de quien acaba de escribir."""
+    _instalar(_cargar(db))
+
+
+def _buscar(atributo: str, clave):
+    actual = referencias()
+    valor = getattr(actual, atributo).get(clave)
+    if valor is None and time.monotonic() - actual.cargada_en >= RECARGA_MINIMA:
+        # Puede haberse creado en otro worker: se verá tras la recarga
+        _recargar_en_segundo_plano()
+    return valor
+
+
+def nombre_rol(rol_id: int | None) -> str | None:
+    return _buscar("roles", rol_id) if rol_id else None
+
+
+def id_rol(nombre: str | None) -> int | None:
+    return _buscar("roles_por_nombre", nombre.strip().lower()) if nombre else None
+
+
+def nombre_estado(estado_id: int | None) -> str | None:
+    return _buscar("estados", estado_id) if estado_id else None
+
+
+def id_estado(nombre: str | None) -> int | None:
+    return _buscar("estados_por_nombre", nombre.strip().lower()) if nombre else None
+
+
+def nombre_categoria(categoria_id: int | None) -> str | None:
+    return _buscar("categorias", categoria_id) if categoria_id else None
+
+
+def id_categoria(nombre: str | None) -> int | None:
+    return _buscar("categorias_por_nombre", nombre.strip().lower()) if nombre else None
+
+
+def id_categoria_por_slug(slug: str | None) -> int | None:
+    return _buscar("categorias_por_slug", slug) if slug else None
@@ -0,0 +1,237 @@
+"""
+Artículos relacionados precalculados (TF-IDF + similitud coseno).
+
+Los términos salen de `noticias.busqueda` (tsvector mantenido por trigger, ya
+con stemming español, sin acentos ni stopwords), así que no se vuelve a procesar
+el HTML. Cada término pesa según dónde aparece (título > resumen > contenido).
+
+- `actualizar_noticia(db, id)`: tras crear/editar. Busca candidatos con el
+  índice GIN (noticias que comparten sus términos más pesados), calcula la
+  similitud sólo con ellos, guarda sus K vecinas y se inserta en la lista de
+  las candidatas en las que entra.
+- `reconstruir_todo()`: recálculo completo (arranque con la tabla vacía o
+  `python -m app.relacionadas`). Lo hace un solo proceso a la vez (advisory
+  lock); un error en una noticia se registra y se sigue con la siguiente.
+
+Los vectores son dispersos (dict lexema → peso) y se comparan sólo con los
+≤ MAX_CANDIDATOS que devuelve el índice GIN: con vectores de unas decenas de
+términos, NumPy/SciPy no aportarían nada y serían una dependencia más.
+
+Las lecturas son un SELECT por `noticia_id` sobre `noticia_relacionadas`.
+"""
+
+import math
+import os
+import threading
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.base_datos import SessionLocal, engine
+from app.cache import CacheLRU, invalidar_noticias
+
+K = int(os.getenv("RELACIONADAS_K", "6"))
+MAX_CANDIDATOS = 200
+TERMINOS_CONSULTA = 20
+PUNTUACION_MINIMA = 0.05
+# Peso de cada aparición según el setweight del trigger
+PESOS = {'A': 3.0, 'B': 2.0, 'C': 1.0, 'D': 1.0}
+
+# Frecuencia documental por lexema; un recálculo por hora basta para el IDF
+_frecuencias = CacheLRU(max_entradas=1, ttl=3600, omitible=False)
+
+# Clave del advisory lock del recálculo completo (un worker a la vez)
+_BLOQUEO_RECONSTRUCCION = 0x52454C41  # 'RELA'
+
+# Columna mantenida por trigger: estado 'publicado' y fuera de la papelera
+_PUBLICADA = "n.publicada"
+
+
+def _frecuencia_documental(db: Session) -> tuple[dict[str, int], int]:
+    datos = _frecuencias.obtener("df")
+    if datos is None:
+        df = dict(db.execute(text(
+            "SELECT word, ndoc FROM ts_stat('SELECT busqueda FROM noticias WHERE busqueda IS NOT NULL')"
+        )).all())
+        total = db.execute(text("SELECT count(*) FROM noticias WHERE busqueda IS NOT NULL")).scalar() or 0
+        datos = (df, total)
+        _frecuencias.guardar("df", datos)
+    return datos
+
+
+def _vectores(db: Session, ids: list[int], df: dict[str, int], total: int) -> dict[int, dict[str, float]]:
+    """Vectores TF-IDF normalizados (dispersos, como dict lexema → peso)."""
+    filas = db.execute(text("""
+        SELECT n.id, t.lexeme, t.weights
+        FROM noticias n, unnest(n.busqueda) AS t
+        WHERE n.id = ANY(:ids)
+    """), {"ids": ids}).all()
+    vectores: dict[int, dict[str, float]] = {}
+    for noticia_id, lexema, pesos in filas:
+        tf = sum(PESOS.get(p, 1.0) for p in pesos)
+        idf = math.log((1 + total) / (1 + df.get(lexema, 0))) + 1
+        vectores.setdefault(noticia_id, {})[lexema] = (1 + math.log(tf)) * idf
+    for vector in vectores.values():
+        norma = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        for lexema in vector:
+            vector[lexema] /= norma
+    return vectores
+
+
+def _coseno(a: dict[str, float], b: dict[str, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(peso * b.get(lexema, 0.0) for lexema, peso in a.items())
+
+
+def _tsquery(terminos: list[str]) -> str:
+    # Lexemas ya normalizados: se citan tal cual para que no se vuelvan a procesar
+    return " | ".join("'" + t.replace("\\", "\\\\").replace("'", "''") + "'" for t in terminos)
+
+
+def _similares(db: Session, noticia_id: int) -> list[tuple[int, float]]:
+    df, total = _frecuencia_documental(db)
+    vector = _vectores(db, [noticia_id], df, total).get(noticia_id)
+    if not vector:
+        return []
+    principales = sorted(vector, key=vector.get, reverse=True)[:TERMINOS_CONSULTA]
+    candidatos = [fila[0] for fila in db.execute(text(f"""
+        SELECT n.id FROM noticias n
+        WHERE n.busqueda @@ CAST(:q AS tsquery) AND n.id <> :id AND {_PUBLICADA}
+        ORDER BY ts_rank(n.busqueda, CAST(:q AS tsquery)) DESC
+        LIMIT :limite
+    """), {"q": _tsquery(principales), "id": noticia_id, "limite": MAX_CANDIDATOS})]
+    if not candidatos:
+        return []
+    otros = _vectores(db, candidatos, df, total)
+    puntuaciones = [(cid, _coseno(vector, v)) for cid, v in otros.items()]
+    return sorted((p for p in puntuaciones if p[1] >= PUNTUACION_MINIMA), key=lambda p: p[1], reverse=True)
+
+
+def actualizar_noticia(db: Session, noticia_id: int) -> None:
+    """Recalcula las vecinas de una noticia y la propaga a las listas de sus candidatas."""
+    db.execute(text(
+        "DELETE FROM noticia_relacionadas WHERE noticia_id = :id OR relacionada_id = :id"
+    ), {"id": noticia_id})
+    publicada = db.execute(text(f"SELECT 1 FROM noticias n WHERE n.id = :id AND {_PUBLICADA}"),
+                           {"id": noticia_id}).first()
+    similares = _similares(db, noticia_id) if publicada else []
+    if similares:
+        # ON CONFLICT: otra actualización o un recálculo pueden haber escrito la
+        # misma pareja entre el DELETE y este INSERT
+        db.execute(text("""
+            INSERT INTO noticia_relacionadas (noticia_id, relacionada_id, puntuacion)
+            VALUES (:noticia_id, :relacionada_id, :puntuacion)
+            ON CONFLICT (noticia_id, relacionada_id) DO UPDATE SET puntuacion = EXCLUDED.puntuacion
+        """), [{"noticia_id": noticia_id, "relacionada_id": rid, "puntuacion": p} for rid, p in similares[:K]])
+        # La similitud es simétrica: la noticia entra en la lista de cada candidata
+        # y después cada lista se recorta a sus K mejores
+        db.execute(text("""
+            INSERT INTO noticia_relacionadas (noticia_id, relacionada_id, puntuacion)
+            VALUES (:noticia_id, :relacionada_id, :puntuacion)
+            ON CONFLICT (noticia_id, relacionada_id) DO UPDATE SET puntuacion = EXCLUDED.puntuacion
+        """), [{"noticia_id": rid, "relacionada_id": noticia_id, "puntuacion": p} for rid, p in similares])
+        db.execute(text("""
+            DELETE FROM noticia_relacionadas r
+            USING (
+                SELECT noticia_id, relacionada_id,
+                       row_number() OVER (PARTITION BY noticia_id ORDER BY puntuacion DESC) AS posicion
+                FROM noticia_relacionadas WHERE noticia_id = ANY(:ids)
+            ) t
+            WHERE r.noticia_id = t.noticia_id AND r.relacionada_id = t.relacionada_id AND t.posicion > :k
+        """), {"ids": [rid for rid, _ in similares], "k": K})
+    db.commit()
+
+
+def actualizar_en_segundo_plano(noticia_id: int) -> None:
+    """Para BackgroundTasks: sesión propia y errores sólo al log."""
+    db = SessionLocal()
+    try:
+        actualizar_noticia(db, noticia_id)
+        invalidar_noticias()
+    except Exception as e:
+        db.rollback()
+        print(f"[relacionadas] Error actualizando noticia {noticia_id}: {e}")
+    finally:
+        db.close()
+
+
+def relacionadas_de(db: Session, ids: list[int]) -> dict[int, list[int]]:
+    if not ids:
+        return {}
+    filas = db.execute(text("""
+        SELECT noticia_id, relacionada_id FROM noticia_relacionadas
+        WHERE noticia_id = ANY(:ids)
+        ORDER BY noticia_id, puntuacion DESC
+    """), {"ids": ids}).all()
+    resultado: dict[int, list[int]] = {}
+    for noticia_id, relacionada_id in filas:
+        resultado.setdefault(noticia_id, []).append(relacionada_id)
+    return resultado
+
+
+def reconstruir_todo(solo_si_vacia: bool = False) -> int:
+    """
+    Recalcula todas las noticias publicadas y devuelve cuántas se procesaron.
+    Si otro proceso ya está reconstruyendo (o `solo_si_vacia` y la tabla ya
+    tiene filas), no hace nada y devuelve 0.
+    """
+    # El advisory lock es de sesión: se mantiene en una conexión propia, porque
+    # la sesión de trabajo devuelve la suya al pool en cada commit
+    with engine.connect() as bloqueo:
+        if not bloqueo.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": _BLOQUEO_RECONSTRUCCION}).scalar():
+            print("[relacionadas] Recálculo en curso en otro proceso; se omite")
+            return 0
+        try:
+            return _reconstruir(solo_si_vacia)
+        finally:
+            bloqueo.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _BLOQUEO_RECONSTRUCCION})
+            bloqueo.commit()
+
+
+def _reconstruir(solo_si_vacia: bool) -> int:
+    db = SessionLocal()
+    try:
+        if solo_si_vacia and db.execute(text("SELECT EXISTS (SELECT 1 FROM noticia_relacionadas)")).scalar():
+            return 0
+        _frecuencias.limpiar()
+        ids = [fila[0] for fila in db.execute(text(f"SELECT n.id FROM noticias n WHERE {_PUBLICADA} ORDER BY n.id"))]
+        db.commit()
+        procesadas = 0
+        for noticia_id in ids:
+            try:
+                actualizar_noticia(db, noticia_id)
+                procesadas += 1
+            except Exception as e:
+                db.rollback()
+                print(f"[relacionadas] Error recalculando noticia {noticia_id}: {e}")
+        if procesadas:
+            invalidar_noticias()
+        return procesadas
+    finally:
+        db.close()
+
+
+def _reconstruir_en_hilo() -> None:
+    try:
+        reconstruir_todo(solo_si_vacia=True)
+    except Exception as e:
+        print(f"[relacionadas] Error en el recálculo completo: {e}")
+
+
+def reconstruir_si_vacia() -> None:
+    """Al arrancar: si la tabla está vacía, rellenarla en un hilo aparte (un solo worker)."""
+    db = SessionLocal()
+    try:
+        vacia = db.execute(text("SELECT NOT EXISTS (SELECT 1 FROM noticia_relacionadas)")).scalar()
+    except Exception as e:
+        print(f"[relacionadas] No se pudo comprobar la tabla: {e}")
+        return
+    finally:
+        db.close()
+    if vacia:
+        threading.Thread(target=_reconstruir_en_hilo, name="relacionadas", daemon=True).start()
+
+
+if __name__ == "__main__":
+    print(f"Noticias procesadas: {reconstruir_todo()}")
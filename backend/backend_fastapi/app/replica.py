@@ -0,0 +1,60 @@
+"""
+Lecturas desde la réplica con read-your-writes.
+
+Si hay réplica (`DATABASE_REPLICA_URL`), las rutas públicas de lectura
+(`get_db_async` de noticias, notas y timeline) consultan la réplica; el resto
+de la API usa el primario.
+
+La réplica va por detrás unos milisegundos (o más, con carga). Para que quien
+acaba de guardar vea su cambio, toda escritura autenticada correcta
+(POST/PUT/PATCH/DELETE con `Authorization` y respuesta < 400) deja la cookie
+`COOKIE` durante `ADHERENCIA` segundos: mientras exista, ese navegador lee del
+primario y sin pasar por las cachés en memoria (que pueden haberse llenado
+desde la réplica o, en otro worker, antes del cambio). Las escrituras anónimas
+(vistas, likes, compartidos) no la ponen: no necesitan leer lo escrito y
+mandarían a todos los lectores al primario.
+
+El frontend llama a la API desde otro origen (`credentials: 'include'` en
+frontend/src/lib/api.ts; CORS ya permite credenciales). Con frontend y API en el
+mismo sitio (radioconexionlatam.net.pe y api.radioconexionlatam.net.pe) basta
+`SameSite=Lax`; si estuvieran en sitios distintos, DB_REPLICA_COOKIE_SAMESITE=none
+(la cookie pasa a ser `Secure`).
+"""
+
+import os
+
+from fastapi import Request
+
+from app.base_datos import async_engine_replica
+from app.cache import omitir_cache
+
+COOKIE = "leer_primario"
+ADHERENCIA = int(os.getenv("DB_REPLICA_ADHERENCIA", "30"))
+METODOS_LECTURA = {"GET", "HEAD", "OPTIONS"}
+SAMESITE = os.getenv("DB_REPLICA_COOKIE_SAMESITE", "lax").lower()
+
+
+def hay_replica() -> bool:
+    return async_engine_replica is not None
+
+
+def usar_replica(request: Request) -> bool:
+    return async_engine_replica is not None and COOKIE not in request.cookies
+
+
+async def adherir_al_primario(request: Request, call_next):
+    """Middleware HTTP: marca al navegador tras escribir y respeta la marca al leer."""
+    if async_engine_replica is None:
+        return await call_next(request)
+    if COOKIE in request.cookies:
+        omitir_cache.set(True)
+    respuesta = await call_next(request)
+    if (
+        request.method not in METODOS_LECTURA
+        and respuesta.status_code < 400
+        and request.headers.get("authorization")
+    ):
+        respuesta.set_cookie(
+            COOKIE, "1", max_age=ADHERENCIA, httponly=True, samesite=SAMESITE, secure=SAMESITE == "none",
+        )
+    return respuesta
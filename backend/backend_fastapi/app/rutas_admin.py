@@ -1,11 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, and_
 from typing import Optional
+from datetime import date, timedelta
 from app.base_datos import SessionLocal
 from app import modelos, esquemas
 from app.rutas_auth import require_role
 from app.auth import hash_password
+from app.cache import estadisticas_caches, invalidar_autor
+from app.metricas_pool import estadisticas_pools
+from app.referencias import referencias, invalidar_referencias
+from app.contadores import visitantes_por_ambito, visitantes_por_dia
 
 router = APIRouter(
     prefix="/api/admin",
@@ -53,6 +58,7 @@ def crear_rol(payload: dict, db: Session = Depends(get_db), admin: modelos.Usuar
     db.add(rol)
     db.commit()
     db.refresh(rol)
+    invalidar_referencias()
     return {"id": rol.id, "nombre": rol.nombre}
 
 @router.put("/roles/{rol_id}", response_model=dict)
@@ -69,6 +75,7 @@ def actualizar_rol(rol_id: int, payload: dict, db: Session = Depends(get_db), ad
     if "activo" in payload:
         rol.activo = bool(payload["activo"])
     db.commit()
+    invalidar_referencias()
     return {"ok": True}
 
 @router.delete("/roles/{rol_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -82,6 +89,7 @@ def eliminar_rol(rol_id: int, db: Session = Depends(get_db), admin: modelos.Usua
         raise HTTPException(400, detail="No se puede eliminar un rol en uso")
     db.delete(rol)
     db.commit()
+    invalidar_referencias()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 # ==========================
@@ -92,7 +100,7 @@ def eliminar_rol(rol_id: int, db: Session = Depends(get_db), admin: modelos.Usua
 def listar_usuarios(db: Session = Depends(get_db), admin: modelos.Usuario = Depends(require_role(["admin"]))):
     usuarios = db.query(modelos.Usuario).all()
     # Enriquecer con nombre del rol
-    roles_map = {r.id: r.nombre for r in db.query(modelos.Rol).all()}
+    roles_map = referencias().roles
     return [
         {
             "id": u.id,
@@ -167,6 +175,7 @@ def cambiar_rol_usuario(user_id: int, payload: dict, db: Session = Depends(get_d
         raise HTTPException(400, detail=f"Rol '{nuevo_rol_nombre}' no existe")
     usuario.rol_id = rol.id
     db.commit()
+    invalidar_autor(usuario.id)
     return {"ok": True}
 
 @router.patch("/users/{user_id}/nombre", response_model=dict)
@@ -185,6 +194,7 @@ def actualizar_nombre_usuario(user_id: int, payload: dict, db: Session = Depends
         raise HTTPException(400, detail="Nombre de usuario ya existe")
     usuario.nombre_usuario = nuevo
     db.commit()
+    invalidar_autor(usuario.id)
     return {"ok": True, "nombre_usuario": nuevo}
 
 @router.patch("/users/{user_id}/activo", response_model=dict)
@@ -212,6 +222,7 @@ def eliminar_usuario(user_id: int, db: Session = Depends(get_db), admin: modelos
         raise HTTPException(404, detail="Usuario no encontrado")
     db.delete(usuario)
     db.commit()
+    invalidar_autor(user_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 @router.patch("/users/{user_id}/reset_password", response_model=dict)
@@ -269,6 +280,7 @@ def actualizar_perfil_usuario(user_id: int, payload: esquemas.UserProfileUpdate,
     if 'anime_favoritos' in data:
         usuario.anime_favoritos = data['anime_favoritos']
     db.commit()
+    invalidar_autor(usuario.id)
     return {"ok": True}
 
 
@@ -277,21 +289,30 @@ def actualizar_perfil_usuario(user_id: int, payload: esquemas.UserProfileUpdate,
 # ==========================
 
 @router.get("/metricas", response_model=dict)
-def obtener_metricas(db: Session = Depends(get_db), admin: modelos.Usuario = Depends(require_role(["admin"]))):
-    total_noticias = db.query(func.count(modelos.Noticia.id)).scalar() or 0
-    total_vistas = db.query(func.sum(modelos.Noticia.visitas)).scalar() or 0
+def obtener_metricas(dias: int = 30, db: Session = Depends(get_db), admin: modelos.Usuario = Depends(require_role(["admin"]))):
+    """
+    Métricas generales. `vistas` son visitas brutas; `visitantes_unicos` es una
+    estimación HyperLogLog (±2 %) de lectores distintos en los últimos `dias`.
+    """
+    desde = date.today() - timedelta(days=max(dias, 1) - 1)
+    # La papelera no cuenta en las métricas
+    activa = modelos.Noticia.deleted_at.is_(None)
+    total_noticias = db.query(func.count(modelos.Noticia.id)).filter(activa).scalar() or 0
+    total_vistas = db.query(func.sum(modelos.Noticia.visitas)).filter(activa).scalar() or 0
 
     cats = db.query(
+        modelos.Categoria.id,
         modelos.Categoria.nombre,
         func.count(modelos.Noticia.id).label("articulos"),
         func.coalesce(func.sum(modelos.Noticia.visitas), 0).label("vistas"),
-    ).outerjoin(modelos.Noticia, modelos.Noticia.categoria_id == modelos.Categoria.id) \
-     .group_by(modelos.Categoria.nombre) \
+    ).outerjoin(modelos.Noticia, and_(modelos.Noticia.categoria_id == modelos.Categoria.id, activa)) \
+     .group_by(modelos.Categoria.id, modelos.Categoria.nombre) \
      .order_by(func.sum(modelos.Noticia.visitas).desc().nullslast()) \
      .all()
 
     categorias = [
-        {"categoria": c.nombre, "articulos": c.articulos, "vistas": int(c.vistas)}
+        {"categoria": c.nombre, "articulos": c.articulos, "vistas": int(c.vistas),
+         "_ambito": f"categoria:{c.id}"}
         for c in cats
     ]
 
@@ -302,19 +323,28 @@ def obtener_metricas(db: Session = Depends(get_db), admin: modelos.Usuario = Dep
         modelos.Noticia.visitas,
         modelos.Categoria.nombre.label("categoria"),
     ).outerjoin(modelos.Categoria, modelos.Categoria.id == modelos.Noticia.categoria_id) \
+     .filter(activa) \
      .order_by(modelos.Noticia.visitas.desc()) \
      .limit(10).all()
 
     top = [
-        {"id": n.id, "titulo": n.titulo, "slug": n.slug, "vistas": n.visitas or 0, "categoria": n.categoria}
+        {"id": n.id, "titulo": n.titulo, "slug": n.slug, "vistas": n.visitas or 0, "categoria": n.categoria,
+         "_ambito": f"noticia:{n.id}"}
         for n in top_noticias
     ]
 
+    # Un único pase sobre los sketches de todos los ámbitos pedidos
+    unicos = visitantes_por_ambito(
+        db, ["sitio"] + [c["_ambito"] for c in categorias] + [n["_ambito"] for n in top], desde
+    )
+    for fila in categorias + top:
+        fila["visitantes_unicos"] = unicos[fila.pop("_ambito")]
+
     editores = db.query(
         modelos.Usuario.nombre_usuario,
         func.count(modelos.Noticia.id).label("articulos"),
         func.coalesce(func.sum(modelos.Noticia.visitas), 0).label("vistas"),
-    ).outerjoin(modelos.Noticia, modelos.Noticia.autor_id == modelos.Usuario.id) \
+    ).outerjoin(modelos.Noticia, and_(modelos.Noticia.autor_id == modelos.Usuario.id, activa)) \
      .group_by(modelos.Usuario.nombre_usuario) \
      .order_by(func.count(modelos.Noticia.id).desc()) \
      .limit(10).all()
@@ -327,7 +357,33 @@ def obtener_metricas(db: Session = Depends(get_db), admin: modelos.Usuario = Dep
     return {
         "total_noticias": total_noticias,
         "total_vistas": int(total_vistas),
+        "visitantes_unicos": unicos["sitio"],
+        "dias": dias,
         "por_categoria": categorias,
         "top_noticias": top,
         "top_editores": top_editores,
     }
+
+
+@router.get("/metricas/noticias/{noticia_id}/visitantes", response_model=dict)
+def obtener_visitantes_noticia(noticia_id: int, dias: int = 30, db: Session = Depends(get_db), admin: modelos.Usuario = Depends(require_role(["admin"]))):
+    """Visitantes únicos aproximados de una noticia, por día y en todo el periodo."""
+    desde = date.today() - timedelta(days=max(dias, 1) - 1)
+    ambito = f"noticia:{noticia_id}"
+    return {
+        "noticia_id": noticia_id,
+        "total": visitantes_por_ambito(db, [ambito], desde)[ambito],
+        "por_dia": visitantes_por_dia(db, ambito, desde),
+    }
+
+
+@router.get("/cache", response_model=dict)
+def obtener_estadisticas_cache(admin: modelos.Usuario = Depends(require_role(["admin"]))):
+    """Aciertos/fallos/desalojos de las cachés en memoria de este worker."""
+    return estadisticas_caches()
+
+
+@router.get("/pool", response_model=dict)
+def obtener_estadisticas_pool(admin: modelos.Usuario = Depends(require_role(["admin"]))):
+    """Uso del pool de conexiones y esperas al pedir una conexión en este worker."""
+    return estadisticas_pools()
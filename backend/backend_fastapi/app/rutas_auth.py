@@ -7,6 +7,8 @@ from datetime import timedelta
 from app.base_datos import SessionLocal
 from app import modelos, esquemas
 from app.auth import hash_password, verify_password, crear_access_token, decodificar_token
+from app.referencias import nombre_rol
+from app.cache import invalidar_autor
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
@@ -46,11 +48,10 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
 	return user
 
 def require_role(roles: list[str]):
-	def wrapper(user: modelos.Usuario = Depends(get_current_user), db: Session = Depends(get_db)):
+	def wrapper(user: modelos.Usuario = Depends(get_current_user)):
 		if not user.rol_id:
 			raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Usuario sin rol asignado")
-		user_rol = db.query(modelos.Rol).filter(modelos.Rol.id == user.rol_id).first()
-		if not user_rol or user_rol.nombre not in roles:
+		if nombre_rol(user.rol_id) not in roles:
 			raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Permisos insuficientes")
 		return user
 	return wrapper
@@ -96,9 +97,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
 	# Obtener el nombre del rol del usuario
 	user_rol_name = "usuario"  # default
 	if user.rol_id:
-		user_rol = db.query(modelos.Rol).filter(modelos.Rol.id == user.rol_id).first()
-		if user_rol:
-			user_rol_name = user_rol.nombre
+		user_rol_name = nombre_rol(user.rol_id) or user_rol_name
 	
 	token = crear_access_token({"sub": user.nombre_usuario, "rol": user_rol_name})
 	return {"access_token": token, "token_type": "bearer"}
@@ -143,4 +142,5 @@ def actualizar_mi_perfil(
 		user.anime_favoritos = datos['anime_favoritos']
 
 	db.commit()
+	invalidar_autor(user.id)
 	return {"ok": True}
@@ -1,8 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
-from sqlalchemy.orm import Session
-from app.base_datos import SessionLocal
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.base_datos import SessionLocal, AsyncSessionLocal
+from app.replica import usar_replica
 from app import modelos, esquemas
 from app.rutas_auth import require_role, get_current_user
+from app.cache import cache_notas, clave_cache, invalidar_notas
+from app.cache_http import preparar, responder
+from app.referencias import nombre_rol
 
 router = APIRouter(
     prefix="/api/notas",
@@ -18,6 +24,11 @@ def get_db():
         db.close()
 
 
+async def get_db_async(request: Request):
+    async with AsyncSessionLocal(info={"replica": usar_replica(request)}) as db:
+        yield db
+
+
 def _serializar(nota: modelos.Nota) -> dict:
     autor = nota.autor
     return {
@@ -34,21 +45,28 @@ def _serializar(nota: modelos.Nota) -> dict:
 # ── Público ─────────────────────────────────────────────────────────────────
 
 @router.get("/", response_model=list[esquemas.NotaRespuesta])
-def listar_notas(limite: int = 20, offset: int = 0, db: Session = Depends(get_db)):
-    notas = (
-        db.query(modelos.Nota)
-        .filter(modelos.Nota.activa == True)
+async def listar_notas(request: Request, limite: int = 20, offset: int = 0, db: AsyncSession = Depends(get_db_async)):
+    clave = clave_cache("listar", limite=limite, offset=offset)
+    cacheado = cache_notas.obtener(clave)
+    if cacheado is not None:
+        return responder(request, cacheado, "notas")
+    # El autor se carga por adelantado: en async no hay carga perezosa
+    notas = (await db.scalars(
+        select(modelos.Nota)
+        .options(selectinload(modelos.Nota.autor).load_only(modelos.Usuario.nombre_usuario, modelos.Usuario.avatar))
+        .where(modelos.Nota.activa == True)
         .order_by(modelos.Nota.created_at.desc())
         .offset(offset)
         .limit(min(limite, 50))
-        .all()
-    )
-    return [_serializar(n) for n in notas]
+    )).all()
+    entrada = preparar([_serializar(n) for n in notas])
+    cache_notas.guardar(clave, entrada)
+    return responder(request, entrada, "notas")
 
 
 @router.get("/total", response_model=dict)
-def total_notas(db: Session = Depends(get_db)):
-    count = db.query(modelos.Nota).filter(modelos.Nota.activa == True).count()
+async def total_notas(db: AsyncSession = Depends(get_db_async)):
+    count = await db.scalar(select(func.count()).select_from(modelos.Nota).where(modelos.Nota.activa == True))
     return {"total": count}
 
 
@@ -59,8 +77,7 @@ def mis_notas(
     db: Session = Depends(get_db),
     user: modelos.Usuario = Depends(get_current_user),
 ):
-    rol = db.query(modelos.Rol).filter(modelos.Rol.id == user.rol_id).first()
-    es_admin = rol and rol.nombre == "admin"
+    es_admin = nombre_rol(user.rol_id) == "admin"
     query = db.query(modelos.Nota)
     if not es_admin:
         query = query.filter(modelos.Nota.autor_id == user.id)
@@ -81,6 +98,7 @@ def crear_nota(
     db.add(nota)
     db.commit()
     db.refresh(nota)
+    invalidar_notas()
     return _serializar(nota)
 
 
@@ -94,14 +112,14 @@ def actualizar_nota(
     nota = db.query(modelos.Nota).filter(modelos.Nota.id == nota_id).first()
     if not nota:
         raise HTTPException(404, detail="Nota no encontrada")
-    rol = db.query(modelos.Rol).filter(modelos.Rol.id == user.rol_id).first()
-    es_admin = rol and rol.nombre == "admin"
+    es_admin = nombre_rol(user.rol_id) == "admin"
     if not es_admin and nota.autor_id != user.id:
         raise HTTPException(403, detail="No puedes editar notas de otros editores")
     if payload.contenido is not None:
         nota.contenido = payload.contenido
     db.commit()
     db.refresh(nota)
+    invalidar_notas()
     return _serializar(nota)
 
 
@@ -114,10 +132,10 @@ def eliminar_nota(
     nota = db.query(modelos.Nota).filter(modelos.Nota.id == nota_id).first()
     if not nota:
         raise HTTPException(404, detail="Nota no encontrada")
-    rol = db.query(modelos.Rol).filter(modelos.Rol.id == user.rol_id).first()
-    es_admin = rol and rol.nombre == "admin"
+    es_admin = nombre_rol(user.rol_id) == "admin"
     if not es_admin and nota.autor_id != user.id:
         raise HTTPException(403, detail="No puedes eliminar notas de otros editores")
     db.delete(nota)
     db.commit()
+    invalidar_notas()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,58 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Path, status, Request
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, func, tuple_, text, false, select
 from datetime import date
-from app.base_datos import SessionLocal, engine, Base
+from typing import Literal
+from app.base_datos import SessionLocal, AsyncSessionLocal, engine, Base
+from app.replica import usar_replica
 from app import modelos, esquemas
-from app.utils import generar_slug
+from app.utils import generar_slug, codificar_cursor, decodificar_cursor, ip_cliente
 from app.auth import decodificar_token
 import math
 from app.rutas_auth import get_current_user
 import json
 from app.rutas_auth import require_role
 from app import modelos as modelos_module
-import nh3
-
-# Tags y atributos que CKEditor genera legítimamente
-_HTML_TAGS = {
-    'p', 'br', 'hr', 'strong', 'em', 'u', 's', 'b', 'i', 'mark',
-    'h2', 'h3', 'h4', 'h5', 'h6',
-    'ul', 'ol', 'li', 'blockquote', 'pre', 'code',
-    'a', 'img',
-    'table', 'thead', 'tbody', 'tfoot', 'tr', 'th', 'td', 'caption',
-    'figure', 'figcaption', 'oembed',
-    'span', 'div',
-}
-_HTML_ATTRS: dict[str, set[str]] = {
-    'a':        {'href', 'title', 'target'},
-    'img':      {'src', 'alt', 'width', 'height', 'class'},
-    'figure':   {'class'},
-    'figcaption': {'class'},
-    'div':      {'class'},
-    'span':     {'class'},
-    'p':        {'class'},
-    'h2':       {'class'}, 'h3': {'class'}, 'h4': {'class'},
-    'ul':       {'class'}, 'ol': {'class'}, 'li': {'class'},
-    'blockquote': {'class'},
-    'pre':      {'class'}, 'code': {'class'},
-    'table':    {'class'},
-    'td':       {'colspan', 'rowspan', 'class'},
-    'th':       {'colspan', 'rowspan', 'class'},
-    'oembed':   {'url'},
-}
-
-def sanitizar_html(html: str | None) -> str | None:
-    if not html:
-        return html
-    return nh3.clean(
-        html,
-        tags=_HTML_TAGS,
-        attributes=_HTML_ATTRS,
-        url_schemes={'https', 'http'},
-        strip_comments=True,
-        link_rel='noopener noreferrer',
-    )
+from app.ensamblador import ensamblar_noticias, ensamblar_noticia, proyectar_resumen, consulta_admin, fila_admin
+from app import busqueda, tendencias
+from app.relacionadas import actualizar_en_segundo_plano as actualizar_relacionadas, relacionadas_de
+from app.slugs import guardar_con_slug, conserva_slug
+from app.sanitizacion import sanitizar_contenido, tiempo_lectura
+from app.contadores import buffer_vistas, filtro_likes, noticia_publicada
+from app.programador import programador, es_futura, id_estado, ESTADO_PROGRAMADO, ESTADO_BORRADOR
+from app.referencias import id_categoria, id_categoria_por_slug, id_rol, nombre_rol, invalidar_referencias
+from app.cache_http import preparar, responder
+from app.serializacion import RespuestaJSON, a_json
+from app.cache import cache_noticias, cache_categorias, cache_sugerencias, clave_cache, invalidar_noticias, invalidar_categorias
 
 oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
@@ -84,8 +58,21 @@ def get_db():
     finally:
         db.close()
 
-@router.get("/", response_model=list[esquemas.NoticiaRespuesta])
-def listar_noticias(
+async def get_db_async(request: Request):
+    async with AsyncSessionLocal(info={"replica": usar_replica(request)}) as db:
+        yield db
+
+def _solo_publicadas(query):
+    """
+    Filtra a noticias públicas: estado 'publicado' (o sin estado) y fuera de la
+    papelera. Usa la columna `publicada` (mantenida por trigger) para que el
+    planificador pueda usar el índice parcial `ix_noticias_publicadas`.
+    """
+    return query.filter(modelos.Noticia.publicada)
+
+@router.get("/", response_model=list[esquemas.NoticiaResumen] | list[esquemas.NoticiaRespuesta])
+async def listar_noticias(
+    request: Request,
     categoria: str = None,
     destacada: bool = None,
     buscar: str = None,
@@ -93,32 +80,53 @@ def listar_noticias(
     limite: int = 20,
     offset: int = 0,
     es_internacional: bool = None,
-    db: Session = Depends(get_db)
+    cursor: str = None,
+    resaltar: bool = False,
+    incluir_contenido: bool = False,
+    db: AsyncSession = Depends(get_db_async)
 ):
     """
     Devuelve todas las noticias con filtros opcionales.
+
+    Paginación: por defecto `offset`/`limite`. Si se envía `cursor` (valor de la
+    cabecera `X-Next-Cursor` de la página anterior) se ignora `offset` y se
+    continúa a partir de la última fila vista, ordenando por (fecha_publicacion, id).
+
+    `buscar` usa búsqueda de texto completo (sin distinguir mayúsculas ni acentos)
+    y, en modo offset, ordena por relevancia. `resaltar=true` añade `fragmento`.
+
+    Por defecto devuelve `NoticiaResumen` (sin `contenido`); `incluir_contenido=true`
+    devuelve la noticia completa.
+
+    Soporta GET condicional (If-None-Match / If-Modified-Since → 304).
     """
-    query = db.query(modelos.Noticia)
+    clave = clave_cache(
+        "listar", categoria=categoria, destacada=destacada, buscar=buscar, autor_id=autor_id,
+        limite=limite, offset=offset if not cursor else None, es_internacional=es_internacional,
+        cursor=cursor, resaltar=resaltar if buscar else None, incluir_contenido=incluir_contenido,
+    )
+    cacheado = cache_noticias.obtener(clave)
+    if cacheado is not None:
+        return responder(request, cacheado, "listado")
+    entrada = await db.run_sync(
+        _listar_noticias, clave, categoria, destacada, buscar, autor_id, limite, offset,
+        es_internacional, cursor, resaltar, incluir_contenido,
+    )
+    return responder(request, entrada, "listado")
+
+
+def _listar_noticias(db: Session, clave, categoria, destacada, buscar, autor_id, limite, offset,
+                     es_internacional, cursor, resaltar, incluir_contenido):
     # Mostrar solo noticias con estado 'publicado' en el endpoint público.
-    # Interpretación: si la noticia no tiene estado (estado_id is NULL) la tratamos como publicada
-    try:
-        query = query.join(modelos.EstadoNoticia, modelos.EstadoNoticia.id == modelos.Noticia.estado_id, isouter=True)
-        query = query.filter(
-            or_(
-                func.lower(modelos.EstadoNoticia.nombre) == 'publicado',
-                modelos.Noticia.estado_id == None
-            )
-        )
-    except Exception:
-        # Si hay algún problema con la tabla de estados, no cortar la lista (compatibilidad)
-        pass
+    query = _solo_publicadas(db.query(modelos.Noticia))
+    if not incluir_contenido:
+        query = proyectar_resumen(query)
     
     # Filtrar por categoría
     if categoria and categoria.lower() != "todas":
         # Filtrar por nombre de categoría (case-insensitive)
-        cat_nombre = categoria.strip().lower()
-        query = query.join(modelos.Categoria, modelos.Categoria.id == modelos.Noticia.categoria_id, isouter=True)
-        query = query.filter(func.lower(modelos.Categoria.nombre) == cat_nombre)
+        cat_id = id_categoria(categoria)
+        query = query.filter(modelos.Noticia.categoria_id == cat_id if cat_id else false())
     
     # Filtrar por destacada
     if destacada is not None:
@@ -128,102 +136,86 @@ def listar_noticias(
     if autor_id is not None:
         query = query.filter(modelos.Noticia.autor_id == autor_id)
     
-    # Búsqueda en título y contenido
-    if buscar:
-        query = query.filter(
-            or_(
-                modelos.Noticia.titulo.contains(buscar),
-                modelos.Noticia.contenido.contains(buscar),
-                modelos.Noticia.resumen.contains(buscar)
-            )
-        )
+    # Búsqueda de texto completo en título, resumen y contenido (índice GIN)
+    tsq = None
+    if buscar and buscar.strip():
+        tsq = busqueda.consulta_ts(buscar)
+        query = busqueda.filtrar(query, tsq)
 
     # Filtrar por rol del autor (internacional vs nacional)
     if es_internacional is not None:
-        query = query.join(
-            modelos.Usuario,
-            modelos.Usuario.id == modelos.Noticia.autor_id,
-            isouter=True,
-        ).join(
-            modelos.Rol,
-            modelos.Rol.id == modelos.Usuario.rol_id,
-            isouter=True,
-        )
+        rol_internacional = id_rol('internacional')
         if es_internacional:
-            query = query.filter(modelos.Rol.nombre == 'internacional')
-        else:
-            query = query.filter(
-                or_(modelos.Rol.nombre != 'internacional', modelos.Rol.nombre == None)
+            query = query.join(modelos.Usuario, modelos.Usuario.id == modelos.Noticia.autor_id)
+            query = query.filter(modelos.Usuario.rol_id == rol_internacional if rol_internacional else false())
+        elif rol_internacional:
+            query = query.join(
+                modelos.Usuario,
+                modelos.Usuario.id == modelos.Noticia.autor_id,
+                isouter=True,
+            ).filter(
+                or_(modelos.Usuario.rol_id != rol_internacional, modelos.Usuario.rol_id == None)
             )
 
-    # Aplicar paginación y ordenamiento
+    # Paginación por cursor (keyset): continuar tras la última (fecha, id) vista
+    if cursor:
+        try:
+            fecha_cursor, id_cursor = decodificar_cursor(cursor)
+            fecha_cursor = date.fromisoformat(fecha_cursor)
+            id_cursor = int(id_cursor)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+        query = query.filter(
+            tuple_(modelos.Noticia.fecha_publicacion, modelos.Noticia.id) < tuple_(fecha_cursor, id_cursor)
+        )
+        offset = 0
+
+    # Aplicar paginación y ordenamiento (id desempata fechas iguales).
+    # Con búsqueda en modo offset se ordena primero por relevancia.
+    por_relevancia = tsq is not None and not cursor
+    orden = [modelos.Noticia.fecha_publicacion.desc(), modelos.Noticia.id.desc()]
+    if por_relevancia:
+        orden.insert(0, busqueda.relevancia(tsq).desc())
     noticias = (
-        query.order_by(modelos.Noticia.fecha_publicacion.desc())
+        query.order_by(*orden)
         .offset(offset)
         .limit(limite)
         .all()
     )
-    
-    # Cache de roles para evitar N+1 al determinar es_internacional
-    roles_cache: dict[int, str] = {}
-    try:
-        for r in db.query(modelos.Rol).all():
-            roles_cache[r.id] = r.nombre
-    except Exception:
-        pass
-
-    for noticia in noticias:
-        noticia.imagen = noticia.imagen_principal
-        noticia.fecha = noticia.fecha_publicacion
-        noticia.vistas = noticia.visitas or 0
-        noticia.compartidos = noticia.shares or 0
-        # Categoría por nombre
-        if noticia.categoria_id:
-            cat = db.query(modelos.Categoria).get(noticia.categoria_id)
-            noticia.categoria = cat.nombre if cat else None
-        # Autor info desde relación usuario
-        noticia.es_internacional = False
-        if noticia.autor_id:
-            u = db.query(modelos.Usuario).get(noticia.autor_id)
-            if u:
-                noticia.autor_info = esquemas.AutorInfo(
-                    nombre=u.nombre_usuario,
-                    titulo=u.titulo,
-                    descripcion=u.biografia,
-                    avatar=u.avatar,
-                    nivel=u.nivel,
-                    experiencia_años=u.experiencia_años,
-                    articulos_total=u.articulos_publicados,
-                    seguidores=u.seguidores,
-                    precision=u.precision_rating,
-                    especialidades=u.especialidades or [],
-                    logros=u.logros or [],
-                    top_anime=u.anime_favoritos or [],
-                    redes_sociales=u.redes_sociales or {},
-                    frase=u.frase_personal,
-                )
-                noticia.es_internacional = (roles_cache.get(u.rol_id) == 'internacional') if u.rol_id else False
-        # Normalizar estado textual: si no hay estado explícito, considerarlo 'publicado' para el endpoint público
-        if noticia.estado_id:
-            est = db.get(modelos.EstadoNoticia, noticia.estado_id)
-            noticia.estado = est.nombre if est else None
-        else:
-            noticia.estado = 'publicado'
 
-    return noticias
+    siguiente = None
+    if noticias and len(noticias) == limite and not por_relevancia:
+        ultima = noticias[-1]
+        siguiente = codificar_cursor(ultima.fecha_publicacion, ultima.id)
+
+    respuesta = ensamblar_noticias(db, noticias, resumen=not incluir_contenido)
+    if tsq is not None and resaltar:
+        fragmentos = busqueda.fragmentos(db, [n.id for n in noticias], buscar)
+        for item in respuesta:
+            item.fragmento = fragmentos.get(item.id)
+    entrada = preparar(
+        respuesta,
+        cabeceras={"X-Next-Cursor": siguiente} if siguiente else None,
+    )
+    cache_noticias.guardar(clave, entrada)
+    return entrada
 
 @router.get("/categorias/", response_model=list[str])
-def listar_categorias(db: Session = Depends(get_db)):
+async def listar_categorias(request: Request, db: AsyncSession = Depends(get_db_async)):
     """
     Devuelve la lista de categorías únicas.
     """
-    filas = (
-        db.query(modelos.Categoria.nombre)
-        .filter(modelos.Categoria.activa == True)
+    cacheado = cache_categorias.obtener("activas")
+    if cacheado is not None:
+        return responder(request, cacheado, "categorias")
+    nombres = (await db.scalars(
+        select(modelos.Categoria.nombre)
+        .where(modelos.Categoria.activa == True)
         .order_by(modelos.Categoria.orden_display, modelos.Categoria.nombre)
-        .all()
-    )
-    return [fila[0] for fila in filas if fila and fila[0]]
+    )).all()
+    entrada = preparar([nombre for nombre in nombres if nombre])
+    cache_categorias.guardar("activas", entrada)
+    return responder(request, entrada, "categorias")
 
 @router.post("/categorias/", status_code=201)
 def crear_categoria(nombre: str, db: Session = Depends(get_db), _u: modelos.Usuario = Depends(require_role(["admin", "editor", "internacional"]))):
@@ -236,12 +228,16 @@ def crear_categoria(nombre: str, db: Session = Depends(get_db), _u: modelos.Usua
         if not existente.activa:
             existente.activa = True
             db.commit()
+            invalidar_categorias()
+            invalidar_referencias()
             return {"nombre": existente.nombre}
         raise HTTPException(status_code=409, detail="La categoría ya existe")
     nueva = modelos.Categoria(nombre=nombre, slug=cat_slug, activa=True)
     db.add(nueva)
     db.commit()
     db.refresh(nueva)
+    invalidar_categorias()
+    invalidar_referencias()
     return {"nombre": nueva.nombre}
 
 @router.delete("/categorias/", status_code=204)
@@ -257,6 +253,8 @@ def eliminar_categoria(nombre: str, db: Session = Depends(get_db), _u: modelos.U
         raise HTTPException(status_code=409, detail="No se puede eliminar: hay noticias usando esta categoría")
     db.delete(cat)
     db.commit()
+    invalidar_categorias()
+    invalidar_referencias()
 
 @router.get("/tags/", response_model=list[str])
 def listar_tags(db: Session = Depends(get_db)):
@@ -265,188 +263,180 @@ def listar_tags(db: Session = Depends(get_db)):
     """
     return []
 
+UMBRAL_SIMILITUD = 0.3
+
+@router.get("/sugerencias", response_model=list[esquemas.SugerenciaNoticia])
+def sugerencias_noticias(q: str, limite: int = 8, db: Session = Depends(get_db)):
+    """
+    Autocompletado de títulos tolerante a errores de tipeo y acentos (pg_trgm).
+    Devuelve solo (id, titulo, slug) de noticias publicadas.
+    """
+    limite = max(1, min(limite, 20))
+    clave = (generar_slug(q or ''), limite)
+    if len(clave[0]) < 2:
+        return []
+    # Prefijos frecuentes del buscador: se repiten a ritmo de tecleo
+    cacheado = cache_sugerencias.obtener(clave)
+    if cacheado is not None:
+        return RespuestaJSON(cacheado)
+
+    consulta = func.f_unaccent(func.lower(q.strip()))
+    titulo = func.f_unaccent(func.lower(modelos.Noticia.titulo))
+    # Umbral más permisivo que el 0.6 por defecto: los prefijos son cortos
+    db.execute(text(f"SET LOCAL pg_trgm.word_similarity_threshold = {UMBRAL_SIMILITUD}"))
+    filas = (
+        _solo_publicadas(db.query(modelos.Noticia.id, modelos.Noticia.titulo, modelos.Noticia.slug))
+        .filter(consulta.op('<%')(titulo))
+        .order_by(func.word_similarity(consulta, titulo).desc(), modelos.Noticia.fecha_publicacion.desc())
+        .limit(limite)
+        .all()
+    )
+    resultado = [{"id": f.id, "titulo": f.titulo, "slug": f.slug} for f in filas]
+    cache_sugerencias.guardar(clave, resultado)
+    return RespuestaJSON(resultado)
+
+@router.get("/tendencias", response_model=list[esquemas.NoticiaResumen])
+async def listar_tendencias(request: Request, limite: int = 10, db: AsyncSession = Depends(get_db_async)):
+    """
+    Noticias en tendencia: vistas, likes y compartidos recientes pesan más que
+    los antiguos (decaimiento exponencial, ver `app.tendencias`).
+    """
+    limite = max(1, min(limite, 50))
+    clave = clave_cache("tendencias", limite=limite)
+    cacheado = cache_noticias.obtener(clave)
+    if cacheado is not None:
+        return responder(request, cacheado, "listado")
+    return responder(request, await db.run_sync(_tendencias, clave, limite), "listado")
+
+
+def _tendencias(db: Session, clave, limite: int):
+    noticias = (
+        proyectar_resumen(_solo_publicadas(db.query(modelos.Noticia)))
+        .filter(modelos.Noticia.tendencia.isnot(None))
+        .order_by(modelos.Noticia.tendencia.desc().nulls_last())
+        .limit(limite)
+        .all()
+    )
+    respuesta = ensamblar_noticias(db, noticias, resumen=True)
+    entrada = preparar(respuesta)
+    cache_noticias.guardar(clave, entrada)
+    return entrada
+
 @router.post("/{noticia_id}/vista", status_code=200)
-def registrar_vista(noticia_id: int, db: Session = Depends(get_db)):
-    noticia = db.query(modelos.Noticia).filter(modelos.Noticia.id == noticia_id).first()
-    if noticia:
-        noticia.visitas = (noticia.visitas or 0) + 1
-        db.commit()
+def registrar_vista(
+    request: Request,
+    noticia_id: int = Path(gt=0, le=2**31 - 1),
+    db: Session = Depends(get_db),
+):
+    """
+    Registra una vista. Se acumula en memoria y se escribe en lote cada pocos
+    segundos (ver `app.contadores`); ids inexistentes o no publicados devuelven 404 y no se acumulan.
+    El visitante (IP + User-Agent) alimenta el conteo aproximado de únicos.
+    """
+    if not noticia_publicada(db, noticia_id):
+        raise HTTPException(status_code=404, detail="Noticia no encontrada")
+    visitante = f"{ip_cliente(request)}|{request.headers.get('user-agent', '')}"
+    buffer_vistas.registrar(noticia_id, visitante=visitante)
     return {"ok": True}
 
+@router.get("/{noticia_id}/relacionadas", response_model=list[esquemas.NoticiaResumen])
+async def listar_relacionadas(noticia_id: int, request: Request, db: AsyncSession = Depends(get_db_async)):
+    """
+    Noticias relacionadas (TF-IDF precalculado, ver `app.relacionadas`), más
+    similares primero. Sólo lee la tabla `noticia_relacionadas`.
+    """
+    clave = clave_cache("relacionadas", noticia_id=noticia_id)
+    cacheado = cache_noticias.obtener(clave)
+    if cacheado is not None:
+        return responder(request, cacheado, "listado")
+    return responder(request, await db.run_sync(_relacionadas, clave, noticia_id), "listado")
+
+
+def _relacionadas(db: Session, clave, noticia_id: int):
+    ids = relacionadas_de(db, [noticia_id]).get(noticia_id, [])
+    noticias = proyectar_resumen(_solo_publicadas(db.query(modelos.Noticia))).filter(modelos.Noticia.id.in_(ids)).all() if ids else []
+    orden = {nid: i for i, nid in enumerate(ids)}
+    noticias.sort(key=lambda n: orden[n.id])
+    respuesta = ensamblar_noticias(db, noticias, resumen=True)
+    entrada = preparar(respuesta)
+    cache_noticias.guardar(clave, entrada)
+    return entrada
+
 @router.get("/slug/{slug}", response_model=esquemas.NoticiaRespuesta)
-def obtener_noticia_por_slug(slug: str, db: Session = Depends(get_db)):
+async def obtener_noticia_por_slug(slug: str, request: Request, db: AsyncSession = Depends(get_db_async)):
     """
     Devuelve una noticia por su slug.
     """
-    noticia = db.query(modelos.Noticia).filter(modelos.Noticia.slug == slug).first()
-    if not noticia:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Noticia no encontrada"
-        )
-    # Solo permitir ver noticias publicadas en este endpoint público
-    try:
-        if noticia.estado_id:
-            est = db.get(modelos.EstadoNoticia, noticia.estado_id)
-            if est and str(est.nombre).strip().lower() != 'publicado':
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Noticia no encontrada")
-    except HTTPException:
-        raise
-    except Exception:
-        # Si hay error comprobando estado, continuar (compatibilidad)
-        pass
-    
+    clave = clave_cache("slug", slug=slug)
+    cacheado = cache_noticias.obtener(clave)
+    if cacheado is not None:
+        return responder(request, cacheado, "noticia")
+    noticia = await db.scalar(select(modelos.Noticia).where(modelos.Noticia.slug == slug).limit(1))
     # Las vistas se registran desde el frontend tras 40 segundos de lectura real
-    
-    # Mapear respuesta (tags removed)
-    noticia.imagen = noticia.imagen_principal
-    noticia.fecha = noticia.fecha_publicacion
-    noticia.vistas = noticia.visitas or 0
-    noticia.compartidos = noticia.shares or 0
-    if noticia.categoria_id:
-        cat = db.get(modelos.Categoria, noticia.categoria_id)
-        noticia.categoria = cat.nombre if cat else None
-    if noticia.autor_id:
-        u = db.get(modelos.Usuario, noticia.autor_id)
-        if u:
-            noticia.autor_info = esquemas.AutorInfo(
-                nombre=u.nombre_usuario,
-                titulo=u.titulo,
-                descripcion=u.biografia,
-                avatar=u.avatar,
-                nivel=u.nivel,
-                experiencia_años=u.experiencia_años,
-                articulos_total=u.articulos_publicados,
-                seguidores=u.seguidores,
-                precision=u.precision_rating,
-                especialidades=u.especialidades or [],
-                logros=u.logros or [],
-                top_anime=u.anime_favoritos or [],
-                redes_sociales=u.redes_sociales or {},
-                frase=u.frase_personal,
-            )
-    # Añadir info de última edición desde el historial
-    last = db.query(modelos.NoticiaHistorial).filter(modelos.NoticiaHistorial.noticia_id == noticia.id).order_by(modelos.NoticiaHistorial.created_at.desc()).first()
-    if last:
-        if last.usuario_id:
-            u = db.get(modelos.Usuario, last.usuario_id)
-            noticia.last_edited_by = u.nombre_usuario if u else None
-        noticia.last_edited_at = last.created_at
-    
-    return noticia
+    return responder(request, await db.run_sync(_detalle_publico, clave, noticia), "noticia")
 
 @router.get("/{noticia_id}", response_model=esquemas.NoticiaRespuesta)
-def obtener_noticia(noticia_id: int, db: Session = Depends(get_db)):
+async def obtener_noticia(noticia_id: int, request: Request, db: AsyncSession = Depends(get_db_async)):
     """
     Devuelve una noticia por su ID.
     """
-    noticia = db.get(modelos.Noticia, noticia_id)
-    if not noticia:
+    clave = clave_cache("id", id=noticia_id)
+    cacheado = cache_noticias.obtener(clave)
+    if cacheado is not None:
+        return responder(request, cacheado, "noticia")
+    noticia = await db.get(modelos.Noticia, noticia_id)
+    return responder(request, await db.run_sync(_detalle_publico, clave, noticia), "noticia")
+
+
+def _detalle_publico(db: Session, clave, noticia: modelos.Noticia | None):
+    # Endpoint público: sólo noticias publicadas y no borradas
+    if not noticia or not noticia.publicada:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Noticia no encontrada"
         )
-    # Endpoint público por ID: sólo publicar si estado == 'publicado'
-    try:
-        if noticia.estado_id:
-            est = db.get(modelos.EstadoNoticia, noticia.estado_id)
-            if est and str(est.nombre).strip().lower() != 'publicado':
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Noticia no encontrada")
-    except HTTPException:
-        raise
-    except Exception:
-        pass
-    
-    # Mapear respuesta (tags removed)
-    noticia.imagen = noticia.imagen_principal
-    noticia.fecha = noticia.fecha_publicacion
-    noticia.vistas = noticia.visitas or 0
-    noticia.compartidos = noticia.shares or 0
-    if noticia.categoria_id:
-        cat = db.get(modelos.Categoria, noticia.categoria_id)
-        noticia.categoria = cat.nombre if cat else None
-    if noticia.autor_id:
-        u = db.get(modelos.Usuario, noticia.autor_id)
-        if u:
-            noticia.autor_info = esquemas.AutorInfo(
-                nombre=u.nombre_usuario,
-                titulo=u.titulo,
-                descripcion=u.biografia,
-                avatar=u.avatar,
-                nivel=u.nivel,
-                experiencia_años=u.experiencia_años,
-                articulos_total=u.articulos_publicados,
-                seguidores=u.seguidores,
-                precision=u.precision_rating,
-                especialidades=u.especialidades or [],
-                logros=u.logros or [],
-                top_anime=u.anime_favoritos or [],
-                redes_sociales=u.redes_sociales or {},
-                frase=u.frase_personal,
-            )
-    # Añadir info de última edición desde el historial
-    last = db.query(modelos.NoticiaHistorial).filter(modelos.NoticiaHistorial.noticia_id == noticia.id).order_by(modelos.NoticiaHistorial.created_at.desc()).first()
-    if last:
-        if last.usuario_id:
-            u = db.get(modelos.Usuario, last.usuario_id)
-            noticia.last_edited_by = u.nombre_usuario if u else None
-        noticia.last_edited_at = last.created_at
-
-    return noticia
+    respuesta = ensamblar_noticia(db, noticia, con_ultima_edicion=True)
+    entrada = preparar(respuesta, ultima_modificacion=respuesta.fecha_actualizacion)
+    cache_noticias.guardar(clave, entrada)
+    return entrada
 
 @router.post("/", response_model=esquemas.NoticiaRespuesta, status_code=status.HTTP_201_CREATED)
 def crear_noticia(
     noticia: esquemas.NoticiaCrear,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     user: modelos.Usuario = Depends(get_current_user)
 ):
     """
     Crea una nueva noticia.
     """
-    # Generar slug único
-    slug_base = generar_slug(noticia.titulo)
-    slug = slug_base
-    contador = 1
-
-    # Verificar que el slug sea único
-    while db.query(modelos.Noticia).filter(modelos.Noticia.slug == slug).first():
-        slug = f"{slug_base}-{contador}"
-        contador += 1
-
     # Resolver categoría
     categoria_id = None
     if noticia.categoria:
         cat_nombre = noticia.categoria.strip()
         if cat_nombre:
-            from app.modelos import Categoria
             cat_slug = generar_slug(cat_nombre)
-            categoria = db.query(modelos.Categoria).filter(modelos.Categoria.slug == cat_slug).first()
-            if not categoria:
+            categoria_id = id_categoria_por_slug(cat_slug)
+            if categoria_id is None:
                 categoria = modelos.Categoria(nombre=cat_nombre, slug=cat_slug)
                 db.add(categoria)
                 db.commit()
                 db.refresh(categoria)
-            categoria_id = categoria.id
+                invalidar_categorias()
+                invalidar_referencias()
+                categoria_id = categoria.id
 
     # Resolver estado por defecto ('publicado') para evitar FK inválido
     estado_id = None
     try:
-        estado = db.query(modelos.EstadoNoticia).filter(func.lower(modelos.EstadoNoticia.nombre) == 'publicado').first()
-        if not estado:
-            estado = modelos.EstadoNoticia(nombre='publicado', descripcion='Publicado', color_hex='#28a745', activo=True)
-            db.add(estado)
-            db.commit()
-            db.refresh(estado)
-        estado_id = estado.id
+        estado_id = id_estado(db, 'publicado')
     except Exception:
         estado_id = None
 
     datos_noticia = {
         'titulo': noticia.titulo,
-        'slug': slug,
         # Limitar resumen a 50 caracteres (letras) para evitar overlays en frontend
         'resumen': _limitar_caracteres(noticia.resumen, 50),
-        'contenido': sanitizar_html(noticia.contenido),
         'imagen_principal': noticia.imagen,
         'audio_url': noticia.audio_url,
         'categoria_id': categoria_id,
@@ -459,16 +449,13 @@ def crear_noticia(
     # If the client provided an 'estado' string, attempt to resolve it to estado_id
     if getattr(noticia, 'estado', None):
         try:
-            est_name = str(noticia.estado).strip().lower()
-            est = db.query(modelos.EstadoNoticia).filter(func.lower(modelos.EstadoNoticia.nombre) == est_name).first()
-            if not est:
-                est = modelos.EstadoNoticia(nombre=noticia.estado, descripcion=noticia.estado, activo=True)
-                db.add(est)
-                db.commit()
-                db.refresh(est)
-            datos_noticia['estado_id'] = est.id
+            datos_noticia['estado_id'] = id_estado(db, str(noticia.estado).strip().lower())
         except Exception:
             pass
+    # Publicación programada: hasta la fecha queda en estado 'programado'
+    if es_futura(noticia.fecha_programada):
+        datos_noticia['fecha_programada'] = noticia.fecha_programada
+        datos_noticia['estado_id'] = id_estado(db, ESTADO_PROGRAMADO)
     # Validar que la imagen no sea una URL externa (solo rutas relativas internas o blob)
     img_val = datos_noticia.get('imagen_principal')
     if img_val:
@@ -477,46 +464,16 @@ def crear_noticia(
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Solo se aceptan imágenes subidas; por favor use el botón de subir imagen.")
     datos_noticia['autor_id'] = user.id
 
-    # Calcular tiempo estimado de lectura (palabras/200 redondeado)
-    palabras = len((noticia.contenido or '').split())
-    datos_noticia['tiempo_lectura'] = max(1, math.ceil(palabras / 200)) if palabras else 0
+    # Sanitizar y calcular tiempo estimado de lectura en la misma pasada
+    datos_noticia['contenido'], palabras = sanitizar_contenido(noticia.contenido)
+    datos_noticia['tiempo_lectura'] = tiempo_lectura(palabras)
     
     nueva = modelos.Noticia(**datos_noticia)
-    db.add(nueva)
+    # Slug único ('titulo', 'titulo-1', ...) con reintento si otra petición se adelanta
+    guardar_con_slug(db, nueva, noticia.titulo)
     db.commit()
     db.refresh(nueva)
     
-    # Mapear respuesta esperada por frontend
-    nueva.imagen = nueva.imagen_principal
-    nueva.fecha = nueva.fecha_publicacion
-    nueva.destacado = nueva.destacado
-    # map estado name
-    if nueva.estado_id:
-        est = db.get(modelos.EstadoNoticia, nueva.estado_id)
-        nueva.estado = est.nombre if est else None
-    if nueva.categoria_id:
-        cat = db.get(modelos.Categoria, nueva.categoria_id)
-        nueva.categoria = cat.nombre if cat else None
-    if nueva.autor_id:
-        u = db.get(modelos.Usuario, nueva.autor_id)
-        if u:
-            nueva.autor_info = esquemas.AutorInfo(
-                nombre=u.nombre_usuario,
-                titulo=u.titulo,
-                descripcion=u.biografia,
-                avatar=u.avatar,
-                nivel=u.nivel,
-                experiencia_años=u.experiencia_años,
-                articulos_total=u.articulos_publicados,
-                seguidores=u.seguidores,
-                precision=u.precision_rating,
-                especialidades=u.especialidades or [],
-                logros=u.logros or [],
-                top_anime=u.anime_favoritos or [],
-                redes_sociales=u.redes_sociales or {},
-                frase=u.frase_personal,
-            )
-    
     # Registrar historial de creación
     try:
         hist = modelos.NoticiaHistorial(
@@ -534,10 +491,15 @@ def crear_noticia(
     except Exception:
         db.rollback()
 
-    return nueva
+    invalidar_noticias()
+    if nueva.fecha_programada:
+        programador.despertar()
+    # Vecinas TF-IDF: se calculan después de enviar la respuesta
+    background_tasks.add_task(actualizar_relacionadas, nueva.id)
+    return RespuestaJSON(ensamblar_noticia(db, nueva, estado_por_defecto=None), status_code=status.HTTP_201_CREATED)
 
 @router.put("/{noticia_id}", response_model=esquemas.NoticiaRespuesta)
-def actualizar_noticia(noticia_id: int, datos: esquemas.NoticiaActualizar, db: Session = Depends(get_db), user: modelos.Usuario = Depends(get_current_user)):
+def actualizar_noticia(noticia_id: int, datos: esquemas.NoticiaActualizar, background_tasks: BackgroundTasks, db: Session = Depends(get_db), user: modelos.Usuario = Depends(get_current_user)):
     """
     Actualiza una noticia existente.
     """
@@ -550,8 +512,7 @@ def actualizar_noticia(noticia_id: int, datos: esquemas.NoticiaActualizar, db: S
     # Authorization: only admin/editor or the original author can update
     user_role_name = None
     if user and user.rol_id:
-        rol = db.query(modelos.Rol).get(user.rol_id)
-        user_role_name = rol.nombre if rol else None
+        user_role_name = nombre_rol(user.rol_id)
 
     if user_role_name not in ("admin", "editor") and obj.autor_id != user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Permisos insuficientes para editar esta noticia")
@@ -573,13 +534,16 @@ def actualizar_noticia(noticia_id: int, datos: esquemas.NoticiaActualizar, db: S
     if 'categoria' in datos_actualizacion and datos_actualizacion['categoria']:
         cat_nombre = str(datos_actualizacion.pop('categoria')).strip()
         cat_slug = generar_slug(cat_nombre)
-        categoria = db.query(modelos.Categoria).filter(modelos.Categoria.slug == cat_slug).first()
-        if not categoria:
+        categoria_id = id_categoria_por_slug(cat_slug)
+        if categoria_id is None:
             categoria = modelos.Categoria(nombre=cat_nombre, slug=cat_slug)
             db.add(categoria)
             db.commit()
             db.refresh(categoria)
-        datos_actualizacion['categoria_id'] = categoria.id
+            invalidar_categorias()
+            invalidar_referencias()
+            categoria_id = categoria.id
+        datos_actualizacion['categoria_id'] = categoria_id
 
     # Permitir que ADMIN cambie el autor de la noticia
     if getattr(datos, 'autor_id', None) is not None and user_role_name == 'admin':
@@ -594,18 +558,6 @@ def actualizar_noticia(noticia_id: int, datos: esquemas.NoticiaActualizar, db: S
             # Permitir dejar autor en null si se envía 0 o None
             datos_actualizacion['autor_id'] = None
     
-    # Actualizar slug si se cambió el título
-    if 'titulo' in datos_actualizacion:
-        nuevo_slug = generar_slug(datos_actualizacion['titulo'])
-        # Verificar unicidad del slug
-        slug_existente = db.query(modelos.Noticia).filter(
-            modelos.Noticia.slug == nuevo_slug,
-            modelos.Noticia.id != noticia_id
-        ).first()
-        
-        if not slug_existente:
-            datos_actualizacion['slug'] = nuevo_slug
-    
     # Actualizar tags si se proporcionan
     # Tags removed: no longer accepted
 
@@ -613,23 +565,28 @@ def actualizar_noticia(noticia_id: int, datos: esquemas.NoticiaActualizar, db: S
     if 'estado' in datos_actualizacion and datos_actualizacion.get('estado') is not None:
         try:
             est_name = str(datos_actualizacion.pop('estado')).strip().lower()
-            est = db.query(modelos.EstadoNoticia).filter(func.lower(modelos.EstadoNoticia.nombre) == est_name).first()
-            if not est:
-                est = modelos.EstadoNoticia(nombre=est_name, descripcion=est_name, activo=True)
-                db.add(est)
-                db.commit()
-                db.refresh(est)
-            datos_actualizacion['estado_id'] = est.id
+            datos_actualizacion['estado_id'] = id_estado(db, est_name)
         except Exception:
             pass
 
+    # Programar (fecha futura → estado 'programado') o cancelar con null: una
+    # noticia programada vuelve a borrador salvo que se indique otro estado
+    if 'fecha_programada' in datos_actualizacion:
+        if es_futura(datos_actualizacion['fecha_programada']):
+            datos_actualizacion['estado_id'] = id_estado(db, ESTADO_PROGRAMADO)
+        elif (
+            datos_actualizacion['fecha_programada'] is None
+            and 'estado_id' not in datos_actualizacion
+            and obj.estado_id == id_estado(db, ESTADO_PROGRAMADO)
+        ):
+            datos_actualizacion['estado_id'] = id_estado(db, ESTADO_BORRADOR)
+
     # Se ignora autor_info en actualización (se deriva del autor_id)
 
     # Sanitizar y recalcular tiempo_lectura si cambia el contenido
     if 'contenido' in datos_actualizacion:
-        datos_actualizacion['contenido'] = sanitizar_html(datos_actualizacion['contenido'])
-        palabras = len((datos_actualizacion['contenido'] or '').split())
-        datos_actualizacion['tiempo_lectura'] = max(1, math.ceil(palabras / 200)) if palabras else 0
+        datos_actualizacion['contenido'], palabras = sanitizar_contenido(datos_actualizacion['contenido'])
+        datos_actualizacion['tiempo_lectura'] = tiempo_lectura(palabras)
 
     # Validar que la imagen no sea una URL externa (solo rutas relativas internas o blob)
     if 'imagen_principal' in datos_actualizacion:
@@ -653,6 +610,11 @@ def actualizar_noticia(noticia_id: int, datos: esquemas.NoticiaActualizar, db: S
     for campo, valor in datos_actualizacion.items():
         setattr(obj, campo, valor)
 
+    # Si cambió el título, el slug pasa a ser el primer libre para el nuevo título
+    if 'titulo' in datos_actualizacion and not conserva_slug(obj.slug, obj.titulo):
+        db.flush()
+        guardar_con_slug(db, obj, obj.titulo)
+
     db.commit()
     db.refresh(obj)
 
@@ -678,46 +640,22 @@ def actualizar_noticia(noticia_id: int, datos: esquemas.NoticiaActualizar, db: S
         db.commit()
     except Exception:
         db.rollback()
-    
-    # Mapear respuesta
-    obj.imagen = obj.imagen_principal
-    obj.fecha = obj.fecha_publicacion
-    obj.destacado = obj.destacado
-    if obj.estado_id:
-        est = db.get(modelos.EstadoNoticia, obj.estado_id)
-        obj.estado = est.nombre if est else None
-    if obj.categoria_id:
-        cat = db.get(modelos.Categoria, obj.categoria_id)
-        obj.categoria = cat.nombre if cat else None
-    if obj.autor_id:
-        u = db.get(modelos.Usuario, obj.autor_id)
-        if u:
-            obj.autor_info = esquemas.AutorInfo(
-                nombre=u.nombre_usuario,
-                titulo=u.titulo,
-                descripcion=u.biografia,
-                avatar=u.avatar,
-                nivel=u.nivel,
-                experiencia_años=u.experiencia_años,
-                articulos_total=u.articulos_publicados,
-                seguidores=u.seguidores,
-                precision=u.precision_rating,
-                especialidades=u.especialidades or [],
-                logros=u.logros or [],
-                top_anime=u.anime_favoritos or [],
-                redes_sociales=u.redes_sociales or {},
-                frase=u.frase_personal,
-            )
-    
-    return obj
+
+    invalidar_noticias()
+    if 'fecha_programada' in datos_actualizacion:
+        programador.despertar()
+    if {'titulo', 'resumen', 'contenido', 'estado_id'} & datos_actualizacion.keys():
+        background_tasks.add_task(actualizar_relacionadas, obj.id)
+    return RespuestaJSON(ensamblar_noticia(db, obj, estado_por_defecto=None))
 
 @router.delete("/{noticia_id}", status_code=status.HTTP_204_NO_CONTENT)
-def eliminar_noticia(noticia_id: int, db: Session = Depends(get_db), user: modelos.Usuario = Depends(get_current_user)):
+def eliminar_noticia(noticia_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db), user: modelos.Usuario = Depends(get_current_user)):
     """
-    Elimina una noticia por su ID.
+    Envía una noticia a la papelera. Se puede restaurar con
+    `POST /{id}/restaurar` hasta que se purgue (PAPELERA_DIAS, ver app/papelera.py).
     """
     obj = db.get(modelos.Noticia, noticia_id)
-    if not obj:
+    if not obj or obj.deleted_at is not None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Noticia no encontrada"
@@ -725,43 +663,66 @@ def eliminar_noticia(noticia_id: int, db: Session = Depends(get_db), user: model
     # Authorization: only admin/editor or the original author can delete
     user_role_name = None
     if user and user.rol_id:
-        rol = db.query(modelos.Rol).get(user.rol_id)
-        user_role_name = rol.nombre if rol else None
+        user_role_name = nombre_rol(user.rol_id)
 
     if user_role_name not in ("admin", "editor") and obj.autor_id != user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Permisos insuficientes para eliminar esta noticia")
 
-    # Guardar estado previo en historial
-    try:
-        before = {
-            'titulo': obj.titulo,
-            'slug': obj.slug,
-            'resumen': obj.resumen,
-            'contenido': obj.contenido,
-        }
-        hist = modelos.NoticiaHistorial(
-            noticia_id=obj.id,
-            usuario_id=user.id if user else None,
-            accion='delete',
-            cambios={'before': before}
+    obj.deleted_at = func.now()
+    db.add(modelos.NoticiaHistorial(
+        noticia_id=obj.id,
+        usuario_id=user.id if user else None,
+        accion='delete',
+        cambios={'before': {'titulo': obj.titulo, 'slug': obj.slug, 'resumen': obj.resumen}}
+    ))
+    db.commit()
+    invalidar_noticias()
+    # Sale de las listas de relacionadas de las demás
+    background_tasks.add_task(actualizar_relacionadas, noticia_id)
+
+
+@router.post("/{noticia_id}/restaurar", response_model=esquemas.NoticiaRespuesta)
+def restaurar_noticia(noticia_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db), user: modelos.Usuario = Depends(get_current_user)):
+    """
+    Saca una noticia de la papelera con el estado que tenía.
+    """
+    obj = db.get(modelos.Noticia, noticia_id)
+    if not obj or obj.deleted_at is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Noticia no encontrada en la papelera"
         )
-        db.add(hist)
-        db.commit()
-    except Exception:
-        db.rollback()
+    user_role_name = None
+    if user and user.rol_id:
+        user_role_name = nombre_rol(user.rol_id)
 
-    db.delete(obj)
+    if user_role_name not in ("admin", "editor") and obj.autor_id != user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Permisos insuficientes para restaurar esta noticia")
+
+    obj.deleted_at = None
+    db.add(modelos.NoticiaHistorial(
+        noticia_id=obj.id,
+        usuario_id=user.id if user else None,
+        accion='restore',
+        cambios={'after': {'titulo': obj.titulo, 'slug': obj.slug}}
+    ))
     db.commit()
+    db.refresh(obj)
+    invalidar_noticias()
+    background_tasks.add_task(actualizar_relacionadas, obj.id)
+    return RespuestaJSON(ensamblar_noticia(db, obj, estado_por_defecto=None))
 
 @router.get("/estadisticas/resumen")
 def obtener_estadisticas(db: Session = Depends(get_db)):
     """
     Devuelve estadísticas básicas de las noticias.
     """
-    total_noticias = db.query(modelos.Noticia).count()
-    noticias_destacadas = db.query(modelos.Noticia).filter(modelos.Noticia.destacada == True).count()
-    total_vistas = db.query(func.sum(modelos.Noticia.visitas)).scalar() or 0
-    total_likes = db.query(func.sum(modelos.Noticia.likes)).scalar() or 0
+    # La papelera no cuenta
+    activas = modelos.Noticia.deleted_at.is_(None)
+    total_noticias = db.query(modelos.Noticia).filter(activas).count()
+    noticias_destacadas = db.query(modelos.Noticia).filter(activas, modelos.Noticia.destacada == True).count()
+    total_vistas = db.query(func.sum(modelos.Noticia.visitas)).filter(activas).scalar() or 0
+    total_likes = db.query(func.sum(modelos.Noticia.likes)).filter(activas).scalar() or 0
     
     return {
         "total_noticias": total_noticias,
@@ -772,53 +733,78 @@ def obtener_estadisticas(db: Session = Depends(get_db)):
     }
 
 
-@router.get("/admin/all", response_model=list[esquemas.NoticiaRespuesta])
-def listar_noticias_admin(db: Session = Depends(get_db), _u: modelos.Usuario = Depends(require_role(["admin", "editor", "internacional"]))):
-    """
-    Devuelve todas las noticias (uso interno admin/editor).
-    """
-    noticias = db.query(modelos.Noticia).order_by(modelos.Noticia.fecha_publicacion.desc()).all()
-    for noticia in noticias:
-        noticia.imagen = noticia.imagen_principal
-        noticia.fecha = noticia.fecha_publicacion
-        noticia.vistas = noticia.visitas or 0
-        noticia.compartidos = noticia.shares or 0
-        if noticia.categoria_id:
-            cat = db.get(modelos.Categoria, noticia.categoria_id)
-            noticia.categoria = cat.nombre if cat else None
-        if noticia.autor_id:
-            u = db.get(modelos.Usuario, noticia.autor_id)
-            if u:
-                noticia.autor_info = esquemas.AutorInfo(
-                    nombre=u.nombre_usuario,
-                    titulo=u.titulo,
-                    descripcion=u.biografia,
-                    avatar=u.avatar,
-                    nivel=u.nivel,
-                    experiencia_años=u.experiencia_años,
-                    articulos_total=u.articulos_publicados,
-                    seguidores=u.seguidores,
-                    precision=u.precision_rating,
-                    especialidades=u.especialidades or [],
-                    logros=u.logros or [],
-                    top_anime=u.anime_favoritos or [],
-                    redes_sociales=u.redes_sociales or {},
-                    frase=u.frase_personal,
-                )
-        # Attach last edit info
-        last = db.query(modelos.NoticiaHistorial).filter(modelos.NoticiaHistorial.noticia_id == noticia.id).order_by(modelos.NoticiaHistorial.created_at.desc()).first()
-        if last:
-            if last.usuario_id:
-                uu = db.get(modelos.Usuario, last.usuario_id)
-                noticia.last_edited_by = uu.nombre_usuario if uu else None
-            noticia.last_edited_at = last.created_at
-        # Añadir estado textual para admin (si existe) o marcar como 'publicado' por defecto
-        if noticia.estado_id:
-            est = db.get(modelos.EstadoNoticia, noticia.estado_id)
-            noticia.estado = est.nombre if est else 'publicado'
-        else:
-            noticia.estado = 'publicado'
-    return noticias
+# Filas que se leen del cursor del servidor en cada vuelta del listado admin
+LOTE_ADMIN = 200
+
+
+def _stream_admin(incluir_contenido: bool, limite: int | None, offset: int):
+    # Sesión propia: la de Depends(get_db) se cierra antes de enviar la respuesta
+    db = SessionLocal()
+    try:
+        query = (
+            consulta_admin(db, incluir_contenido)
+            .filter(modelos.Noticia.deleted_at.is_(None))
+            .order_by(modelos.Noticia.fecha_publicacion.desc(), modelos.Noticia.id.desc())
+            .offset(offset)
+        )
+        if limite is not None:
+            query = query.limit(limite)
+        for fila in query.yield_per(LOTE_ADMIN):
+            yield a_json(fila_admin(fila, resumen=not incluir_contenido))
+    finally:
+        db.close()
+
+
+def _como_array_json(elementos):
+    yield b"["
+    for i, elemento in enumerate(elementos):
+        yield elemento if i == 0 else b"," + elemento
+    yield b"]"
+
+
+@router.get("/admin/all", response_model=list[esquemas.NoticiaResumen] | list[esquemas.NoticiaRespuesta])
+def listar_noticias_admin(
+    limite: int | None = None,
+    offset: int = 0,
+    formato: Literal["json", "ndjson"] = "json",
+    incluir_contenido: bool = False,
+    _u: modelos.Usuario = Depends(require_role(["admin", "editor", "internacional"])),
+):
+    """
+    Devuelve las noticias (uso interno admin/editor), más recientes primero.
+
+    Se genera con una única consulta (categoría, estado, autor y última edición
+    vía LATERAL) leída por lotes y enviada en streaming, así que la memoria no
+    crece con el archivo. `limite`/`offset` paginan; `formato=ndjson` emite una
+    noticia por línea. Por defecto en modo resumen; `incluir_contenido=true`
+    devuelve la noticia completa.
+    """
+    filas = _stream_admin(incluir_contenido, limite, max(offset, 0))
+    if formato == "ndjson":
+        return StreamingResponse((fila + b"\n" for fila in filas), media_type="application/x-ndjson")
+    return StreamingResponse(_como_array_json(filas), media_type="application/json")
+
+
+@router.get("/admin/papelera", response_model=list[esquemas.NoticiaResumen])
+def listar_papelera(
+    limite: int = 50,
+    offset: int = 0,
+    db: Session = Depends(get_db),
+    _u: modelos.Usuario = Depends(require_role(["admin", "editor", "internacional"])),
+):
+    """
+    Noticias en la papelera, las borradas más recientemente primero.
+    `fecha_eliminacion` indica desde cuándo; se purgan tras PAPELERA_DIAS.
+    """
+    filas = (
+        consulta_admin(db)
+        .filter(modelos.Noticia.deleted_at.isnot(None))
+        .order_by(modelos.Noticia.deleted_at.desc())
+        .offset(max(offset, 0))
+        .limit(min(max(limite, 1), 200))
+        .all()
+    )
+    return RespuestaJSON([fila_admin(fila) for fila in filas], tipo=list[esquemas.NoticiaResumen])
 
 
 @router.get("/admin/{noticia_id}", response_model=esquemas.NoticiaRespuesta)
@@ -831,48 +817,7 @@ def obtener_noticia_admin(noticia_id: int, db: Session = Depends(get_db), _u: mo
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Noticia no encontrada")
 
     # Mapear respuesta sin filtrar por estado
-    noticia.imagen = noticia.imagen_principal
-    noticia.fecha = noticia.fecha_publicacion
-    noticia.vistas = noticia.visitas or 0
-    noticia.compartidos = noticia.shares or 0
-    if noticia.categoria_id:
-        cat = db.get(modelos.Categoria, noticia.categoria_id)
-        noticia.categoria = cat.nombre if cat else None
-    if noticia.autor_id:
-        u = db.get(modelos.Usuario, noticia.autor_id)
-        if u:
-            noticia.autor_info = esquemas.AutorInfo(
-                nombre=u.nombre_usuario,
-                titulo=u.titulo,
-                descripcion=u.biografia,
-                avatar=u.avatar,
-                nivel=u.nivel,
-                experiencia_años=u.experiencia_años,
-                articulos_total=u.articulos_publicados,
-                seguidores=u.seguidores,
-                precision=u.precision_rating,
-                especialidades=u.especialidades or [],
-                logros=u.logros or [],
-                top_anime=u.anime_favoritos or [],
-                redes_sociales=u.redes_sociales or {},
-                frase=u.frase_personal,
-            )
-    # Añadir info de última edición desde el historial
-    last = db.query(modelos.NoticiaHistorial).filter(modelos.NoticiaHistorial.noticia_id == noticia.id).order_by(modelos.NoticiaHistorial.created_at.desc()).first()
-    if last:
-        if last.usuario_id:
-            u = db.get(modelos.Usuario, last.usuario_id)
-            noticia.last_edited_by = u.nombre_usuario if u else None
-        noticia.last_edited_at = last.created_at
-
-    # Añadir estado textual
-    if noticia.estado_id:
-        est = db.get(modelos.EstadoNoticia, noticia.estado_id)
-        noticia.estado = est.nombre if est else 'publicado'
-    else:
-        noticia.estado = 'publicado'
-
-    return noticia
+    return RespuestaJSON(ensamblar_noticia(db, noticia, con_ultima_edicion=True))
 
 
 @router.get("/{noticia_id}/historial", response_model=list[esquemas.NoticiaHistorialItem])
@@ -904,21 +849,65 @@ def obtener_historial_noticia(noticia_id: int, limite: int = 50, offset: int = 0
             'comentario': f.comentario,
             'created_at': f.created_at,
         })
-    return resultados
+    return RespuestaJSON(resultados)
 
 @router.post("/{noticia_id}/like")
-def dar_like_noticia(noticia_id: int, db: Session = Depends(get_db)):
+def dar_like_noticia(noticia_id: int, request: Request, db: Session = Depends(get_db)):
     """
     Incrementa el contador de likes de una noticia.
+    Un mismo cliente (IP) sólo puede dar un like por noticia dentro de la ventana
+    de `filtro_likes`; los repetidos se rechazan sin escribir en la base de datos.
+    Los ids inexistentes o no publicados se rechazan antes de marcar al cliente;
+    la marca se reserva de forma atómica antes del UPDATE, así que una ráfaga en
+    paralelo del mismo cliente cuenta una sola vez (si la escritura falla, la
+    marca queda y el reintento recibe 429 hasta que rote la ventana).
     """
-    noticia = db.get(modelos.Noticia, noticia_id)
-    if not noticia:
+    if not noticia_publicada(db, noticia_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Noticia no encontrada")
+    if not filtro_likes.agregar_si_nueva(f"{ip_cliente(request)}:{noticia_id}"):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Ya diste like a esta noticia"
+        )
+
+    # Incremento atómico en la base de datos (sin leer-modificar-escribir en Python)
+    likes = db.execute(
+        text("""
+            UPDATE noticias SET likes = COALESCE(likes, 0) + 1, tendencia = log2_sumar(tendencia, :inc)
+            WHERE id = :id AND publicada RETURNING likes
+        """),
+        {"id": noticia_id, "inc": tendencias.incremento(tendencias.PESO_LIKE)},
+    ).scalar()
+    if likes is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Noticia no encontrada"
         )
-    
-    noticia.likes += 1
     db.commit()
-    
-    return {"likes": noticia.likes, "mensaje": "Like agregado correctamente"}
+
+    return {"likes": likes, "mensaje": "Like agregado correctamente"}
+
+@router.post("/{noticia_id}/compartir")
+def registrar_compartido(noticia_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    Registra que la noticia se compartió. Repeticiones del mismo cliente dentro
+    de la ventana de `filtro_likes` no suman.
+    """
+    if not noticia_publicada(db, noticia_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Noticia no encontrada")
+    if not filtro_likes.agregar_si_nueva(f"compartir:{ip_cliente(request)}:{noticia_id}"):
+        return {"ok": True}
+    compartidos = db.execute(
+        text("""
+            UPDATE noticias SET shares = COALESCE(shares, 0) + 1, tendencia = log2_sumar(tendencia, :inc)
+            WHERE id = :id AND publicada RETURNING shares
+        """),
+        {"id": noticia_id, "inc": tendencias.incremento(tendencias.PESO_COMPARTIDO)},
+    ).scalar()
+    if compartidos is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Noticia no encontrada"
+        )
+    db.commit()
+    return {"ok": True, "compartidos": compartidos}
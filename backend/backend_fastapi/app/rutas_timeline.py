@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Request
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
-from app.base_datos import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.base_datos import SessionLocal, AsyncSessionLocal
+from app.replica import usar_replica
 from app import modelos
 from app.rutas_auth import require_role
+from app.cache import cache_timeline, invalidar_timeline
+from app.cache_http import preparar, responder
 
 router = APIRouter(tags=["Timeline"])
 
@@ -15,27 +20,34 @@ def get_db():
         db.close()
 
 
+async def get_db_async(request: Request):
+    async with AsyncSessionLocal(info={"replica": usar_replica(request)}) as db:
+        yield db
+
+
 # ─── Endpoints públicos ───────────────────────────────────────────────────────
 
 @router.get("/categorias", response_model=list[dict])
-def listar_categorias(db: Session = Depends(get_db)):
-    cats = db.query(modelos.TimelineCategoria).order_by(modelos.TimelineCategoria.nombre).all()
+async def listar_categorias(db: AsyncSession = Depends(get_db_async)):
+    cats = (await db.scalars(select(modelos.TimelineCategoria).order_by(modelos.TimelineCategoria.nombre))).all()
     return [{"id": c.id, "nombre": c.nombre} for c in cats]
 
 
 @router.get("/eventos", response_model=list[dict])
-def listar_eventos(db: Session = Depends(get_db)):
-    eventos = (
-        db.query(modelos.TimelineEvento)
+async def listar_eventos(request: Request, db: AsyncSession = Depends(get_db_async)):
+    cacheado = cache_timeline.obtener("eventos")
+    if cacheado is not None:
+        return responder(request, cacheado, "timeline")
+    eventos = (await db.scalars(
+        select(modelos.TimelineEvento)
         .options(
             joinedload(modelos.TimelineEvento.participantes).joinedload(
                 modelos.TimelineParticipante.categoria
             )
         )
         .order_by(modelos.TimelineEvento.anio.desc())
-        .all()
-    )
-    return [
+    )).unique().all()
+    datos = [
         {
             "id": e.id,
             "anio": e.anio,
@@ -55,6 +67,9 @@ def listar_eventos(db: Session = Depends(get_db)):
         }
         for e in eventos
     ]
+    entrada = preparar(datos)
+    cache_timeline.guardar("eventos", entrada)
+    return responder(request, entrada, "timeline")
 
 
 # ─── Eventos (editor / admin) ─────────────────────────────────────────────────
@@ -75,6 +90,7 @@ def crear_evento(
     evento = modelos.TimelineEvento(anio=int(anio), titulo_evento=titulo)
     db.add(evento)
     db.commit()
+    invalidar_timeline()
     db.refresh(evento)
     return {"id": evento.id, "anio": evento.anio, "titulo_evento": evento.titulo_evento}
 
@@ -94,6 +110,7 @@ def actualizar_evento(
     if "titulo_evento" in payload:
         evento.titulo_evento = payload["titulo_evento"].strip()
     db.commit()
+    invalidar_timeline()
     db.refresh(evento)
     return {"id": evento.id, "anio": evento.anio, "titulo_evento": evento.titulo_evento}
 
@@ -109,6 +126,7 @@ def eliminar_evento(
         raise HTTPException(404, detail="Evento no encontrado")
     db.delete(evento)
     db.commit()
+    invalidar_timeline()
 
 
 # ─── Participantes (editor / admin) ──────────────────────────────────────────
@@ -138,6 +156,7 @@ def crear_participante(
     )
     db.add(p)
     db.commit()
+    invalidar_timeline()
     db.refresh(p)
     return {"id": p.id, "nombre": p.nombre, "evento_id": p.evento_id, "categoria_id": p.categoria_id}
 
@@ -162,6 +181,7 @@ def actualizar_participante(
     if "evento_id" in payload:
         p.evento_id = int(payload["evento_id"])
     db.commit()
+    invalidar_timeline()
     db.refresh(p)
     return {"id": p.id, "nombre": p.nombre, "es_ganador": p.es_ganador}
 
@@ -177,6 +197,7 @@ def eliminar_participante(
         raise HTTPException(404, detail="Participante no encontrado")
     db.delete(p)
     db.commit()
+    invalidar_timeline()
 
 
 # ─── Categorías (editor / admin) ──────────────────────────────────────────────
@@ -193,6 +214,7 @@ def crear_categoria(
     cat = modelos.TimelineCategoria(nombre=nombre)
     db.add(cat)
     db.commit()
+    invalidar_timeline()
     db.refresh(cat)
     return {"id": cat.id, "nombre": cat.nombre}
 
@@ -209,6 +231,7 @@ def actualizar_categoria(
         raise HTTPException(404, detail="Categoría no encontrada")
     cat.nombre = (payload.get("nombre") or cat.nombre).strip()
     db.commit()
+    invalidar_timeline()
     db.refresh(cat)
     return {"id": cat.id, "nombre": cat.nombre}
 
@@ -224,3 +247,4 @@ def eliminar_categoria(
         raise HTTPException(404, detail="Categoría no encontrada")
     db.delete(cat)
     db.commit()
+    invalidar_timeline()
@@ -6,8 +6,10 @@ import io
 from pathlib import Path
 import uuid
 from PIL import Image
+from sqlalchemy.orm import undefer
 from app.base_datos import SessionLocal
 from app.modelos import Usuario, Noticia
+from app.cache import invalidar_noticias, invalidar_autor
 
 router = APIRouter(
     prefix="/api/uploads",
@@ -121,6 +123,7 @@ async def subir_imagen(file: UploadFile = File(...), usuario_id: int | None = No
                     user.avatar = f"/api/uploads/blob/usuario/{usuario_id}"
                     db.add(user)
                     db.commit()
+                    invalidar_autor(usuario_id)
                     image_url = user.avatar
 
                 if noticia_id is not None:
@@ -131,6 +134,7 @@ async def subir_imagen(file: UploadFile = File(...), usuario_id: int | None = No
                     noticia.imagen_principal = f"/api/uploads/blob/noticia/{noticia_id}"
                     db.add(noticia)
                     db.commit()
+                    invalidar_noticias()
                     image_url = noticia.imagen_principal
 
             finally:
@@ -182,7 +186,7 @@ async def obtener_imagen(filename: str):
 async def obtener_avatar_blob(usuario_id: int):
     db = SessionLocal()
     try:
-        user = db.query(Usuario).filter(Usuario.id == usuario_id).first()
+        user = db.query(Usuario).options(undefer(Usuario.avatar_blob)).filter(Usuario.id == usuario_id).first()
         if not user or not user.avatar_blob:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Avatar no encontrado")
         return StreamingResponse(io.BytesIO(user.avatar_blob), media_type="image/jpeg")
@@ -194,7 +198,7 @@ async def obtener_avatar_blob(usuario_id: int):
 async def obtener_imagen_blob(noticia_id: int):
     db = SessionLocal()
     try:
-        noticia = db.query(Noticia).filter(Noticia.id == noticia_id).first()
+        noticia = db.query(Noticia).options(undefer(Noticia.imagen_blob)).filter(Noticia.id == noticia_id).first()
         if not noticia or not noticia.imagen_blob:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Imagen de noticia no encontrada")
         return StreamingResponse(io.BytesIO(noticia.imagen_blob), media_type="image/jpeg")
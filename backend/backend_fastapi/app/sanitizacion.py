@@ -0,0 +1,82 @@
+"""
+Sanitización del HTML de CKEditor con nh3.
+
+- El resultado se cachea por hash del contenido (LRU acotado): volver a guardar
+  el mismo texto mientras se edita no repite el trabajo.
+- Se limpia en línea: las rutas que guardan son síncronas (threadpool) y
+  `nh3.clean` libera el GIL mientras trabaja, así que un documento grande no
+  bloquea al resto de peticiones del worker.
+- El conteo de palabras para `tiempo_lectura` sale de la misma pasada.
+"""
+
+import hashlib
+import math
+import re
+
+import nh3
+
+from app.cache import cache_sanitizado
+
+# Tags y atributos que CKEditor genera legítimamente
+_HTML_TAGS = {
+    'p', 'br', 'hr', 'strong', 'em', 'u', 's', 'b', 'i', 'mark',
+    'h2', 'h3', 'h4', 'h5', 'h6',
+    'ul', 'ol', 'li', 'blockquote', 'pre', 'code',
+    'a', 'img',
+    'table', 'thead', 'tbody', 'tfoot', 'tr', 'th', 'td', 'caption',
+    'figure', 'figcaption', 'oembed',
+    'span', 'div',
+}
+_HTML_ATTRS: dict[str, set[str]] = {
+    'a':        {'href', 'title', 'target'},
+    'img':      {'src', 'alt', 'width', 'height', 'class'},
+    'figure':   {'class'},
+    'figcaption': {'class'},
+    'div':      {'class'},
+    'span':     {'class'},
+    'p':        {'class'},
+    'h2':       {'class'}, 'h3': {'class'}, 'h4': {'class'},
+    'ul':       {'class'}, 'ol': {'class'}, 'li': {'class'},
+    'blockquote': {'class'},
+    'pre':      {'class'}, 'code': {'class'},
+    'table':    {'class'},
+    'td':       {'colspan', 'rowspan', 'class'},
+    'th':       {'colspan', 'rowspan', 'class'},
+    'oembed':   {'url'},
+}
+
+_PATRON_MARCADO = re.compile(r'<[^>]*>|&[a-zA-Z#0-9]+;')
+
+
+def _limpiar(html: str) -> tuple[str, int]:
+    limpio = nh3.clean(
+        html,
+        tags=_HTML_TAGS,
+        attributes=_HTML_ATTRS,
+        url_schemes={'https', 'http'},
+        strip_comments=True,
+        link_rel='noopener noreferrer',
+    )
+    palabras = len(_PATRON_MARCADO.sub(' ', limpio).split())
+    return limpio, palabras
+
+
+def sanitizar_contenido(html: str | None) -> tuple[str | None, int]:
+    """Devuelve (HTML limpio, número de palabras del texto visible)."""
+    if not html:
+        return html, 0
+    clave = hashlib.blake2b(html.encode('utf-8'), digest_size=16).digest()
+    resultado = cache_sanitizado.obtener(clave)
+    if resultado is None:
+        resultado = _limpiar(html)
+        cache_sanitizado.guardar(clave, resultado)
+    return resultado
+
+
+def sanitizar_html(html: str | None) -> str | None:
+    return sanitizar_contenido(html)[0]
+
+
+def tiempo_lectura(palabras: int) -> int:
+    """Minutos estimados de lectura (200 palabras por minuto, mínimo 1)."""
+    return max(1, math.ceil(palabras / 200)) if palabras else 0
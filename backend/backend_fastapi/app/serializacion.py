@@ -0,0 +1,58 @@
+"""
+Serialización JSON sin pasar por la revalidación de FastAPI.
+
+Con `response_model`, FastAPI vuelve a validar lo que devuelve la ruta contra el
+modelo y después lo codifica con `json.dumps`: con un listado de 100 noticias
+eso cuesta más que construirlas (ver scripts/bench_serializacion.py). Las
+respuestas que ya son modelos construidos por `app.ensamblador` se convierten
+directamente a bytes:
+
+- `a_json(datos, tipo)`: con `tipo` usa un `TypeAdapter` cacheado por tipo; sin
+  él, orjson (en requirements.txt) para datos planos y `pydantic_core.to_json`
+  para el resto (modelos, fechas, etc.) o si orjson no está instalado.
+- `RespuestaJSON`: clase de respuesta basada en `a_json`. Devolverla desde una
+  ruta evita la revalidación; `response_model` queda sólo para la documentación.
+"""
+
+from functools import cache
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+try:
+    import orjson
+except ImportError:  # entornos sin las dependencias completas: pydantic_core
+    orjson = None
+
+# Mismo formato que pydantic: UTC como 'Z' y claves no textuales convertidas
+_OPCIONES_ORJSON = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+@cache
+def adaptador(tipo) -> TypeAdapter:
+    """`TypeAdapter` de `tipo` (construir el esquema es caro; se hace una vez)."""
+    return TypeAdapter(tipo)
+
+
+def a_json(datos: Any, tipo=None) -> bytes:
+    if tipo is not None:
+        return adaptador(tipo).dump_json(datos)
+    if orjson is not None:
+        try:
+            return orjson.dumps(datos, option=_OPCIONES_ORJSON)
+        except TypeError:
+            pass  # modelos pydantic u otros tipos que orjson no conoce
+    return to_json(datos)
+
+
+class RespuestaJSON(Response):
+    media_type = "application/json"
+
+    def __init__(self, content: Any = None, tipo=None, **kwargs):
+        self.tipo = tipo
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return a_json(content, self.tipo)
@@ -0,0 +1,106 @@
+"""
+Asignación de slugs únicos para noticias.
+
+En lugar de probar `base`, `base-1`, `base-2`... con una consulta por intento,
+se leen de una vez todos los slugs ocupados con ese prefijo (LIKE 'base%',
+resuelto con el índice `varchar_pattern_ops`) y se elige en memoria el primer
+sufijo libre. Si otra petición concurrente gana la carrera, la violación de
+unicidad se reintenta dentro de un SAVEPOINT.
+"""
+
+import re
+
+from fastapi import HTTPException, status
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import modelos
+from app.utils import generar_slug
+
+SLUG_POR_DEFECTO = 'noticia'
+MAX_LONGITUD = 340  # deja sitio al sufijo dentro de String(350)
+INTENTOS = 5
+# Prefijos por consulta en modo lote (un OR de LIKE por prefijo)
+LOTE_PREFIJOS = 200
+
+
+def base_slug(titulo: str) -> str:
+    return generar_slug(titulo or '')[:MAX_LONGITUD].strip('-') or SLUG_POR_DEFECTO
+
+
+def _primer_libre(base: str, ocupados: set[str]) -> str:
+    if base not in ocupados:
+        return base
+    n = 1
+    while f"{base}-{n}" in ocupados:
+        n += 1
+    return f"{base}-{n}"
+
+
+def _ocupados(db: Session, bases: list[str], excluir_id: int | None = None) -> set[str]:
+    """Slugs existentes que empiezan por alguna de las bases (una consulta por lote)."""
+    N = modelos.Noticia
+    ocupados: set[str] = set()
+    for i in range(0, len(bases), LOTE_PREFIJOS):
+        # generar_slug sólo produce [a-z0-9-], así que no hay comodines que escapar
+        query = db.query(N.slug).filter(or_(*[N.slug.like(f"{b}%") for b in bases[i:i + LOTE_PREFIJOS]]))
+        if excluir_id is not None:
+            query = query.filter(N.id != excluir_id)
+        ocupados.update(fila[0] for fila in query)
+    return ocupados
+
+
+def asignar_slug(db: Session, titulo: str, excluir_id: int | None = None) -> str:
+    """Primer slug libre para `titulo` (`base`, `base-1`, `base-2`, ...)."""
+    base = base_slug(titulo)
+    return _primer_libre(base, _ocupados(db, [base], excluir_id))
+
+
+def asignar_slugs(db: Session, titulos: list[str]) -> list[str]:
+    """
+    Modo lote para scripts de importación: un slug libre por título, sin
+    repetir dentro del propio lote, con una consulta por cada `LOTE_PREFIJOS`.
+    """
+    bases = [base_slug(t) for t in titulos]
+    ocupados = _ocupados(db, sorted(set(bases)))
+    resultado = []
+    for base in bases:
+        slug = _primer_libre(base, ocupados)
+        ocupados.add(slug)
+        resultado.append(slug)
+    return resultado
+
+
+def conserva_slug(slug_actual: str | None, titulo: str) -> bool:
+    """True si el slug actual ya corresponde al título (`base` o `base-N`)."""
+    return bool(slug_actual) and re.fullmatch(rf"{re.escape(base_slug(titulo))}(-\d+)?", slug_actual) is not None
+
+
+def _choca_slug(error: IntegrityError) -> bool:
+    diag = getattr(error.orig, 'diag', None)
+    restriccion = getattr(diag, 'constraint_name', None) or str(error.orig)
+    return 'slug' in restriccion
+
+
+def guardar_con_slug(db: Session, noticia: modelos.Noticia, titulo: str) -> str:
+    """
+    Asigna a `noticia` un slug libre y la escribe (INSERT o UPDATE) dentro de un
+    SAVEPOINT; si otra transacción ocupó el slug entretanto, recalcula y reintenta.
+    En actualizaciones, el resto de cambios debe haberse enviado antes con `flush()`.
+    """
+    for _ in range(INTENTOS):
+        slug = asignar_slug(db, titulo, excluir_id=noticia.id)
+        try:
+            with db.begin_nested():
+                noticia.slug = slug
+                db.add(noticia)
+                db.flush()
+            return slug
+        except IntegrityError as e:
+            if not _choca_slug(e):
+                raise
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="No se pudo asignar un slug único, inténtalo de nuevo"
+    )
@@ -0,0 +1,35 @@
+"""
+Puntuación de tendencia con decaimiento exponencial, actualizada por eventos.
+
+Cada evento (vista, like, compartido) suma `peso · 2^((t − ÉPOCA) / vida_media)`.
+Multiplicar todas las puntuaciones por el mismo factor no cambia el orden, así
+que en lugar de envejecer las puntuaciones antiguas se hace "crecer" el peso de
+los eventos nuevos (forward decay). Para que no desborde se guarda en escala
+logarítmica: `noticias.tendencia = log2(Σ pesos)` y cada evento se suma con
+`log2_sumar` (ver esquema_db.py).
+
+El top-N es un recorrido del índice `ix_noticias_tendencia`, sin reagregar
+historia. Cambiar TENDENCIAS_VIDA_MEDIA_HORAS sólo afecta a eventos nuevos.
+"""
+
+import math
+import os
+from datetime import datetime, timezone
+
+VIDA_MEDIA_HORAS = float(os.getenv("TENDENCIAS_VIDA_MEDIA_HORAS", "24"))
+EPOCA = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+PESO_VISTA = 1.0
+PESO_LIKE = 3.0
+PESO_COMPARTIDO = 5.0
+
+
+def exponente_actual() -> float:
+    """log2 del peso de un evento unitario ocurrido ahora."""
+    horas = (datetime.now(timezone.utc) - EPOCA).total_seconds() / 3600
+    return horas / VIDA_MEDIA_HORAS
+
+
+def incremento(peso: float, cantidad: int = 1) -> float:
+    """Valor a combinar con `log2_sumar(tendencia, incremento)`."""
+    return math.log2(peso * cantidad) + exponente_actual()
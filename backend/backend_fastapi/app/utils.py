@@ -1,4 +1,7 @@
 import re
+import base64
+import ipaddress
+import os
 import unicodedata
 from typing import List
 import json
@@ -32,3 +35,63 @@ def generar_slug(titulo: str) -> str:
     slug = slug.strip('-')
     
     return slug
+
+
+def codificar_cursor(*valores) -> str:
+    """
+    Codifica los valores de la última fila de una página en un cursor opaco
+    (base64 url-safe de una lista JSON). Fechas se serializan en ISO.
+    """
+    datos = [v.isoformat() if hasattr(v, 'isoformat') else v for v in valores]
+    crudo = json.dumps(datos, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(crudo).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor: str) -> list:
+    """Inverso de `codificar_cursor`. Lanza ValueError si el cursor no es válido."""
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except Exception as e:
+        raise ValueError("Cursor inválido") from e
+    if not isinstance(datos, list):
+        raise ValueError("Cursor inválido")
+    return datos
+
+
+# Proxies cuyo X-Forwarded-For se acepta (IPs o redes, separadas por comas).
+# Por defecto loopback y redes privadas: Caddy llega por la red interna de
+# docker; el puerto 8000 del backend no se publica (ver docker-compose.yml).
+PROXIES_CONFIABLES = [
+    ipaddress.ip_network(red.strip(), strict=False)
+    for red in os.getenv(
+        "PROXIES_CONFIABLES", "127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16"
+    ).split(",")
+    if red.strip()
+]
+
+
+def _es_proxy_confiable(ip: str) -> bool:
+    try:
+        direccion = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return any(direccion in red for red in PROXIES_CONFIABLES)
+
+
+def ip_cliente(request) -> str:
+    """
+    IP del cliente. X-Forwarded-For sólo cuenta si la conexión viene de un proxy
+    confiable (Caddy); entonces se recorre de derecha a izquierda saltando los
+    proxies confiables y se devuelve la primera dirección que no lo es, que es
+    la que vio el último proxy. Lo que el cliente escriba a la izquierda no se usa.
+    """
+    directa = request.client.host if request.client else 'desconocida'
+    reenviada = request.headers.get('x-forwarded-for')
+    if not reenviada or not _es_proxy_confiable(directa):
+        return directa
+    direcciones = [d.strip() for d in reenviada.split(',') if d.strip()]
+    for direccion in reversed(direcciones):
+        if not _es_proxy_confiable(direccion):
+            return direccion
+    return direcciones[0] if direcciones else directa
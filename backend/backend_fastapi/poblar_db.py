@@ -11,7 +11,8 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app.base_datos import SessionLocal
 from app.modelos import Noticia
-from app.utils import generar_slug, tags_a_json
+from app.utils import tags_a_json
+from app.slugs import asignar_slugs
 
 def poblar_noticias():
     db = SessionLocal()
@@ -112,10 +113,10 @@ El seinen no teme abordar temas difíciles: la moralidad ambigua, la corrupción
             }
         ]
         
-        for noticia_data in noticias_ejemplo:
-            # Generar slug único
-            slug = generar_slug(noticia_data["titulo"])
-            
+        # Slugs únicos para todo el lote en una sola consulta
+        slugs = asignar_slugs(db, [n["titulo"] for n in noticias_ejemplo])
+
+        for noticia_data, slug in zip(noticias_ejemplo, slugs):
             # Convertir tags a JSON
             tags_json = tags_a_json(noticia_data.pop("tags"))
             
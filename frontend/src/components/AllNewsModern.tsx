@@ -21,6 +21,8 @@ export default function AllNewsModern() {
   const [currentPage, setCurrentPage] = useState(1);
   const [showScrollTop, setShowScrollTop] = useState(false);
   const [allNews, setAllNews] = useState<NoticiaTipo[]>([]);
+  // Resultados de la búsqueda de texto completo del backend (null = sin búsqueda)
+  const [searchResults, setSearchResults] = useState<NoticiaTipo[] | null>(null);
   const noticiasPerPage = 9;
   const [copiedId, setCopiedId] = useState<number | null>(null);
 
@@ -57,16 +59,9 @@ export default function AllNewsModern() {
     return [CATEGORIA_TODAS, ...Array.from(set).sort((a, b) => a.localeCompare(b))];
   }, [allNews]);
 
-  // Filtrar y ordenar noticias
-  const filteredNews = useMemo(() => allNews
-    .filter(noticia => {
-      const s = searchTerm.trim().toLowerCase();
-      const matchesSearch = !s
-        || (noticia.titulo ?? '').toLowerCase().includes(s)
-        || (noticia.contenido ?? '').toLowerCase().includes(s);
-      const matchesCategory = selectedCategory === CATEGORIA_TODAS || noticia.categoria === selectedCategory;
-      return matchesSearch && matchesCategory;
-    })
+  // Filtrar y ordenar noticias (la búsqueda la resuelve el backend)
+  const filteredNews = useMemo(() => (searchResults ?? allNews)
+    .filter(noticia => selectedCategory === CATEGORIA_TODAS || noticia.categoria === selectedCategory)
     .sort((a, b) => {
       switch (sortBy) {
         case 'popularidad':
@@ -76,7 +71,7 @@ export default function AllNewsModern() {
         default:
           return new Date(b.fecha).getTime() - new Date(a.fecha).getTime();
       }
-    }), [allNews, searchTerm, selectedCategory, sortBy]);
+    }), [allNews, searchResults, selectedCategory, sortBy]);
 
   // Paginación
   const totalPages = Math.ceil(filteredNews.length / noticiasPerPage);
@@ -148,6 +143,26 @@ export default function AllNewsModern() {
     return () => { mounted = false; };
   }, []);
 
+  // Búsqueda en el backend (texto completo sobre título, resumen y contenido),
+  // con una espera corta para no lanzar una petición por tecla
+  useEffect(() => {
+    const termino = searchTerm.trim();
+    if (!termino) {
+      setSearchResults(null);
+      return;
+    }
+    let mounted = true;
+    const t = setTimeout(async () => {
+      try {
+        const noticias = await fetchJson<NoticiaTipo[]>(`/api/noticias/?buscar=${encodeURIComponent(termino)}&limite=60`);
+        if (mounted) setSearchResults(Array.isArray(noticias) ? noticias : []);
+      } catch {
+        if (mounted) setSearchResults([]);
+      }
+    }, 300);
+    return () => { mounted = false; clearTimeout(t); };
+  }, [searchTerm]);
+
   const scrollToTop = () => {
     window.scrollTo({ top: 0, behavior: 'smooth' });
   };
@@ -349,7 +364,7 @@ export default function AllNewsModern() {
                       <span className="flex items-center gap-1"><Calendar className="w-3 h-3" />{new Date(noticia.fecha).toLocaleDateString('es-ES')}</span>
                       <span className="flex items-center gap-1"><Eye className="w-3 h-3" />{noticia.vistas.toLocaleString()}</span>
                     </div>
-                    <p className="text-stone-600 text-sm leading-relaxed font-['Cormorant_Garamond'] line-clamp-3 mb-4 flex-1">{truncateWords(noticia.resumen || noticia.contenido, 50)}</p>
+                    <p className="text-stone-600 text-sm leading-relaxed font-['Cormorant_Garamond'] line-clamp-3 mb-4 flex-1">{truncateWords(noticia.resumen, 50)}</p>
                     <div className="flex items-center justify-between pt-3 border-t border-stone-100">
                       <div className="flex items-center gap-2 min-w-0">
                         {noticia.autor_info?.avatar ? (
@@ -440,7 +455,7 @@ export default function AllNewsModern() {
                       </h2>
 
                       <p className="text-stone-600 leading-relaxed font-['Cormorant_Garamond'] mb-6 line-clamp-3">
-                        {truncateWords(noticia.resumen || noticia.contenido, 50)}
+                        {truncateWords(noticia.resumen, 50)}
                       </p>
 
                       {/* Footer */}
@@ -221,21 +221,29 @@ export default function NewsDetailModern() {
         try {
           detalle = await fetchJson<NoticiaTipo>(`/api/noticias/slug/${encodeURIComponent(slug)}`);
         } catch {
+          // Enlaces antiguos: por id, o slug generado a partir del título.
+          // Se localiza con la búsqueda del backend y se pide el detalle por id.
           try {
-            const lista = await fetchJson<NoticiaTipo[]>(`/api/noticias/?limite=200`);
-            const match = (lista || []).find(n => (n.slug && n.slug === slug) || generateSlug(n.titulo) === slug);
-            if (match) {
-              detalle = match;
-              const canonical = match.slug || generateSlug(match.titulo);
-              if (canonical && canonical !== slug) navigate(`/noticia/${canonical}` as any, { replace: true });
+            if (/^\d+$/.test(slug)) {
+              detalle = await fetchJson<NoticiaTipo>(`/api/noticias/${slug}`);
+            } else {
+              const lista = await fetchJson<NoticiaTipo[]>(`/api/noticias/?buscar=${encodeURIComponent(slug.replace(/-/g, ' '))}&limite=20`);
+              const match = (lista || []).find(n => (n.slug && n.slug === slug) || generateSlug(n.titulo) === slug);
+              if (match) detalle = await fetchJson<NoticiaTipo>(`/api/noticias/${match.id}`);
             }
+            const canonical = detalle && (detalle.slug || generateSlug(detalle.titulo));
+            if (canonical && canonical !== slug) navigate(`/noticia/${canonical}` as any, { replace: true });
           } catch {}
         }
         if (!mounted) return;
         if (!detalle) throw new Error('Artículo no encontrado');
         setNoticia(detalle);
+        // Relacionadas precalculadas por el backend; si aún no hay, misma categoría
+        const similares = await fetchJson<NoticiaTipo[]>(`/api/noticias/${detalle.id}/relacionadas`).catch(() => []);
         const cat = detalle?.categoria;
-        if (cat) {
+        if (similares && similares.length > 0) {
+          if (mounted) setRelacionadas(similares.slice(0, 9));
+        } else if (cat) {
           const rel = await fetchJson<NoticiaTipo[]>(`/api/noticias/?categoria=${encodeURIComponent(cat)}&limite=10`);
           if (mounted) setRelacionadas((rel || []).filter(n => n.slug !== detalle!.slug && String(n.id) !== String(detalle!.id)).slice(0, 9));
         }
@@ -278,6 +286,7 @@ export default function NewsDetailModern() {
     const currentUrl = window.location.href;
     const shareTitle = noticia?.titulo || 'Compartir noticia';
     const text = noticia?.resumen || 'Mira esta noticia';
+    if (noticia?.id) fetch(`/api/noticias/${noticia.id}/compartir`, { method: 'POST' }).catch(() => {});
     try {
       if (navigator.share) { await navigator.share({ title: shareTitle, text, url: currentUrl }); return; }
       await navigator.clipboard.writeText(currentUrl);
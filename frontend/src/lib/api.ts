@@ -38,7 +38,9 @@ export async function fetchJson<T = any>(path: string, init?: RequestInit): Prom
     (headers as Record<string, string>)['Content-Type'] = 'application/json';
   }
   const url = `${API_BASE}${path.startsWith('/') ? '' : '/'}${path}`;
-  const res = await fetch(url, { ...init, headers });
+  // Con cookies: tras una escritura, el backend marca este navegador para leer
+  // del primario y no de la réplica (ver backend app/replica.py)
+  const res = await fetch(url, { credentials: 'include', ...init, headers });
   if (!res.ok) {
     if (res.status === 401 && typeof localStorage !== 'undefined') {
       const hadToken = localStorage.getItem('auth_token');
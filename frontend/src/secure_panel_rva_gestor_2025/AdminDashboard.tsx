@@ -124,6 +124,7 @@ const AdminDashboard: React.FC = () => {
     try {
       const res = await fetch(`${API_BASE}/api/admin/users/${id}/role`, {
         method: 'PUT',
+        credentials: 'include',
         headers: { 'Content-Type': 'application/json', ...authHeader() },
         body: JSON.stringify({ rol }),
       });
@@ -141,6 +142,7 @@ const AdminDashboard: React.FC = () => {
     try {
       const res = await fetch(`${API_BASE}/api/admin/users/${id}/activo`, {
         method: 'PATCH',
+        credentials: 'include',
         headers: { 'Content-Type': 'application/json', ...authHeader() },
         body: JSON.stringify({ activo }),
       });
@@ -167,6 +169,7 @@ const AdminDashboard: React.FC = () => {
     try {
       const res = await fetch(`${API_BASE}/api/admin/users/${id}/nombre`, {
         method: 'PATCH',
+        credentials: 'include',
         headers: { 'Content-Type': 'application/json', ...authHeader() },
         body: JSON.stringify({ nombre_usuario: nombre }),
       });
@@ -192,6 +195,7 @@ const AdminDashboard: React.FC = () => {
       form.append('file', file);
       const res = await fetch(`${API_BASE}/api/uploads/imagen?usuario_id=${id}`, {
         method: 'POST',
+        credentials: 'include',
         headers: authHeader(),
         body: form,
       });
@@ -215,6 +219,7 @@ const AdminDashboard: React.FC = () => {
     try {
       const res = await fetch(`${API_BASE}/api/admin/users/${id}/reset_password`, {
         method: 'PATCH',
+        credentials: 'include',
         headers: { 'Content-Type': 'application/json', ...authHeader() },
         body: JSON.stringify({}),
       });
@@ -239,6 +244,7 @@ const AdminDashboard: React.FC = () => {
     try {
       const res = await fetch(`${API_BASE}/api/admin/users/${id}`, {
         method: 'DELETE',
+        credentials: 'include',
         headers: authHeader(),
       });
       if (!res.ok) throw new Error('No se pudo eliminar el usuario');
@@ -268,6 +274,7 @@ const AdminDashboard: React.FC = () => {
     try {
       const res = await fetch(`${API_BASE}/api/admin/users/${editProfile.id}/profile`, {
         method: 'PATCH',
+        credentials: 'include',
         headers: { 'Content-Type': 'application/json', ...authHeader() },
         body: JSON.stringify({
           titulo: editProfile.form.titulo || null,
@@ -310,6 +317,7 @@ const AdminDashboard: React.FC = () => {
     try {
       const res = await fetch(`${API_BASE}/api/admin/users`, {
         method: 'POST',
+        credentials: 'include',
         headers: { 'Content-Type': 'application/json', ...authHeader() },
         body: JSON.stringify({
           nombre_usuario: newUser.nombre,
@@ -76,7 +76,7 @@ const EditarNoticia: React.FC = () => {
 			const headers: Record<string, string> = {};
 			const token = localStorage.getItem('auth_token');
 			if (token) headers['Authorization'] = `Bearer ${token}`;
-			const response = await fetch(`${API_BASE}/api/uploads/imagen`, { method: 'POST', body: formData, headers });
+			const response = await fetch(`${API_BASE}/api/uploads/imagen`, { credentials: 'include', method: 'POST', body: formData, headers });
 			if (!response.ok) throw new Error(await response.text());
 			const result = await response.json();
 			setFormulario(prev => ({ ...prev, imagen: result.url }));
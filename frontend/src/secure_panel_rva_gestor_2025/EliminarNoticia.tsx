@@ -13,7 +13,7 @@ const EliminarNoticia: React.FC = () => {
 			const headers: Record<string, string> = {};
 			const token = localStorage.getItem('auth_token');
 			if (token) headers['Authorization'] = `Bearer ${token}`;
-			const res = await fetch(`${API_BASE}/api/noticias/${id}`, { method: 'DELETE', headers });
+			const res = await fetch(`${API_BASE}/api/noticias/${id}`, { credentials: 'include', method: 'DELETE', headers });
 			if (!res.ok) throw new Error(await res.text());
 			alert('🗑 Noticia eliminada correctamente');
 			navigate(PANEL_BASE);
@@ -42,8 +42,8 @@ const EliminarNoticia: React.FC = () => {
 						</div>
 						<h2 className="text-3xl font-bold mb-4 text-red-600 font-['Cinzel']">¿Eliminar Noticia?</h2>
 						<div className="bg-red-50 border border-red-200 rounded-lg p-4 mb-6">
-							<p className="text-red-800 font-medium font-['Cormorant_Garamond'] text-lg">⚠️ Esta acción eliminará permanentemente la noticia ID: <strong>{id}</strong></p>
-							<p className="text-red-600 mt-2">Esta operación no se puede deshacer.</p>
+							<p className="text-red-800 font-medium font-['Cormorant_Garamond'] text-lg">⚠️ La noticia ID: <strong>{id}</strong> se enviará a la papelera</p>
+							<p className="text-red-600 mt-2">Podrá restaurarse durante 30 días; después se eliminará definitivamente.</p>
 						</div>
 						<div className="flex justify-center gap-4">
 							<button onClick={() => navigate(PANEL_BASE)} className="px-6 py-3 bg-stone-500 text-white rounded-lg hover:bg-stone-600 transition-all duration-300 font-medium">↩️ Cancelar</button>
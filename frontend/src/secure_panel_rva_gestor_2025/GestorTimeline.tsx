@@ -175,6 +175,7 @@ export default function GestorTimeline() {
       const token = localStorage.getItem('auth_token');
       const res = await fetch('/api/uploads/imagen', {
         method: 'POST',
+        credentials: 'include',
         headers: token ? { Authorization: `Bearer ${token}` } : {},
         body: fd,
       });
@@ -66,6 +66,7 @@ const MiPerfil: React.FC = () => {
       const token = localStorage.getItem('auth_token');
       const res = await fetch(`${API_BASE}/api/auth/me/profile`, {
         method: 'PATCH',
+        credentials: 'include',
         headers: {
           'Content-Type': 'application/json',
           ...(token ? { Authorization: `Bearer ${token}` } : {})
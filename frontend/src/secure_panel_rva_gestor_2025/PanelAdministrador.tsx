@@ -70,7 +70,7 @@ const PanelAdministrador: React.FC = () => {
   };
 
   const eliminarNoticia = async (id: number) => {
-    if (!window.confirm('¿Eliminar esta noticia? Esta acción no se puede deshacer.')) return;
+    if (!window.confirm('¿Enviar esta noticia a la papelera? Podrá restaurarse durante 30 días.')) return;
     try {
       await fetchJson(`/api/noticias/${id}`, { method: 'DELETE' });
       setNoticias(prev => prev.filter(n => n.id !== id));
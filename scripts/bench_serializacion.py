@@ -0,0 +1,98 @@
+"""
+Coste de serializar un listado de noticias, por elemento.
+
+Construye N noticias sintéticas en memoria (no necesita base de datos) y mide:
+
+- antes: objetos ORM con atributos añadidos a mano (`noticia.imagen`,
+  `noticia.vistas`...) devueltos con `response_model`: FastAPI los valida con
+  `from_attributes`, los convierte a tipos JSON y `JSONResponse` usa `json.dumps`.
+- ensamblado: construir los `NoticiaResumen` con `app.ensamblador`.
+- después: `RespuestaJSON` con el `TypeAdapter` cacheado (y `a_json` sin tipo).
+
+Uso:
+    python scripts/bench_serializacion.py -n 100 --repeticiones 300
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import timeit
+from datetime import date, datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend', 'backend_fastapi'))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+
+from app import esquemas, modelos  # noqa: E402
+from app.ensamblador import _construir, construir_autor_info, PerfilAutor  # noqa: E402
+from app.serializacion import RespuestaJSON, a_json  # noqa: E402
+
+
+def autor_sintetico():
+    return modelos.Usuario(
+        id=1, nombre_usuario='autora', rol_id=2, titulo='Redactora', biografia='Bio ' * 20,
+        avatar='/api/uploads/blob/usuario/1', nivel=3, experiencia_años=4, articulos_publicados=120,
+        seguidores=800, precision_rating=90, especialidades=['anime', 'manga'],
+        logros=['Top 10'], anime_favoritos=['Mushishi'], redes_sociales={'x': 'https://x.com/autora'},
+        frase_personal='Frase',
+    )
+
+
+def noticias_sinteticas(n):
+    ahora = datetime.now(timezone.utc)
+    return [
+        modelos.Noticia(
+            id=i, slug=f'noticia-{i}', titulo=f'Noticia de prueba número {i} sobre anime',
+            resumen='Resumen breve', fecha_publicacion=date.today(), imagen_principal=f'/img/{i}.jpg',
+            categoria_id=1, autor_id=1, estado_id=1, visitas=i * 7, likes=i, shares=0,
+            destacada=i % 5 == 0, updated_at=ahora, tiempo_lectura=4,
+        )
+        for i in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', type=int, default=100, help='noticias en el listado')
+    parser.add_argument('--repeticiones', type=int, default=300)
+    args = parser.parse_args()
+
+    autor = autor_sintetico()
+    noticias = noticias_sinteticas(args.n)
+    tipo = list[esquemas.NoticiaResumen]
+
+    # Antes: el ORM mutado con los nombres del esquema, revalidado por FastAPI
+    for n in noticias:
+        n.imagen, n.vistas, n.compartidos, n.fecha = n.imagen_principal, n.visitas, n.shares, n.fecha_publicacion
+        n.categoria, n.estado, n.autor_info = 'Anime', 'publicado', construir_autor_info(autor)
+        n.fecha_actualizacion, n.es_internacional = n.updated_at, False
+    campo = create_model_field('response', tipo, mode='serialization')
+
+    def antes():
+        contenido = asyncio.run(serialize_response(field=campo, response_content=noticias))
+        return JSONResponse(contenido).body
+
+    perfil = PerfilAutor(autor.nombre_usuario, autor.rol_id, construir_autor_info(autor))
+
+    def ensamblar():
+        return [_construir(n, 'Anime', 'publicado', perfil, 'editor', None, None, True) for n in noticias]
+
+    items = ensamblar()
+
+    casos = [
+        ('antes: response_model + json.dumps', antes),
+        ('ensamblado (NoticiaResumen)', ensamblar),
+        ('después: RespuestaJSON(tipo=...)', lambda: RespuestaJSON(items, tipo=tipo).body),
+        ('después: a_json sin tipo', lambda: a_json(items)),
+    ]
+    print(f"{args.n} noticias, {args.repeticiones} repeticiones")
+    for nombre, funcion in casos:
+        segundos = timeit.timeit(funcion, number=args.repeticiones) / args.repeticiones
+        print(f"  {nombre:38s} {segundos * 1e6 / args.n:8.2f} µs/noticia  {segundos * 1e3:7.2f} ms/listado")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Prueba de carga: rutas públicas asíncronas frente a rutas síncronas.
+
+Las rutas síncronas ocupan un hilo del threadpool de Starlette (40 por defecto)
+mientras esperan a PostgreSQL; con más clientes simultáneos que hilos, el resto
+hace cola. Las rutas públicas de lectura usan `AsyncSession` y sólo están
+limitadas por el pool de conexiones.
+
+Lanza `--clientes` peticiones simultáneas contra una ruta asíncrona y otra
+síncrona, ambas con consulta a la base de datos (el listado usa un offset
+distinto en cada petición para no acertar en la caché), y muestra peticiones/s
+y latencias. Con `--dsn` muestrea además `pg_stat_activity` y muestra el máximo
+de consultas activas a la vez: la ruta síncrona no pasa de THREADPOOL_HILOS; la
+asíncrona llega al tamaño del pool.
+
+Usar una base de datos con volumen (scripts/verificar_planes.py --sembrar) para
+que las consultas tarden, y arrancar la API con pocos hilos para que el límite
+se vea con poca carga:
+    THREADPOOL_HILOS=4 uvicorn app.main:app --port 8000
+    python scripts/carga_async.py --url http://localhost:8000 --clientes 64 \\
+        --offset 20000 --dsn postgresql://postgres@localhost/radio_planes
+"""
+
+import argparse
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+RUTAS = {
+    "async  GET /api/noticias/": "/api/noticias/?limite=20&offset={offset}",
+    "sync   GET /api/noticias/estadisticas/resumen": "/api/noticias/estadisticas/resumen",
+}
+
+
+class MuestreoActividad(threading.Thread):
+    """Máximo de consultas activas en la base de datos durante la prueba."""
+
+    SQL = """SELECT count(*) FROM pg_stat_activity
+             WHERE datname = current_database() AND state = 'active' AND pid <> pg_backend_pid()"""
+
+    def __init__(self, dsn):
+        super().__init__(daemon=True)
+        import psycopg
+        self.conexion = psycopg.connect(dsn, autocommit=True)
+        self.parar = threading.Event()
+        self.maximo = 0
+
+    def run(self):
+        while not self.parar.wait(0.005):
+            self.maximo = max(self.maximo, self.conexion.execute(self.SQL).fetchone()[0])
+
+    def detener(self):
+        self.parar.set()
+        self.join()
+        self.conexion.close()
+        return self.maximo
+
+
+def pedir(url):
+    inicio = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=120) as resp:
+            resp.read()
+            codigo = resp.status
+    except urllib.error.HTTPError as e:
+        codigo = e.code
+    except OSError:
+        codigo = 0
+    return codigo, time.perf_counter() - inicio
+
+
+def ejecutar(base, plantilla, offset, clientes, peticiones, dsn=None):
+    urls = [base + plantilla.format(offset=offset + i) for i in range(peticiones)]
+    muestreo = MuestreoActividad(dsn) if dsn else None
+    if muestreo:
+        muestreo.start()
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clientes) as pool:
+        resultados = list(pool.map(pedir, urls))
+    total = time.perf_counter() - inicio
+    activas = muestreo.detener() if muestreo else None
+    latencias = sorted(t for _, t in resultados)
+
+    def cuantil(q):
+        return latencias[min(len(latencias) - 1, int(q * len(latencias)))] * 1000
+
+    return {
+        "rps": peticiones / total,
+        "p50": statistics.median(latencias) * 1000,
+        "p95": cuantil(0.95),
+        "p99": cuantil(0.99),
+        "errores": sum(1 for codigo, _ in resultados if codigo != 200),
+        "activas": activas,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--clientes', type=int, default=64, help='peticiones simultáneas')
+    parser.add_argument('--peticiones', type=int, default=2000, help='peticiones por ruta')
+    parser.add_argument('--offset', type=int, default=0, help='offset inicial del listado (más alto = consulta más lenta)')
+    parser.add_argument('--dsn', help='conexión a la misma base de datos para muestrear pg_stat_activity')
+    args = parser.parse_args()
+
+    print(f"{args.clientes} clientes, {args.peticiones} peticiones por ruta")
+    for nombre, plantilla in RUTAS.items():
+        ejecutar(args.url, plantilla, args.offset, args.clientes, min(args.peticiones, 100))  # calentar
+        r = ejecutar(args.url, plantilla, args.offset + 100, args.clientes, args.peticiones, args.dsn)
+        activas = f"  consultas activas máx {r['activas']:3d}" if r['activas'] is not None else ""
+        print(
+            f"  {nombre:46s} {r['rps']:8.1f} pet/s  p50 {r['p50']:7.1f} ms"
+            f"  p95 {r['p95']:7.1f} ms  p99 {r['p99']:7.1f} ms  errores {r['errores']}{activas}"
+        )
+
+
+if __name__ == '__main__':
+    main()
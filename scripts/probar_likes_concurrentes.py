@@ -0,0 +1,92 @@
+"""
+Prueba de concurrencia de POST /api/noticias/{id}/like contra una API en marcha.
+
+Lanza N likes en paralelo, cada uno con una IP distinta (X-Forwarded-For), y
+comprueba que el contador aumentó exactamente N. Después:
+
+- repite un like desde la misma IP y comprueba que se rechaza con 429;
+- lanza una ráfaga de `--rafaga` likes en paralelo desde una sola IP nueva y
+  comprueba que exactamente uno cuenta y el resto recibe 429.
+
+La API sólo acepta X-Forwarded-For de proxies confiables (PROXIES_CONFIABLES,
+por defecto loopback y redes privadas): ejecutar contra localhost.
+
+Uso:
+    python scripts/probar_likes_concurrentes.py --url http://localhost:8000 --noticia 1 -n 500
+"""
+
+import argparse
+import json
+import sys
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+def dar_like(url, noticia_id, ip):
+    req = urllib.request.Request(
+        f"{url}/api/noticias/{noticia_id}/like",
+        method='POST',
+        headers={'X-Forwarded-For': ip},
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--noticia', type=int, required=True)
+    parser.add_argument('-n', type=int, default=500)
+    parser.add_argument('--hilos', type=int, default=32)
+    parser.add_argument('--rafaga', type=int, default=50, help='likes simultáneos desde una misma IP')
+    args = parser.parse_args()
+
+    # Prefijo aleatorio para no chocar con likes de ejecuciones anteriores
+    prefijo = uuid.uuid4().hex[:8]
+    ip_base = f"prueba-{prefijo}"
+
+    estado, datos = dar_like(args.url, args.noticia, f"{ip_base}-inicial")
+    if estado != 200:
+        sys.exit(f"No se pudo dar el like inicial (HTTP {estado})")
+    inicial = datos['likes']
+
+    with ThreadPoolExecutor(args.hilos) as ex:
+        codigos = list(ex.map(
+            lambda i: dar_like(args.url, args.noticia, f"{ip_base}-{i}")[0],
+            range(args.n),
+        ))
+    fallidos = [c for c in codigos if c != 200]
+
+    estado, datos = dar_like(args.url, args.noticia, f"{ip_base}-final")
+    final = datos['likes'] if datos else None
+    repetido, _ = dar_like(args.url, args.noticia, f"{ip_base}-final")
+
+    esperado = inicial + args.n + 1
+    print(f"likes inicial={inicial} final={final} esperado={esperado} errores={len(fallidos)}")
+    print(f"like repetido desde la misma IP -> HTTP {repetido}")
+
+    # Ráfaga en paralelo desde una sola IP: sólo el primero puede contar
+    ip_rafaga = f"{ip_base}-rafaga"
+    with ThreadPoolExecutor(args.hilos) as ex:
+        rafaga = list(ex.map(lambda _: dar_like(args.url, args.noticia, ip_rafaga), range(args.rafaga)))
+    aceptados = [d for c, d in rafaga if c == 200]
+    rechazados = sum(1 for c, _ in rafaga if c == 429)
+    _, datos = dar_like(args.url, args.noticia, f"{ip_base}-comprobacion")
+    tras_rafaga = datos['likes'] if datos else None
+    print(f"ráfaga de {args.rafaga} desde una IP -> {len(aceptados)} aceptados, {rechazados} con 429, "
+          f"likes {final} -> {tras_rafaga} (esperado {final + 2 if final is not None else None})")
+
+    if fallidos or final != esperado or repetido != 429:
+        sys.exit(1)
+    if len(aceptados) != 1 or rechazados != args.rafaga - 1 or tras_rafaga != final + 2:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""
+Comprobación de planes de ejecución de las consultas frecuentes.
+
+Arranca la app en proceso (TestClient), recorre los endpoints de lectura más
+usados y captura cada SELECT que envían a PostgreSQL. Después ejecuta
+`EXPLAIN (FORMAT JSON)` sobre cada una con sus parámetros y falla si aparece un
+Seq Scan sobre una tabla grande (más de --umbral filas estimadas), si algún
+endpoint no responde 2xx (salvo el login admin, opcional) o si alguna consulta
+no se puede explicar.
+
+Necesita una base de datos con volumen: con --sembrar N se insertan N noticias
+sintéticas (y usuarios, historial y notas en proporción) y se ejecuta ANALYZE.
+Usar una base de datos de pruebas, nunca la de producción.
+
+Uso:
+    pip install httpx
+    DATABASE_URL=postgresql+psycopg://postgres@localhost/radio_planes \\
+        python scripts/verificar_planes.py --sembrar 50000 --usuario admin --password admin
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend', 'backend_fastapi'))
+
+from sqlalchemy import event, text  # noqa: E402
+
+SEMBRAR = [
+    """INSERT INTO categorias (nombre, slug)
+       SELECT 'Sintética ' || i, 'sintetica-' || i FROM generate_series(1, 20) AS i
+       ON CONFLICT DO NOTHING""",
+    """INSERT INTO usuarios (nombre_usuario, email, password_hash, activo)
+       SELECT 'sintetico' || i, 'sintetico' || i || '@ejemplo.com', 'x', true
+       FROM generate_series(1, greatest(:n / 25, 1)) AS i
+       ON CONFLICT DO NOTHING""",
+    """INSERT INTO noticias (titulo, slug, resumen, contenido, categoria_id, autor_id, estado_id,
+                             fecha_publicacion, visitas, likes, tendencia)
+       SELECT 'Noticia sintética ' || i || ' sobre ' || (ARRAY['anime', 'manga', 'música', 'radio'])[1 + i % 4],
+              'noticia-sintetica-' || i,
+              'Resumen ' || i,
+              '<p>Contenido de prueba número ' || i || ' con texto de relleno.</p>',
+              (SELECT id FROM categorias ORDER BY id OFFSET (i % 20) LIMIT 1),
+              (SELECT id FROM usuarios ORDER BY id OFFSET (i % greatest(:n / 25, 1)) LIMIT 1),
+              CASE WHEN i % 10 = 0 THEN NULL ELSE (SELECT id FROM estados_noticia WHERE lower(nombre) = 'publicado') END,
+              current_date - (i % 3650),
+              i % 1000, i % 50,
+              CASE WHEN i % 3 = 0 THEN (i % 500)::double precision END
+       FROM generate_series(1, :n) AS i
+       ON CONFLICT (slug) DO NOTHING""",
+    """INSERT INTO noticia_historial (noticia_id, accion, cambios)
+       SELECT id, 'update', '{}'::jsonb FROM noticias WHERE slug LIKE 'noticia-sintetica-%'""",
+    """INSERT INTO notas (contenido, autor_id, activa)
+       SELECT 'Nota ' || i, (SELECT min(id) FROM usuarios), i % 4 = 0
+       FROM generate_series(1, :n / 2) AS i""",
+]
+
+
+def sembrar(engine, n):
+    with engine.begin() as conn:
+        existentes = conn.execute(text("SELECT count(*) FROM noticias WHERE slug LIKE 'noticia-sintetica-%'")).scalar()
+        if existentes >= n:
+            print(f"Ya hay {existentes} noticias sintéticas; no se siembra")
+        else:
+            for sentencia in SEMBRAR:
+                conn.execute(text(sentencia), {"n": n})
+            print(f"Sembradas {n} noticias sintéticas")
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE"))
+
+
+def recorrer_endpoints(cliente, usuario, password) -> list[str]:
+    """
+    Peticiones de lectura representativas (cada una con la caché vacía).
+    Devuelve las que no respondieron 2xx: una ruta rota no captura consultas y
+    no debe pasar la comprobación en silencio.
+    """
+    from app.cache import CACHES
+
+    errores = []
+
+    def get(url, **kw):
+        for cache in CACHES.values():
+            cache.limpiar()
+        respuesta = cliente.get(url, **kw)
+        if not 200 <= respuesta.status_code < 300:
+            parametros = f" {kw['params']}" if kw.get("params") else ""
+            errores.append(f"{url}{parametros} -> HTTP {respuesta.status_code}")
+        return respuesta
+
+    listado = get("/api/noticias/?limite=20")
+    noticias = listado.json() if listado.status_code == 200 else []
+    cursor = listado.headers.get("X-Next-Cursor")
+    if cursor:
+        get("/api/noticias/", params={"limite": 20, "cursor": cursor})
+    get("/api/noticias/?limite=20&incluir_contenido=true")
+    get("/api/noticias/?categoria=Sintética 3&limite=20")
+    get("/api/noticias/?destacada=true&limite=20")
+    get("/api/noticias/?destacada=true&es_internacional=false&limite=9")
+    get("/api/noticias/?es_internacional=true&limite=20")
+    get("/api/noticias/?buscar=manga&limite=20")
+    get("/api/noticias/sugerencias?q=noticia sint")
+    get("/api/noticias/tendencias?limite=10")
+    get("/api/noticias/categorias/")
+    if noticias:
+        primera = noticias[0]
+        get(f"/api/noticias/?autor_id={primera['autor_id']}&limite=20")
+        get(f"/api/noticias/{primera['id']}")
+        get(f"/api/noticias/slug/{primera['slug']}")
+        get(f"/api/noticias/{primera['id']}/relacionadas")
+        get(f"/api/noticias/{primera['id']}/historial")
+    get("/api/notas/")
+    get("/api/notas/total")
+
+    token = cliente.post("/api/auth/login", data={"username": usuario, "password": password})
+    if token.status_code == 200:
+        cabeceras = {"Authorization": f"Bearer {token.json()['access_token']}"}
+        get("/api/noticias/admin/all?limite=50", headers=cabeceras)
+        get("/api/noticias/admin/papelera", headers=cabeceras)
+    else:
+        # El login es opcional (credenciales del entorno): no cuenta como fallo
+        print(f"Aviso: login fallido ({token.status_code}), se omiten los endpoints admin")
+    return errores
+
+
+def _nodos(plan):
+    yield plan
+    for hijo in plan.get("Plans", []):
+        yield from _nodos(hijo)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sembrar', type=int, default=0, help='noticias sintéticas a insertar (0 = no sembrar)')
+    parser.add_argument('--umbral', type=int, default=5000, help='filas a partir de las cuales una tabla es grande')
+    parser.add_argument('--usuario', default='admin')
+    parser.add_argument('--password', default='admin')
+    args = parser.parse_args()
+
+    os.environ.setdefault("MIGRACIONES_AL_ARRANCAR", "1")
+    from fastapi.testclient import TestClient
+    from app.base_datos import engine, async_engine
+    from app.main import app
+
+    consultas = []
+
+    # Las rutas públicas usan el engine asíncrono; se capturan ambos
+    @event.listens_for(engine, "before_cursor_execute")
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def capturar(conn, cursor, sentencia, parametros, contexto, executemany):
+        if sentencia.lstrip().upper().startswith(("SELECT", "WITH")) and not executemany:
+            consultas.append((sentencia, parametros))
+
+    # Un endpoint que falla no detiene la comprobación del resto, pero cuenta
+    with TestClient(app, raise_server_exceptions=False) as cliente:
+        if args.sembrar:
+            sembrar(engine, args.sembrar)
+        consultas.clear()
+        errores = recorrer_endpoints(cliente, args.usuario, args.password)
+    for error in errores:
+        print(f"ENDPOINT FALLIDO: {error}")
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        tamanos = dict(conn.execute(text(
+            "SELECT relname, reltuples::bigint FROM pg_class WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+        )).all())
+        grandes = {tabla for tabla, filas in tamanos.items() if filas >= args.umbral}
+        print(f"Tablas grandes (≥ {args.umbral} filas): {', '.join(sorted(grandes)) or 'ninguna'}")
+        if not grandes:
+            print("Aviso: sin tablas grandes la comprobación no es significativa (usar --sembrar)")
+
+        fallos = 0
+        sin_explicar = 0
+        vistas = set()
+        # Autocommit: una consulta que no se puede explicar no aborta las siguientes
+        pg = conn.connection.driver_connection
+        for sentencia, parametros in consultas:
+            if sentencia in vistas:
+                continue
+            vistas.add(sentencia)
+            try:
+                plan = pg.execute("EXPLAIN (FORMAT JSON) " + sentencia, parametros).fetchone()[0]
+            except Exception as e:
+                sin_explicar += 1
+                print(f"\nNO SE PUDO EXPLICAR ({e.__class__.__name__}): {' '.join(sentencia.split())[:200]}")
+                continue
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            escaneos = [
+                nodo["Relation Name"] for nodo in _nodos(plan[0]["Plan"])
+                if nodo["Node Type"] == "Seq Scan" and nodo.get("Relation Name") in grandes
+            ]
+            if escaneos:
+                fallos += 1
+                print(f"\nSEQ SCAN en {', '.join(escaneos)}:\n  {' '.join(sentencia.split())[:400]}")
+
+    print(
+        f"\n{len(vistas)} consultas comprobadas, {fallos} con Seq Scan sobre tablas grandes, "
+        f"{sin_explicar} sin explicar, {len(errores)} endpoints fallidos"
+    )
+    sys.exit(1 if fallos or sin_explicar or errores else 0)
+
+
+if __name__ == '__main__':
+    main()